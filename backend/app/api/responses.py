@@ -0,0 +1,112 @@
+import base64
+import json
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.compression import negotiate
+from app.core.config import settings
+from app.core.indexes import KeysetIndex
+from app.core.payloads import dumps
+
+# Most identifiers a bulk lookup resolves in one request
+MAX_BATCH_IDS = 100
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A bodiless 304 when the client already holds this version, else None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def json_bytes(body: Union[bytes, memoryview], etag: str, total: Optional[int] = None) -> Response:
+    """Serve pre-serialized JSON, skipping response_model validation and encoding."""
+    headers: Dict[str, str] = {"ETag": etag}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    # Snapshot-backed bodies are memoryviews; bytes() of bytes is a no-op
+    return Response(content=bytes(body), media_type="application/json", headers=headers)
+
+
+def precompressed(
+    request: Request,
+    body: Union[bytes, memoryview],
+    etag: str,
+    encoded: Dict[str, Union[bytes, memoryview]],
+    total: Optional[int] = None,
+) -> Response:
+    """
+    json_bytes for a fixed body, sent as its stored compressed variant when
+    the client accepts one; CompressionMiddleware passes it through.
+    """
+    encoding = negotiate(request.headers.get("accept-encoding", ""))
+    if encoding not in encoded or len(body) < settings.COMPRESSION_MIN_SIZE:
+        return json_bytes(body, etag, total)
+    # Like CompressionMiddleware: an encoded body only keeps a weak validator
+    headers: Dict[str, str] = {"ETag": "W/" + etag, "Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    return Response(content=bytes(encoded[encoding]), media_type="application/json", headers=headers)
+
+
+def resolve_ids(value: str, position: Callable[[str], Optional[int]]) -> Tuple[List[int], List[str]]:
+    """
+    Positions of a comma-separated id list, in request order, and the ids
+    that don't exist. Blanks and repeats (including ids that resolve to
+    the same entity, like 21a and 21A) are skipped.
+    """
+    ids = list(dict.fromkeys(i.strip() for i in value.split(",") if i.strip()))
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_BATCH_IDS} ids per request")
+    positions, missing = [], []
+    for i in ids:
+        pos = position(i)
+        if pos is None:
+            missing.append(i)
+        elif pos not in positions:
+            positions.append(pos)
+    return positions, missing
+
+
+def encode_cursor(order: str, key: tuple) -> str:
+    """Opaque, URL-safe form of an ordering's name and a sort key in it."""
+    return base64.urlsafe_b64encode(dumps({"order": order, "after": list(key)})).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, tuple]:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        value = None
+    if not (isinstance(value, dict) and isinstance(value.get("order"), str) and isinstance(value.get("after"), list)):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    return value["order"], tuple(value["after"])
+
+
+def keyset_page(index: KeysetIndex, cursor: str, limit: int) -> Tuple[List[int], Optional[str]]:
+    """
+    Positions of the page after a cursor (an empty cursor is the first
+    page) and the cursor of the next page, None on the last one. A cursor
+    issued for another list, filter or key shape is rejected with 422.
+    """
+    after = None
+    if cursor:
+        order, after = decode_cursor(cursor)
+        if order != index.name:
+            raise HTTPException(status_code=422, detail="Cursor belongs to another list or filter")
+        if not index.accepts(after):
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+    positions, last = index.page(after, limit)
+    return positions, encode_cursor(index.name, last) if last is not None else None
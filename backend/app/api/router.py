@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import chat, articles, cases, procedures
+from app.api.routes import chat, articles, cases, procedures, facets, admin
 
 api_router = APIRouter()
 
@@ -8,3 +8,5 @@ api_router.include_router(chat.router)
 api_router.include_router(articles.router)
 api_router.include_router(cases.router)
 api_router.include_router(procedures.router)
+api_router.include_router(facets.router)
+api_router.include_router(admin.router)
@@ -0,0 +1,132 @@
+import asyncio
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from app.core.config import settings
+from app.core.database import db
+from app.core.profiling import chat_sampler, memory_profiler, request_profiles
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are disabled unless ADMIN_TOKEN is set, then require it."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/reload", dependencies=[Depends(require_admin)])
+async def reload_data():
+    """
+    Reload constitution_data.json without a restart.
+    Parsing and indexing run off the event loop; the new snapshot is swapped
+    in atomically and in-flight requests finish against the old one.
+    A file that fails to parse leaves the current data in place.
+    This reloads the worker that received the request; under several
+    workers the others follow within DATA_RELOAD_SYNC_INTERVAL seconds.
+    """
+    report = await db.reload()
+    if not report["success"]:
+        raise HTTPException(status_code=422, detail=report)
+    if settings.DATA_RELOAD_SYNC_INTERVAL <= 0:
+        others = "not reloaded: DATA_RELOAD_SYNC_INTERVAL is 0"
+    elif not settings.DATA_RELOAD_GROUP:
+        others = "not reloaded: DATA_RELOAD_GROUP is not set"
+    else:
+        db.announce_reload()
+        others = f"reload within {settings.DATA_RELOAD_SYNC_INTERVAL:g}s"
+    # A copy: the stored report (GET /admin/reload, /health) is per worker
+    return {**report, "worker": os.getpid(), "other_workers": others}
+
+
+@router.get("/reload", dependencies=[Depends(require_admin)])
+async def reload_status():
+    """
+    Current data version and the outcome of the last reload.
+    """
+    return {
+        "version": db.version,
+        "reloads": db.reloads,
+        "last_reload": db.last_reload,
+    }
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """
+    Request profiles kept in this worker, newest first.
+    Profile a request by sending it with X-Profile: 1 (or ?profile=1) and
+    X-Admin-Token; its X-Profile-Id response header names the profile.
+    """
+    return {
+        "profiles": request_profiles.list(),
+        "chat_sampling": {"every": chat_sampler.every, "sampled": len(chat_sampler)},
+    }
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls|ncalls|name)$"),
+    limit: int = Query(40, ge=1, le=1000),
+):
+    """
+    A request profile as pstats text, or with format=pstats as a binary
+    file for pstats, snakeviz or gprof2dot.
+    """
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            content=profile.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+        )
+    return PlainTextResponse(profile.text(sort, limit))
+
+
+@router.get("/flamegraph", dependencies=[Depends(require_admin)])
+async def chat_flamegraph():
+    """
+    Rolling flame graph of the sampled chat messages in folded-stack format
+    (microseconds of self time per stack), for flamegraph.pl or speedscope.
+    """
+    return PlainTextResponse(chat_sampler.folded())
+
+
+@router.post("/flamegraph", dependencies=[Depends(require_admin)])
+async def configure_flamegraph(
+    every: int = Query(..., ge=0, description="Sample 1 in N chat messages, 0 to stop"),
+    reset: bool = False,
+):
+    """Change chat sampling in this worker at runtime, optionally dropping the samples so far."""
+    chat_sampler.configure(every)
+    if reset:
+        chat_sampler.clear()
+    return {"every": chat_sampler.every, "sampled": len(chat_sampler)}
+
+
+@router.post("/memory", dependencies=[Depends(require_admin)])
+async def memory_snapshot(top: int = Query(20, ge=1, le=200)):
+    """
+    Take a tracemalloc snapshot (tracing starts on the first call) and
+    report the bytes retained by each Database collection and index, the
+    traced allocations grouped the same way, the top allocation sites and
+    their growth since the previous snapshot.
+    """
+    return await asyncio.to_thread(memory_profiler.report, db.current, top)
+
+
+@router.delete("/memory", dependencies=[Depends(require_admin)])
+async def stop_memory_tracing():
+    """Stop tracemalloc, which slows every allocation while it runs."""
+    memory_profiler.stop()
+    return {"tracing": False}
@@ -1,49 +1,93 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from typing import List, Optional, Union
 
+from app.api.responses import json_bytes, keyset_page, not_modified, precompressed, resolve_ids
 from app.core.database import get_db, Database
-from app.schemas import ArticleResponse
+from app.core.payloads import LIST_PAGE_SIZE
+from app.schemas import ArticleResponse, ArticleBatchResponse, ArticlePage
 from app.models import Article
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
 
-@router.get("", response_model=List[ArticleResponse])
+@router.get("", response_model=Union[List[ArticleResponse], ArticlePage])
 async def get_articles(
+    request: Request,
     skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=100),
     category: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then the previous page's next_cursor"),
     db: Database = Depends(get_db)
 ):
     """
     Get all articles with optional filtering and pagination.
+    With `search`, results are ranked by relevance.
+    The total number of matches is returned in the X-Total-Count header.
+    With `cursor`, pages are ordered by article number and come as
+    {items, total, next_cursor}; a page costs the same at any depth.
+    Bodies are pre-serialized per data version and carry its ETag.
     """
-    all_articles = db.articles
+    payloads = db.payloads
+    unchanged = not_modified(request, payloads.etag)
+    if unchanged:
+        return unchanged
     
-    # 1. Filter by category
+    # 1. Filter by category (positions come from the facet index)
+    positions = None
     if category:
-        all_articles = [a for a in all_articles if a.get("category") == category]
+        positions = db.facets.articles_by_category.get(category, [])
     
-    # 2. Search by keyword in title or description
+    # 2. Full-text search, ranked and paginated inside the index
     if search:
-        search_lower = search.lower()
-        all_articles = [
-            a for a in all_articles 
-            if search_lower in a.get("title", "").lower() or 
-               search_lower in a.get("description", "").lower()
-        ]
+        if cursor is not None:
+            raise HTTPException(status_code=422, detail="Search results are ranked by relevance; page them with skip")
+        within = set(positions) if positions is not None else None
+        page, total = db.article_search.search(search, skip, limit, within)
+        return json_bytes(payloads.page(payloads.articles, page), payloads.etag, total)
     
-    # 3. Apply Pagination
+    # 3. Cursor pages walk a precomputed ordering; total is its size
+    if cursor is not None:
+        orderings = db.orderings
+        index = orderings.articles_by_category.get(category, orderings.empty) if category else orderings.articles
+        page, next_cursor = keyset_page(index, cursor, limit)
+        body = payloads.envelope(payloads.articles, page, len(index), next_cursor)
+        return json_bytes(body, payloads.etag, len(index))
+    
+    # 4. Apply Pagination
     start = skip
     end = skip + limit
-    paginated_articles = all_articles[start:end]
-    
-    return paginated_articles
+    if positions is not None:
+        body = payloads.page(payloads.articles, positions[start:end])
+        return json_bytes(body, payloads.etag, len(positions))
+    total = len(payloads.articles)
+    if start == 0 and limit == LIST_PAGE_SIZE:
+        # The default first page is a fixed body, stored precompressed
+        return precompressed(request, payloads.article_list, payloads.etag, payloads.encoded("article_list"), total)
+    return json_bytes(payloads.page(payloads.articles[start:end]), payloads.etag, total)
+
+
+@router.get("/batch", response_model=ArticleBatchResponse)
+async def get_articles_batch(
+    request: Request,
+    numbers: str = Query(..., description="Comma-separated article numbers, e.g. 14,19,21A"),
+    db: Database = Depends(get_db)
+):
+    """
+    Get several articles in one request, in request order.
+    Unknown article numbers are listed in `missing` instead of failing the request.
+    """
+    payloads = db.payloads
+    unchanged = not_modified(request, payloads.etag)
+    if unchanged:
+        return unchanged
+    positions, missing = resolve_ids(numbers, db.article_position)
+    return json_bytes(payloads.batch(payloads.articles, positions, missing), payloads.etag)
 
 
 @router.get("/{article_number}", response_model=ArticleResponse)
 async def get_article(
+    request: Request,
     article_number: str,
     db: Database = Depends(get_db)
 ):
@@ -51,29 +95,24 @@ async def get_article(
     Get a specific article by number.
     """
     # Case insensitive match for article number (e.g. 21A vs 21a)
-    article = next(
-        (a for a in db.articles if a.get("number", "").lower() == article_number.lower()), 
-        None
-    )
+    pos = db.article_position(article_number)
     
-    if not article:
-        # Try finding by ID if number fails (fallback for some clients)
-        try:
-            # Not needed for JSON but good for compatibility if ID passed
-            pass
-        except:
-            pass
-            
+    if pos is None:
         raise HTTPException(status_code=404, detail="Article not found")
         
-    return article
+    payloads = db.payloads
+    return not_modified(request, payloads.etag) or precompressed(
+        request, payloads.articles[pos], payloads.etag, payloads.encoded("articles", pos)
+    )
 
 
 @router.get("/categories/list", response_model=List[str])
-async def get_categories(db: Database = Depends(get_db)):
+async def get_categories(request: Request, db: Database = Depends(get_db)):
     """
     Get all unique article categories.
     """
-    # Get unique categories
-    categories = sorted(list(set(a.get("category") for a in db.articles if a.get("category"))))
-    return categories
+    # Unique categories are precomputed and serialized at load
+    payloads = db.payloads
+    return not_modified(request, payloads.etag) or precompressed(
+        request, payloads.article_categories, payloads.etag, payloads.encoded("article_categories")
+    )
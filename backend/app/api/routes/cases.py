@@ -1,59 +1,105 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from typing import List, Optional, Union
 
+from app.api.responses import json_bytes, keyset_page, not_modified, precompressed, resolve_ids
 from app.core.database import get_db, Database
-from app.schemas import LandmarkCaseResponse
+from app.core.payloads import LIST_PAGE_SIZE
+from app.schemas import LandmarkCaseResponse, LandmarkCaseBatchResponse, LandmarkCasePage
 from app.models import LandmarkCase
 
 router = APIRouter(prefix="/cases", tags=["cases"])
 
 
-@router.get("", response_model=List[LandmarkCaseResponse])
+@router.get("", response_model=Union[List[LandmarkCaseResponse], LandmarkCasePage])
 async def get_cases(
+    request: Request,
     skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=100),
     year: Optional[int] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then the previous page's next_cursor"),
     db: Database = Depends(get_db)
 ):
     """
     Get all landmark cases with optional filtering and pagination.
+    With `search`, results are ranked by relevance.
+    The total number of matches is returned in the X-Total-Count header.
+    With `cursor`, pages are ordered by year, then name, and come as
+    {items, total, next_cursor}; a page costs the same at any depth.
+    Bodies are pre-serialized per data version and carry its ETag.
     """
-    all_cases = db.cases
+    payloads = db.payloads
+    unchanged = not_modified(request, payloads.etag)
+    if unchanged:
+        return unchanged
     
-    # 1. Filter by year
+    # 1. Filter by year (years are normalised to int in the facet index)
+    positions = None
     if year:
-        all_cases = [c for c in all_cases if c.get("year") == year]
+        positions = db.facets.cases_by_year.get(year, [])
     
-    # 2. Search by keyword in name or significance
+    # 2. Full-text search, ranked and paginated inside the index
     if search:
-        search_lower = search.lower()
-        all_cases = [
-            c for c in all_cases 
-            if search_lower in c.get("name", "").lower() or 
-               search_lower in c.get("significance", "").lower()
-        ]
+        if cursor is not None:
+            raise HTTPException(status_code=422, detail="Search results are ranked by relevance; page them with skip")
+        within = set(positions) if positions is not None else None
+        page, total = db.case_search.search(search, skip, limit, within)
+        return json_bytes(payloads.page(payloads.cases, page), payloads.etag, total)
     
-    # 3. Apply Pagination
+    # 3. Cursor pages walk a precomputed ordering; total is its size
+    if cursor is not None:
+        orderings = db.orderings
+        index = orderings.cases_by_year.get(year, orderings.empty) if year else orderings.cases
+        page, next_cursor = keyset_page(index, cursor, limit)
+        body = payloads.envelope(payloads.cases, page, len(index), next_cursor)
+        return json_bytes(body, payloads.etag, len(index))
+    
+    # 4. Apply Pagination
     start = skip
     end = skip + limit
-    paginated_cases = all_cases[start:end]
-    
-    return paginated_cases
+    if positions is not None:
+        body = payloads.page(payloads.cases, positions[start:end])
+        return json_bytes(body, payloads.etag, len(positions))
+    total = len(payloads.cases)
+    if start == 0 and limit == LIST_PAGE_SIZE:
+        # The default first page is a fixed body, stored precompressed
+        return precompressed(request, payloads.case_list, payloads.etag, payloads.encoded("case_list"), total)
+    return json_bytes(payloads.page(payloads.cases[start:end]), payloads.etag, total)
+
+
+@router.get("/batch", response_model=LandmarkCaseBatchResponse)
+async def get_cases_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated case ids, e.g. maneka-gandhi-v-union-of-india-1978"),
+    db: Database = Depends(get_db)
+):
+    """
+    Get several landmark cases in one request, in request order.
+    Unknown case ids are listed in `missing` instead of failing the request.
+    """
+    payloads = db.payloads
+    unchanged = not_modified(request, payloads.etag)
+    if unchanged:
+        return unchanged
+    positions, missing = resolve_ids(ids, db.case_position)
+    return json_bytes(payloads.batch(payloads.cases, positions, missing), payloads.etag)
 
 
 @router.get("/{case_id}", response_model=LandmarkCaseResponse)
 async def get_case(
+    request: Request,
     case_id: str,
     db: Database = Depends(get_db)
 ):
     """
     Get a specific landmark case by ID.
-    Using ID from JSON (integer or string)
+    Using ID from JSON (integer or string), or the slug assigned at load
     """
-    # Try to match by ID
-    case = next((c for c in db.cases if str(c.get("id")) == str(case_id)), None)
+    pos = db.case_position(case_id)
     
-    if not case:
+    if pos is None:
         raise HTTPException(status_code=404, detail="Case not found")
-    return case
+    payloads = db.payloads
+    return not_modified(request, payloads.etag) or precompressed(
+        request, payloads.cases[pos], payloads.etag, payloads.encoded("cases", pos)
+    )
@@ -1,13 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List
 
+from app.api.responses import not_modified, precompressed
+from app.core.cache import chat_cache, normalize_message
 from app.core.database import get_db, Database
-from app.schemas import ChatMessage, ChatResponse, QuickReplyResponse
+from app.core.metrics import chat_stage_seconds, chat_stream_first_section_seconds
+from app.core.offload import PoolSaturated, chat_executor
+from app.core.profiling import chat_sampler
+from app.schemas import ArticleResponse, ChatBatchRequest, ChatMessage, ChatResponse, QuickReplyResponse
 from app.services.chat_service import ChatService
 from app.models import QuickReply
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+# Batch messages are scored this many per pool task: few enough that a
+# task stays well inside CHAT_TIMEOUT, and that single chats interleave
+BATCH_CHUNK_SIZE = 50
+
+
+def render_response(result: Dict) -> str:
+    # Records were validated at load, so the response skips validation
+    with chat_stage_seconds.time("serialize"):
+        related = result.get('related_articles')
+        response = ChatResponse.model_construct(
+            success=result['success'],
+            message=result['message'],
+            related_articles=None if related is None else [ArticleResponse.from_record(a) for a in related]
+        )
+        return response.model_dump_json(by_alias=True)
+
+
+def answer_message(db: Database, message: str) -> str:
+    """Score a message and serialize the response body (runs in the chat pool)."""
+    # ChatService now uses synchronous filtering on in-memory data
+    chat_service = ChatService(db)
+    with chat_sampler.sample():
+        return render_response(chat_service.process_chat_message(message))
+
+
+def answer_messages(db: Database, messages: List[str]) -> List[str]:
+    """answer_message for several messages, sharing one scoring pass where possible."""
+    return [render_response(result) for result in ChatService(db).process_chat_messages(messages)]
+
+
+def pool_unavailable(e: Exception) -> HTTPException:
+    if isinstance(e, PoolSaturated):
+        detail = "Too many chat messages in progress, please retry shortly"
+    else:
+        detail = "The chat service took too long to answer, please retry"
+    return HTTPException(status_code=503, detail=detail, headers={"Retry-After": "1"})
+
 
 @router.post("", response_model=ChatResponse)
 async def chat(
@@ -16,26 +62,154 @@ async def chat(
 ):
     """
     Process a chat message and return a response.
+    The message is scored as sent; answers are cached per normalized
+    message and data version.
+    Scoring runs in a bounded thread pool: when it is full, or a message
+    takes longer than CHAT_TIMEOUT, the answer is a 503 with Retry-After.
     """
+    key = normalize_message(message.message)
+    cached = await chat_cache.get(key, db.version)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
     try:
-        # ChatService now uses synchronous filtering on in-memory data
-        chat_service = ChatService(db)
-        result = chat_service.process_chat_message(message.message)
-        
-        return ChatResponse(
-            success=result['success'],
-            message=result['message'],
-            related_articles=result.get('related_articles')
-        )
+        body = await chat_executor.run(answer_message, db, message.message)
+    except (PoolSaturated, asyncio.TimeoutError) as e:
+        raise pool_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    
+    await chat_cache.set(key, body, db.version)
+    return Response(content=body, media_type="application/json")
+
+
+def route_message(db: Database, message: str) -> Dict:
+    """Pick the answer to a message (runs in the chat pool); its text is then streamed section by section."""
+    return ChatService(db).process_chat_message(message)
+
+
+def sse(event: str, data: str) -> str:
+    """One Server-Sent Event; data is a single line of JSON."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+@router.get("/stream")
+async def chat_stream(
+    message: str = Query(..., min_length=1, max_length=1000),
+    db: Database = Depends(get_db)
+):
+    """
+    Server-Sent Events variant of POST /chat (GET, so EventSource works).
+    The stream opens before scoring starts, then sends:
+    - `heading`: {"text": ...}, the answer's first line
+    - `section`: {"text": ...}, once per section, in order
+    - `related`: an ArticleResponse, once per related article
+    - `done`: {"success": true}
+    The heading and section texts concatenate to the message POST /chat
+    returns. The heading is sent as soon as routing has picked the answer,
+    and each section is sliced from the prerendered answer as it is sent. A saturated or timed-out chat pool, or any other error, sends
+    `error` ({"detail": ...}) and ends the stream.
+    """
+    started = time.perf_counter()
+    
+    async def events():
+        # Open the stream (and flush the headers) before scoring
+        yield ": scoring\n\n"
+        try:
+            result = await chat_executor.run(route_message, db, message)
+            sections = ChatService(db).sections(result)
+            yield sse("heading", json.dumps({"text": next(sections)}, ensure_ascii=False))
+            # The generator resumes once the heading has been handed to the server
+            chat_stream_first_section_seconds.observe(time.perf_counter() - started)
+            for section in sections:
+                yield sse("section", json.dumps({"text": section}, ensure_ascii=False))
+            # Related articles are served from their pre-serialized bodies
+            for article in result.get('related_articles') or []:
+                yield sse("related", str(db.payloads.articles[article.position], "utf-8"))
+        except (PoolSaturated, asyncio.TimeoutError) as e:
+            yield sse("error", json.dumps({"detail": pool_unavailable(e).detail}))
+            return
+        except Exception as e:
+            # The status line has been sent, so errors can only be reported in the stream
+            yield sse("error", json.dumps({"detail": f"An error occurred: {str(e)}"}))
+            return
+        yield sse("done", json.dumps({"success": result['success']}))
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def batch_bodies(db: Database, messages: List[str]) -> AsyncIterator[str]:
+    """
+    Response bodies for messages, in order. Cached answers are reused (by
+    normalized message), repeated messages are scored once, and the rest
+    are scored as sent, in chunks in the chat pool; each body is yielded as
+    soon as it and every body before it are ready. Batch answers are not
+    written to the chat cache, so a replay of thousands of questions
+    doesn't evict the hot entries of interactive users.
+    """
+    keys = [normalize_message(m) for m in messages]
+    # One bulk lookup, kept out of the cache's hit/miss stats
+    cached = await chat_cache.get_many(list(dict.fromkeys(keys)), db.version)
+    bodies: Dict[str, str] = {m: cached[key] for m, key in zip(messages, keys) if key in cached}
+    missing = [m for m in dict.fromkeys(messages) if m not in bodies]
+    
+    sent = 0
+    while sent < len(messages):
+        if messages[sent] in bodies:
+            yield bodies[messages[sent]]
+            sent += 1
+        else:
+            # Missing messages are in first-appearance order, so this chunk holds messages[sent]
+            chunk, missing = missing[:BATCH_CHUNK_SIZE], missing[BATCH_CHUNK_SIZE:]
+            bodies.update(zip(chunk, await chat_executor.run(answer_messages, db, chunk)))
+
+
+@router.post("/batch", response_model=List[ChatResponse])
+async def chat_batch(
+    batch: ChatBatchRequest,
+    stream: bool = Query(False, description="Stream answers as NDJSON, one line per message"),
+    db: Database = Depends(get_db)
+):
+    """
+    Answer up to 1000 messages in one request, in order. Each answer is
+    identical to what POST /chat returns for that message.
+    With `stream=true` the answers are sent as NDJSON (one ChatResponse
+    per line, in order) while they are produced; if scoring is cut short
+    (the pool is saturated or times out), a final {"error": ...} line ends
+    the stream, as does any other error. Otherwise the pool errors are a
+    503 and other errors a 500, as for /chat.
+    """
+    if stream:
+        async def lines():
+            try:
+                async for body in batch_bodies(db, batch.messages):
+                    yield body + "\n"
+            except (PoolSaturated, asyncio.TimeoutError) as e:
+                yield json.dumps({"error": pool_unavailable(e).detail}) + "\n"
+            except Exception as e:
+                yield json.dumps({"error": f"An error occurred: {str(e)}"}) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
+    try:
+        bodies = [body async for body in batch_bodies(db, batch.messages)]
+    except (PoolSaturated, asyncio.TimeoutError) as e:
+        raise pool_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
+    return Response(content="[" + ",".join(bodies) + "]", media_type="application/json")
 
 
 @router.get("/quick-replies", response_model=List[QuickReplyResponse])
-async def get_quick_replies(db: Database = Depends(get_db)):
+async def get_quick_replies(request: Request, db: Database = Depends(get_db)):
     """
     Get quick reply suggestions.
     """
-    # Sort JSON list by order field
-    quick_replies = sorted(db.quick_replies, key=lambda x: x.get("order", 0))
-    return quick_replies
+    # Sorted by order field and serialized once at load
+    payloads = db.payloads
+    return not_modified(request, payloads.etag) or precompressed(
+        request, payloads.quick_replies, payloads.etag, payloads.encoded("quick_replies")
+    )
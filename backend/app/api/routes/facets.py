@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+
+from app.core.database import get_db, Database
+from app.schemas import FacetsResponse
+
+router = APIRouter(prefix="/facets", tags=["facets"])
+
+
+@router.get("", response_model=FacetsResponse)
+async def get_facets(db: Database = Depends(get_db)):
+    """
+    Get article category, case year and case category counts in one response.
+    """
+    facets = db.facets
+    return {
+        "article_categories": [
+            {"name": name, "count": count} for name, count in facets.article_category_counts.items()
+        ],
+        "case_years": [
+            {"year": year, "count": count} for year, count in facets.case_year_counts.items()
+        ],
+        "case_categories": [
+            {"name": name, "count": count} for name, count in facets.case_category_counts.items()
+        ],
+    }
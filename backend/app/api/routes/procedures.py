@@ -1,52 +1,93 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from typing import List, Optional, Union
 
+from app.api.responses import json_bytes, keyset_page, not_modified, precompressed, resolve_ids
 from app.core.database import get_db, Database
-from app.schemas import ProcedureResponse
+from app.core.payloads import LIST_PAGE_SIZE
+from app.schemas import ProcedureResponse, ProcedureBatchResponse, ProcedurePage
 from app.models import Procedure
 
 router = APIRouter(prefix="/procedures", tags=["procedures"])
 
 
-@router.get("", response_model=List[ProcedureResponse])
+@router.get("", response_model=Union[List[ProcedureResponse], ProcedurePage])
 async def get_procedures(
+    request: Request,
     skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=100),
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Cursor pagination: empty for the first page, then the previous page's next_cursor"),
     db: Database = Depends(get_db)
 ):
     """
     Get all legal procedures with optional filtering and pagination.
+    With `search`, results are ranked by relevance.
+    The total number of matches is returned in the X-Total-Count header.
+    With `cursor`, pages are ordered by name and come as
+    {items, total, next_cursor}; a page costs the same at any depth.
+    Bodies are pre-serialized per data version and carry its ETag.
     """
-    all_procedures = db.procedures
+    payloads = db.payloads
+    unchanged = not_modified(request, payloads.etag)
+    if unchanged:
+        return unchanged
     
-    # 1. Search by keyword in name or description
+    # 1. Full-text search, ranked and paginated inside the index
     if search:
-        search_lower = search.lower()
-        all_procedures = [
-            p for p in all_procedures 
-            if search_lower in p.get("name", "").lower() or 
-               search_lower in p.get("description", "").lower()
-        ]
+        if cursor is not None:
+            raise HTTPException(status_code=422, detail="Search results are ranked by relevance; page them with skip")
+        page, total = db.procedure_search.search(search, skip, limit)
+        return json_bytes(payloads.page(payloads.procedures, page), payloads.etag, total)
     
-    # 2. Apply Pagination
+    # 2. Cursor pages walk a precomputed ordering; total is its size
+    if cursor is not None:
+        index = db.orderings.procedures
+        page, next_cursor = keyset_page(index, cursor, limit)
+        body = payloads.envelope(payloads.procedures, page, len(index), next_cursor)
+        return json_bytes(body, payloads.etag, len(index))
+    
+    # 3. Apply Pagination
     start = skip
     end = skip + limit
-    paginated_procedures = all_procedures[start:end]
-    
-    return paginated_procedures
+    total = len(payloads.procedures)
+    if start == 0 and limit == LIST_PAGE_SIZE:
+        # The default first page is a fixed body, stored precompressed
+        return precompressed(request, payloads.procedure_list, payloads.etag, payloads.encoded("procedure_list"), total)
+    return json_bytes(payloads.page(payloads.procedures[start:end]), payloads.etag, total)
+
+
+@router.get("/batch", response_model=ProcedureBatchResponse)
+async def get_procedures_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated procedure ids, e.g. public-interest-litigation-pil,writ-petitions"),
+    db: Database = Depends(get_db)
+):
+    """
+    Get several legal procedures in one request, in request order.
+    Unknown procedure ids are listed in `missing` instead of failing the request.
+    """
+    payloads = db.payloads
+    unchanged = not_modified(request, payloads.etag)
+    if unchanged:
+        return unchanged
+    positions, missing = resolve_ids(ids, db.procedure_position)
+    return json_bytes(payloads.batch(payloads.procedures, positions, missing), payloads.etag)
 
 
 @router.get("/{procedure_id}", response_model=ProcedureResponse)
 async def get_procedure(
+    request: Request,
     procedure_id: str,
     db: Database = Depends(get_db)
 ):
     """
     Get a specific legal procedure by ID.
     """
-    procedure = next((p for p in db.procedures if str(p.get("id")) == str(procedure_id)), None)
+    pos = db.procedure_position(procedure_id)
     
-    if not procedure:
+    if pos is None:
         raise HTTPException(status_code=404, detail="Procedure not found")
-    return procedure
+    payloads = db.payloads
+    return not_modified(request, payloads.etag) or precompressed(
+        request, payloads.procedures[pos], payloads.etag, payloads.encoded("procedures", pos)
+    )
@@ -0,0 +1,151 @@
+from typing import Callable, Dict, Iterator, List, Any, Sequence, Tuple
+
+from app.core.indexes import parse_year
+from app.core.matcher import ARTICLE, CASE, PROCEDURE
+
+RELATED_HEADER = "\n**Related Articles:**\n".encode("utf-8")
+
+# Answers are built from sections: a heading, then the body sections. The
+# prerendered answer is their concatenation, and the streaming chat
+# endpoint sends them one by one, sliced from it.
+
+
+def article_sections(article: Dict[str, Any]) -> List[str]:
+    return [
+        f"📜 **Article {article['number']}: {article['title']}**\n\n",
+        f"**Category:** {article['category']}\n\n",
+        f"**Description:**\n{article['description']}\n\n",
+    ]
+
+
+def render_article(article: Dict[str, Any]) -> str:
+    return "".join(article_sections(article))
+
+
+def render_related_line(article: Dict[str, Any]) -> str:
+    return f"• Article {article['number']}: {article['title']}\n"
+
+
+def case_sections(case: Dict[str, Any]) -> List[str]:
+    year = parse_year(case.get("year"))
+    key_points = "**Key Points:**\n"
+    for point in case.get("key_points", []):
+        key_points += f"• {point}\n"
+    return [
+        f"⚖️ **{case['name']}**\n\n",
+        f"**Year:** {case['year'] if year is None else year}\n\n",
+        f"**Significance:**\n{case['significance']}\n\n",
+        key_points,
+    ]
+
+
+def render_case(case: Dict[str, Any]) -> str:
+    return "".join(case_sections(case))
+
+
+def procedure_sections(procedure: Dict[str, Any]) -> List[str]:
+    return [
+        f"📋 **{procedure['name']}**\n\n",
+        f"**Description:**\n{procedure['description']}\n\n",
+        f"**Procedure:**\n{procedure['procedure']}\n\n",
+    ]
+
+
+def render_procedure(procedure: Dict[str, Any]) -> str:
+    return "".join(procedure_sections(procedure))
+
+
+def compile_answers(
+    entities: List[Dict[str, Any]], sections: Callable[[Dict[str, Any]], List[str]]
+) -> Tuple[List[bytes], List[int]]:
+    """
+    Prerendered answers, and for each one the byte offsets where its
+    sections after the heading start (every answer of a kind has as many).
+    """
+    bodies, breaks = [], []
+    for entity in entities:
+        parts = [section.encode("utf-8") for section in sections(entity)]
+        offset = 0
+        for part in parts[:-1]:
+            offset += len(part)
+            breaks.append(offset)
+        bodies.append(b"".join(parts))
+    return bodies, breaks
+
+
+class RenderedAnswers:
+    """
+    Chat answer bodies compiled once per entity at data load.
+    Every answer starts with an emoji outside the BMP, which would make a
+    Python str take 4 bytes per character, so fragments are kept as UTF-8
+    bytes and decoded once when an answer is assembled. Section offsets
+    let the streaming endpoint send an answer a section at a time.
+    """
+
+    def __init__(
+        self,
+        articles: List[Dict[str, Any]],
+        cases: List[Dict[str, Any]],
+        procedures: List[Dict[str, Any]],
+    ):
+        self.articles, self.article_breaks = compile_answers(articles, article_sections)
+        self.related_lines: Sequence[bytes] = [render_related_line(a).encode("utf-8") for a in articles]
+        self.cases, self.case_breaks = compile_answers(cases, case_sections)
+        self.procedures, self.procedure_breaks = compile_answers(procedures, procedure_sections)
+
+    @classmethod
+    def from_snapshot(cls, snapshot) -> "RenderedAnswers":
+        """Fragments read in place from a mapped data snapshot."""
+        answers = cls.__new__(cls)
+        answers.articles = snapshot.fragments("answers.articles")
+        answers.related_lines = snapshot.fragments("answers.related_lines")
+        answers.cases = snapshot.fragments("answers.cases")
+        answers.procedures = snapshot.fragments("answers.procedures")
+        answers.article_breaks = snapshot.array("answers.article_breaks")
+        answers.case_breaks = snapshot.array("answers.case_breaks")
+        answers.procedure_breaks = snapshot.array("answers.procedure_breaks")
+        return answers
+
+    def write_to(self, writer):
+        """Store the fragments in a data snapshot (see app.core.snapshot)."""
+        writer.fragments("answers.articles", self.articles)
+        writer.fragments("answers.related_lines", self.related_lines)
+        writer.fragments("answers.cases", self.cases)
+        writer.fragments("answers.procedures", self.procedures)
+        writer.array("answers.article_breaks", "I", self.article_breaks)
+        writer.array("answers.case_breaks", "I", self.case_breaks)
+        writer.array("answers.procedure_breaks", "I", self.procedure_breaks)
+
+    # Fragments are bytes or memoryviews of a snapshot; str() decodes either
+
+    def article(self, pos: int, related: List[int]) -> str:
+        """Article answer, with a related-articles block when there are any."""
+        if not related:
+            return str(self.articles[pos], "utf-8")
+        parts = [self.articles[pos], RELATED_HEADER]
+        parts.extend(self.related_lines[p] for p in related)
+        return b"".join(parts).decode("utf-8")
+
+    def case(self, pos: int) -> str:
+        return str(self.cases[pos], "utf-8")
+
+    def procedure(self, pos: int) -> str:
+        return str(self.procedures[pos], "utf-8")
+
+    def sections(self, kind: str, pos: int, related: Sequence[int] = ()) -> Iterator[str]:
+        """
+        An answer's heading, then its sections, each decoded only when the
+        consumer asks for it. Joined, they equal the assembled answer.
+        """
+        bodies, breaks = {
+            ARTICLE: (self.articles, self.article_breaks),
+            CASE: (self.cases, self.case_breaks),
+            PROCEDURE: (self.procedures, self.procedure_breaks),
+        }[kind]
+        body = bodies[pos]
+        per_answer = len(breaks) // len(bodies)
+        cuts = [0, *breaks[pos * per_answer:(pos + 1) * per_answer], len(body)]
+        for start, end in zip(cuts, cuts[1:]):
+            yield str(body[start:end], "utf-8")
+        if related:
+            yield b"".join([RELATED_HEADER, *(self.related_lines[p] for p in related)]).decode("utf-8")
@@ -0,0 +1,219 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; the cache stays local-only without it
+    aioredis = None
+
+# After a Redis error, skip the shared tier for this long before retrying
+REDIS_RETRY_SECONDS = 30
+
+
+def normalize_message(message: str) -> str:
+    """Case-fold and collapse whitespace, so near-identical questions share a key."""
+    return " ".join(message.lower().split())
+
+
+class LRUCache:
+    """Bounded in-process cache with least-recently-used eviction and a TTL."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Live entries among keys. Bulk reads leave the recency order and the
+        hit/miss counters alone, so a batch replay doesn't skew either.
+        """
+        found = {}
+        now = time.monotonic()
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            expires_at, value = entry
+            if expires_at < now:
+                del self._entries[key]
+                self.expirations += 1
+                continue
+            found[key] = value
+        return found
+
+    def set(self, key: str, value: Any):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Shared tier so several workers reuse each other's answers."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "chat:"):
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._client = aioredis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def _failed(self, e: Exception):
+        self.errors += 1
+        self._down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        print(f"[WARNING] Redis cache unavailable, using local cache only: {e}")
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self.available:
+            return None
+        try:
+            raw = await self._client.get(self.prefix + key)
+        except Exception as e:
+            self._failed(e)
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return raw.decode("utf-8")
+
+    async def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Entries among keys, in one round trip; like LRUCache.get_many, not counted as hits or misses."""
+        if not keys or not self.available:
+            return {}
+        try:
+            raws = await self._client.mget([self.prefix + key for key in keys])
+        except Exception as e:
+            self._failed(e)
+            return {}
+        return {key: raw.decode("utf-8") for key, raw in zip(keys, raws) if raw is not None}
+
+    async def set(self, key: str, value: str):
+        if not self.available:
+            return
+        try:
+            # Milliseconds, so a TTL under a second doesn't round down to 0 (rejected by Redis)
+            await self._client.set(self.prefix + key, value, px=max(1, int(self.ttl * 1000)))
+        except Exception as e:
+            self._failed(e)
+
+
+class ResponseCache:
+    """
+    Chat response cache: a local LRU in front of an optional Redis tier.
+    Values are serialized JSON response bodies, served without re-encoding.
+    Keys are bound to the data version, so reloading the data invalidates
+    every cached answer (the local tier is dropped, old Redis keys expire).
+    """
+
+    def __init__(self, max_size: int, ttl: float, backend: str = "local", redis_url: str = ""):
+        self.local = LRUCache(max_size, ttl)
+        self.shared: Optional[RedisBackend] = None
+        self._version: Optional[str] = None
+        if backend == "redis":
+            if aioredis is None:
+                print("[WARNING] CHAT_CACHE_BACKEND=redis but the redis package is not installed; using local cache")
+            else:
+                self.shared = RedisBackend(redis_url, ttl)
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            self.local.clear()
+            self._version = version
+
+    async def get(self, key: str, version: str) -> Optional[str]:
+        self._check_version(version)
+        value = self.local.get(key)
+        if value is None and self.shared is not None:
+            value = await self.shared.get(f"{version}:{key}")
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def get_many(self, keys: List[str], version: str) -> Dict[str, str]:
+        """
+        Cached bodies among keys, for batch requests. Neither tier counts
+        these lookups, and shared-tier answers are not copied into the local
+        tier, so a large batch leaves the stats and the hot entries alone.
+        """
+        self._check_version(version)
+        found = self.local.get_many(keys)
+        if self.shared is not None:
+            rest = [key for key in keys if key not in found]
+            shared = await self.shared.get_many([f"{version}:{key}" for key in rest])
+            prefix = len(version) + 1
+            found.update((key[prefix:], value) for key, value in shared.items())
+        return found
+
+    async def set(self, key: str, value: str, version: str):
+        self._check_version(version)
+        self.local.set(key, value)
+        if self.shared is not None:
+            await self.shared.set(f"{version}:{key}", value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "backend": "redis" if self.shared is not None else "local",
+            "size": len(self.local),
+            "max_size": self.local.max_size,
+            "ttl_seconds": self.local.ttl,
+            "hits": self.local.hits,
+            "misses": self.local.misses,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+        }
+        if self.shared is not None:
+            stats.update({
+                "shared_hits": self.shared.hits,
+                "shared_misses": self.shared.misses,
+                "shared_errors": self.shared.errors,
+                "shared_available": self.shared.available,
+            })
+        return stats
+
+
+# Global instance
+chat_cache = ResponseCache(
+    settings.CHAT_CACHE_SIZE,
+    settings.CHAT_CACHE_TTL,
+    settings.CHAT_CACHE_BACKEND,
+    settings.REDIS_URL,
+)
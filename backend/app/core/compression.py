@@ -0,0 +1,123 @@
+import gzip
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# The fixed bodies are compressed once per data version, at load, so they get
+# the slow, dense settings; everything else is compressed per response on the
+# event loop and uses faster levels
+PRECOMPRESSED_LEVELS = {"br": 11, "gzip": 9}
+DYNAMIC_LEVELS = {"br": 5, "gzip": 6}
+
+
+def supported_encodings() -> List[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding for an Accept-Encoding header (br over gzip), or None."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    best, best_q = None, 0.0
+    for encoding in supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, levels: Dict[str, int]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=levels["br"])
+    return gzip.compress(body, compresslevel=levels["gzip"], mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    gzip / brotli for complete responses of at least minimum_size bytes,
+    at the fast DYNAMIC_LEVELS. Routes serve the fixed per-version bodies
+    already compressed (see SerializedPayloads.encoded); those, and
+    streaming responses (more than one body chunk), pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept) if accept else None
+
+        start: Dict[str, Any] = {}
+        streaming = False
+
+        async def wrapped_send(message):
+            nonlocal streaming
+            if message["type"] == "http.response.start":
+                start.update(message)
+                return
+            if message["type"] != "http.response.body" or streaming:
+                await send(message)
+                return
+            if message.get("more_body", False):
+                # Streaming body: send as is
+                streaming = True
+                await send(start)
+                await send(message)
+                return
+            headers, body = self._encode(scope, start, message.get("body", b""), encoding)
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, wrapped_send)
+
+    def _encode(
+        self, scope, start: Dict[str, Any], body: bytes, encoding: Optional[str]
+    ) -> Tuple[List[Tuple[bytes, bytes]], bytes]:
+        headers = list(start.get("headers", []))
+        values = {name.lower(): value for name, value in headers}
+        content_type = values.get(b"content-type", b"").decode("latin-1")
+        if (start.get("status") != 200 or b"content-encoding" in values
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)):
+            return headers, body
+
+        headers.append((b"vary", b"Accept-Encoding"))
+        if encoding is None:
+            return headers, body
+
+        etag = values.get(b"etag")
+        compressed = compress(body, encoding, DYNAMIC_LEVELS)
+        headers = [(n, v) for n, v in headers if n.lower() not in (b"content-length", b"etag")]
+        headers.append((b"content-encoding", encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+        if etag is not None:
+            # Like nginx: a re-encoded body keeps only a weak validator, which
+            # If-None-Match still compares against the same version
+            headers.append((b"etag", weak_etag(etag)))
+        return headers, compressed
+
+
+def weak_etag(etag: bytes) -> bytes:
+    return etag if etag.startswith(b"W/") else b"W/" + etag
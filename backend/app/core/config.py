@@ -13,6 +13,53 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Chat response cache: "local" (per worker) or "redis" (shared via REDIS_URL)
+    CHAT_CACHE_BACKEND: str = "local"
+    CHAT_CACHE_SIZE: int = 1024
+    CHAT_CACHE_TTL: float = 3600  # seconds
+    
+    # Chat scoring runs in a thread pool, off the event loop
+    CHAT_POOL_WORKERS: int = 1  # threads share the GIL: more only compete with the event loop
+    CHAT_QUEUE_LIMIT: int = 64  # messages queued or running per worker; beyond it 503
+    CHAT_TIMEOUT: float = 5.0  # seconds before a message is answered with 503
+    
+    # Response compression (gzip, plus brotli when installed)
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies are sent as is
+    
+    # Map data/constitution_data.snapshot (scripts/build_snapshot.py) when it matches the data
+    DATA_SNAPSHOT: bool = True
+    
+    # Decoded long text fields (descriptions, procedures, explanations) kept per data version
+    TEXT_CACHE_SIZE: int = 256
+    # Records built from the snapshot's rows (chat candidates, related articles) kept per data version
+    RECORD_CACHE_SIZE: int = 512
+    
+    # Data hot reload: poll constitution_data.json every N seconds (0 = off)
+    DATA_RELOAD_INTERVAL: float = 0
+    # Seconds between checks for a reload requested through another worker (0 = off)
+    DATA_RELOAD_SYNC_INTERVAL: float = 1.0
+    # Names the marker file the workers of one server share for admin reloads;
+    # app.server sets one per master when empty, other setups leave sync off
+    DATA_RELOAD_GROUP: str = ""
+    
+    # Admin endpoints (/admin/...) require this token in X-Admin-Token; empty disables them
+    ADMIN_TOKEN: str = ""
+    
+    # Profiling (admin only): X-Profile: 1 runs a request under cProfile, and
+    # 1 in PROFILE_SAMPLE_EVERY chat messages feed a rolling flame graph (0 = off)
+    PROFILE_KEEP: int = 20  # request profiles kept
+    PROFILE_SAMPLE_EVERY: int = 0
+    PROFILE_SAMPLE_WINDOW: int = 200  # sampled chat messages in the flame graph
+    
+    # Production server (python -m app.server): gunicorn with uvicorn workers
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_WORKERS: int = 0  # 0 = one per CPU core
+    KEEP_ALIVE: int = 5  # seconds an idle connection is kept open
+    BACKLOG: int = 2048  # connections the kernel queues before accept
+    LIMIT_CONCURRENCY: int = 0  # per worker; excess connections get 503 (0 = unlimited)
+    GRACEFUL_TIMEOUT: int = 30  # seconds workers get to finish requests on restart
+    
     # AI APIs
     OPENAI_API_KEY: str = ""
     ANTHROPIC_API_KEY: str = ""
@@ -28,6 +75,9 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"
     
+    # Chatbot retrieval: "keyword" (weighted keyword overlap) or "tfidf" (vector similarity)
+    CHAT_RETRIEVAL_MODE: str = "keyword"
+    
     # API
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "Legal Advisory Platform API"
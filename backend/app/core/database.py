@@ -1,52 +1,396 @@
+import asyncio
+import hashlib
 import json
 import os
-from typing import Dict, List, Any
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import app.core.answers
+import app.core.compression
+import app.core.fulltext
+import app.core.fuzzy
+import app.core.indexes
+import app.core.matcher
+import app.core.payloads
+import app.core.snapshot
+import app.core.texts
+import app.models.records
+import app.schemas.legal
+from app.core.answers import RenderedAnswers
+from app.core.config import settings
+from app.core.fulltext import (
+    ARTICLE_FIELDS, CASE_FIELDS, PROCEDURE_FIELDS, FullTextIndex
+)
+from app.core.fuzzy import CaseNameIndex, SpellChecker, build_spell_checker
+from app.core.indexes import (
+    ArticleSearchIndex, FacetIndex, LookupIndex, SortIndex, assign_ids, normalize_article_number
+)
+from app.core.matcher import KeywordMatcher, build_entity_matcher
+from app.core.payloads import SerializedPayloads
+from app.core.snapshot import Snapshot, SnapshotWriter, open_snapshot, source_fingerprint
+from app.core.texts import TextStore
+from app.models.records import (
+    ArticleRecord, LandmarkCaseRecord, ProcedureRecord, map_records, validate_data, write_records
+)
+
+# Path to data file relative to this file
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_FILE = os.path.join(BASE_DIR, 'data', 'constitution_data.json')
+# Prebuilt indexes and response bodies for DATA_FILE, written by scripts/build_snapshot.py
+SNAPSHOT_FILE = os.path.join(BASE_DIR, 'data', 'constitution_data.snapshot')
+# Code that decides the snapshot's bytes: the section writers, and the schemas
+# and records behind the pre-serialized bodies
+SNAPSHOT_CODE = source_fingerprint([
+    app.core.answers, app.core.compression, app.core.fulltext, app.core.fuzzy, app.core.indexes,
+    app.core.matcher, app.core.payloads, app.core.snapshot, app.core.texts, app.models.records, app.schemas.legal,
+])
+# Entity collections of the data file, in their JSON names
+COLLECTIONS = ("articles", "landmark_cases", "procedures")
+
 
 class Database:
-    _instance = None
-    _data = None
+    """
+    One immutable, fully indexed version of the data file.
+    Nothing is mutated after construction, so a reload builds a new
+    instance and swaps it in while in-flight requests keep the old one.
+    The raw entries (articles, cases, procedures) keep their short fields
+    only; long text lives in texts and is decoded through the records.
+    From a snapshot, entries and records are decoded from it on access.
+    """
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(Database, cls).__new__(cls)
-            cls._instance._load_data()
-        return cls._instance
+    def __init__(self, data: Optional[Dict[str, Any]], version: str, snapshot: Optional[Snapshot] = None):
+        # Content hash of the file; caches and ETags key on it so edits invalidate them
+        self.version = version
+        self.snapshot = snapshot
+        self.texts = TextStore(settings.TEXT_CACHE_SIZE)
 
-    def _load_data(self):
-        """Load data from JSON file into memory."""
-        try:
-            # Path to data file relative to this file
-            base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-            data_file = os.path.join(base_dir, 'data', 'constitution_data.json')
-            
-            with open(data_file, 'r', encoding='utf-8') as f:
-                self._data = json.load(f)
-                
-            print(f"[SUCCESS] Loaded {len(self._data.get('articles', []))} articles from JSON")
-            print(f"[SUCCESS] Loaded {len(self._data.get('landmark_cases', []))} cases from JSON")
-            
-        except Exception as e:
-            print(f"[ERROR] Error loading data: {e}")
-            self._data = {"articles": [], "landmark_cases": [], "procedures": [], "quick_replies": []}
+        if snapshot is not None:
+            # Entries, records, indexes and response bodies stay in the
+            # mapped file: read in place and shared by every worker, so the
+            # data file is neither parsed nor validated again
+            self._data = {collection: snapshot.rows(f"data.{collection}") for collection in COLLECTIONS}
+            self._data["quick_replies"] = list(snapshot.rows("data.quick_replies"))
+            self._records = map_records(snapshot, self.texts, settings.RECORD_CACHE_SIZE)
+            self.lookup = LookupIndex.from_snapshot(snapshot, "lookup")
+            self.facets = FacetIndex.from_snapshot(snapshot, "facets")
+            self.orderings = SortIndex.from_snapshot(snapshot, "orderings")
+            self.article_search = FullTextIndex.from_snapshot(snapshot, "article_search")
+            self.case_search = FullTextIndex.from_snapshot(snapshot, "case_search")
+            self.procedure_search = FullTextIndex.from_snapshot(snapshot, "procedure_search")
+            self.article_index = ArticleSearchIndex.from_snapshot(snapshot, "article_index")
+            self.keyword_matcher = KeywordMatcher.from_snapshot(snapshot, "keyword_matcher")
+            self.spell_checker = SpellChecker.from_snapshot(snapshot, "spell_checker")
+            self.case_names = CaseNameIndex.from_snapshot(snapshot, "case_names")
+            self.answers = RenderedAnswers.from_snapshot(snapshot)
+            self.payloads = SerializedPayloads.from_snapshot(snapshot, self.version)
+            self.texts.map(snapshot)
+        else:
+            self._data = data
+
+            # Cases and procedures ship without ids; detail routes need one
+            assign_ids(self.cases, "name")
+            assign_ids(self.procedures, "name")
+
+            # Validate once; requests reuse these immutable records
+            self._records = validate_data(self._data, self.texts)
+            self.texts.load(self._data)
+
+            # Build every index once so requests never scan the full corpus
+            self.lookup = LookupIndex(self.articles, self.cases, self.procedures)
+            self.facets = FacetIndex(self.articles, self.cases)
+            self.orderings = SortIndex(self.articles, self.cases, self.procedures, self.facets)
+            self.article_search = FullTextIndex(self.articles, ARTICLE_FIELDS)
+            self.case_search = FullTextIndex(self.cases, CASE_FIELDS)
+            self.procedure_search = FullTextIndex(self.procedures, PROCEDURE_FIELDS)
+            self.article_index = ArticleSearchIndex(self.articles)
+            self.keyword_matcher = build_entity_matcher(self.articles, self.cases, self.procedures)
+            self.spell_checker = build_spell_checker(self.articles, self.cases, self.procedures)
+            self.case_names = CaseNameIndex(self.articles, self.cases, self.procedures)
+            self.answers = RenderedAnswers(self.articles, self.cases, self.procedures)
+            self.payloads = SerializedPayloads(
+                self.version, self.article_records, self.case_records, self.procedure_records,
+                self.quick_replies, self.facets.article_categories
+            )
+        self.vector_index = None
+        if settings.CHAT_RETRIEVAL_MODE == "tfidf":
+            from app.core.vectors import build_vector_index
+            self.vector_index = build_vector_index(
+                self.expanded("articles"), self.expanded("landmark_cases"), self.expanded("procedures")
+            )
+
+        if snapshot is None:
+            # Everything derived from the long text fields is built: the raw
+            # entries stop holding them, records decode them from self.texts
+            TextStore.strip(self._data)
+        self.texts.clear_cache()
+
+    @classmethod
+    def load(cls, data_file: str = DATA_FILE, snapshot_file: Optional[str] = SNAPSHOT_FILE) -> "Database":
+        """
+        Read and hash the data file. A snapshot built from the same file
+        version by the same code is mapped as is; otherwise the file is
+        parsed, validated and indexed in memory. Raises on read or parse
+        errors. Stale snapshots are left alone here (see
+        DataStore.refresh_snapshot and scripts/build_snapshot.py).
+        """
+        with open(data_file, 'rb') as f:
+            raw = f.read()
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        snapshot = open_snapshot(snapshot_file, version, SNAPSHOT_CODE) if snapshot_file else None
+        if snapshot is not None:
+            return cls(None, version, snapshot)
+        return cls(json.loads(raw.decode('utf-8')), version)
+
+    def write_snapshot(self, path: str = SNAPSHOT_FILE):
+        """Compile the entries, records, every index and response body into a snapshot file."""
+        writer = SnapshotWriter()
+        for collection in COLLECTIONS:
+            writer.rows(f"data.{collection}", self._data.get(collection, []))
+        writer.rows("data.quick_replies", self.quick_replies)
+        write_records(writer, self._records)
+        self.lookup.write_to(writer, "lookup")
+        self.facets.write_to(writer, "facets")
+        self.orderings.write_to(writer, "orderings")
+        self.article_search.write_to(writer, "article_search")
+        self.case_search.write_to(writer, "case_search")
+        self.procedure_search.write_to(writer, "procedure_search")
+        self.article_index.write_to(writer, "article_index")
+        self.keyword_matcher.write_to(writer, "keyword_matcher")
+        self.spell_checker.write_to(writer, "spell_checker")
+        self.case_names.write_to(writer, "case_names")
+        self.answers.write_to(writer)
+        self.payloads.write_to(writer)
+        self.texts.write_to(writer)
+        writer.write(path, self.version, SNAPSHOT_CODE)
+
+    @classmethod
+    def empty(cls) -> "Database":
+        return cls({"articles": [], "landmark_cases": [], "procedures": [], "quick_replies": []}, "empty")
 
     @property
-    def articles(self) -> List[Dict[str, Any]]:
+    def articles(self) -> Sequence[Dict[str, Any]]:
         return self._data.get('articles', [])
 
     @property
-    def cases(self) -> List[Dict[str, Any]]:
+    def cases(self) -> Sequence[Dict[str, Any]]:
         return self._data.get('landmark_cases', [])
 
     @property
-    def procedures(self) -> List[Dict[str, Any]]:
+    def procedures(self) -> Sequence[Dict[str, Any]]:
         return self._data.get('procedures', [])
 
     @property
     def quick_replies(self) -> List[Dict[str, Any]]:
         return self._data.get('quick_replies', [])
 
+    @property
+    def article_records(self) -> List[ArticleRecord]:
+        return self._records['articles']
+
+    @property
+    def case_records(self) -> List[LandmarkCaseRecord]:
+        return self._records['landmark_cases']
+
+    @property
+    def procedure_records(self) -> List[ProcedureRecord]:
+        return self._records['procedures']
+
+    def article_position(self, number: str) -> Optional[int]:
+        """Position of an article by number, case-insensitive (e.g. 21A vs 21a)."""
+        return self.lookup.articles_by_number.get(normalize_article_number(number))
+
+    def entry(self, collection: str, pos: int) -> Dict[str, Any]:
+        """One raw entry of a collection with its long text fields decoded back in."""
+        return self.texts.expand(collection, pos, self._data[collection][pos])
+
+    def get_article(self, number: str) -> Optional[Dict[str, Any]]:
+        pos = self.article_position(number)
+        return None if pos is None else self.entry("articles", pos)
+
+    def case_position(self, case_id: str) -> Optional[int]:
+        return self.lookup.cases_by_id.get(str(case_id))
+
+    def procedure_position(self, procedure_id: str) -> Optional[int]:
+        return self.lookup.procedures_by_id.get(str(procedure_id))
+
+    def get_case(self, case_id: str) -> Optional[Dict[str, Any]]:
+        pos = self.case_position(case_id)
+        return None if pos is None else self.entry("landmark_cases", pos)
+
+    def get_procedure(self, procedure_id: str) -> Optional[Dict[str, Any]]:
+        pos = self.procedure_position(procedure_id)
+        return None if pos is None else self.entry("procedures", pos)
+
+    def expanded(self, collection: str) -> List[Dict[str, Any]]:
+        """Every raw entry of a collection with its long text fields, for offline tools."""
+        return [self.entry(collection, pos) for pos in range(len(self._data.get(collection, [])))]
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def reload_marker_path() -> str:
+    """
+    File POST /admin/reload writes to reach every worker, named by
+    DATA_RELOAD_GROUP: the same for the workers of one server (app.server
+    sets it in the master before they fork) and for no other process.
+    """
+    return os.path.join(tempfile.gettempdir(), f"constitution-data-reload-{settings.DATA_RELOAD_GROUP}")
+
+
+def read_marker(path: str) -> Optional[str]:
+    """The data version announced in a reload marker, None if there is none."""
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+class DataStore:
+    """
+    Holds the current Database snapshot and swaps in new ones on reload.
+    Requests take the snapshot once (get_db), so each one sees a single
+    version even if a reload lands mid-request. Attribute access falls
+    through to the current snapshot (db.articles, db.version, ...).
+    """
+
+    def __init__(self, data_file: str = DATA_FILE):
+        self.data_file = data_file
+        self.snapshot_file = SNAPSHOT_FILE if settings.DATA_SNAPSHOT else None
+        self._signature = file_signature(data_file)
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+        self.last_reload: Optional[Dict[str, Any]] = None
+        # Seconds the current snapshot took to load (read, parse, index or map)
+        self.load_seconds = 0.0
+        try:
+            started = time.perf_counter()
+            self.current = Database.load(data_file, self.snapshot_file)
+            self.load_seconds = time.perf_counter() - started
+            print(f"[SUCCESS] Loaded {len(self.current.articles)} articles from JSON")
+            print(f"[SUCCESS] Loaded {len(self.current.cases)} cases from JSON")
+            if self.current.snapshot is not None:
+                print(f"[SUCCESS] Mapped entries, indexes and response bodies from {os.path.basename(self.snapshot_file)}")
+        except Exception as e:
+            print(f"[ERROR] Error loading data: {e}")
+            self.current = Database.empty()
+
+    def __getattr__(self, name: str):
+        if name == "current":
+            raise AttributeError(name)
+        return getattr(self.current, name)
+
+    def refresh_snapshot(self):
+        """
+        Rewrite a stale snapshot from the data just built in memory, for the
+        next start. Called once by the preloading master (app.server) and
+        never from request-serving workers; without one, run
+        scripts/build_snapshot.py.
+        """
+        if not self.snapshot_file or self.current.snapshot is not None or self.current.version == "empty":
+            return
+        if not os.path.exists(self.snapshot_file):
+            return
+        try:
+            self.current.write_snapshot(self.snapshot_file)
+            print(f"[SUCCESS] Rebuilt data snapshot {os.path.basename(self.snapshot_file)}")
+        except OSError as e:
+            print(f"[WARNING] Could not rebuild data snapshot {self.snapshot_file}: {e}")
+
+    async def reload(self) -> Dict[str, Any]:
+        """
+        Parse and index the data file in a worker thread, then swap it in.
+        On any error the current snapshot stays in place. Returns a report.
+        """
+        async with self._lock:
+            started = time.perf_counter()
+            self._signature = file_signature(self.data_file)
+            previous = self.current.version
+            try:
+                snapshot = await asyncio.to_thread(Database.load, self.data_file, self.snapshot_file)
+                loaded = time.perf_counter() - started
+            except Exception as e:
+                report = {
+                    "success": False,
+                    "version": previous,
+                    "error": f"{type(e).__name__}: {e}",
+                }
+                print(f"[ERROR] Data reload failed, still serving version {previous}: {e}")
+            else:
+                changed = snapshot.version != previous
+                if changed:
+                    # A single reference assignment: requests see the old or the new snapshot
+                    self.current = snapshot
+                    self.load_seconds = loaded
+                    self.reloads += 1
+                report = {
+                    "success": True,
+                    "changed": changed,
+                    "previous_version": previous,
+                    "version": self.current.version,
+                    "articles_count": len(self.current.articles),
+                    "cases_count": len(self.current.cases),
+                    "procedures_count": len(self.current.procedures),
+                }
+                if changed:
+                    print(f"[SUCCESS] Data reloaded: version {previous} -> {self.current.version}")
+                else:
+                    print(f"[SUCCESS] Data file unchanged (version {previous})")
+            report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            report["finished_at"] = datetime.now(timezone.utc).isoformat()
+            self.last_reload = report
+            return report
+
+    def announce_reload(self):
+        """Ask the other workers of this server to reload too (see watch_reloads)."""
+        marker = reload_marker_path()
+        tmp = f"{marker}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                f.write(f"{self.current.version}\n")
+            os.replace(tmp, marker)
+        except OSError as e:
+            print(f"[WARNING] Could not signal the other workers to reload: {e}")
+            return
+        # This worker has already reloaded
+        self._marker = self.current.version
+
+    async def watch_reloads(self, interval: float):
+        """
+        Reload whenever another worker announces a data version (see
+        announce_reload) that this one is not serving yet.
+        """
+        marker = reload_marker_path()
+        self._marker = read_marker(marker)
+        while True:
+            await asyncio.sleep(interval)
+            announced = read_marker(marker)
+            if announced is None or announced == self._marker:
+                continue
+            self._marker = announced
+            if announced != self.current.version:
+                await self.reload()
+
+    async def watch(self, interval: float):
+        """Poll the data file and reload whenever its mtime or size changes."""
+        while True:
+            await asyncio.sleep(interval)
+            if file_signature(self.data_file) != self._signature:
+                await self.reload()
+
+
 # Global instance
-db = Database()
+db = DataStore()
+
 
-def get_db():
-    return db
+def get_db() -> Database:
+    """The current snapshot, fixed for the rest of the request."""
+    return db.current
@@ -0,0 +1,191 @@
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers him his how i if
+in into is it its itself me more most my no nor not of off on once only or other
+our ours out over own same she should so some such than that the their theirs
+them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your yours
+""".split())
+
+# Searchable fields and their weights, per collection
+ARTICLE_FIELDS = {"number": 3.0, "title": 3.0, "keywords": 2.0, "category": 1.5, "description": 1.0}
+CASE_FIELDS = {
+    "name": 3.0, "keywords": 2.0, "significance": 1.5, "key_points": 1.5, "detailed_explanation": 1.0,
+}
+PROCEDURE_FIELDS = {"name": 3.0, "keywords": 2.0, "description": 1.5, "procedure": 1.0}
+
+# Score share of a term the last query word only matches as a prefix, so the
+# word itself ("21") outranks its completions ("214", "21a")
+PREFIX_WEIGHT = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; punctuation is a separator."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def stem(token: str) -> str:
+    """Light suffix stripper: plurals, -ing/-ed and -al (constitutional -> constitution)."""
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("sses"):
+        return token[:-2]
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+    if token.endswith("al") and len(token) > 6:
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Tokenize, drop stopwords and stem."""
+    return [stem(t) for t in tokenize(text) if t not in STOPWORDS]
+
+
+class FullTextIndex:
+    """
+    In-process BM25 index over one collection, built once at data load.
+    Field weights scale term frequencies (a simplified BM25F), so a title hit
+    outranks the same word deep in a long explanation.
+    """
+
+    def __init__(self, entities: List[Dict[str, Any]], fields: Dict[str, float]):
+        self.size = len(entities)
+        postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        lengths: List[float] = []
+
+        for pos, entity in enumerate(entities):
+            length = 0.0
+            for field, weight in fields.items():
+                value = entity.get(field)
+                if value is None:
+                    continue
+                text = " ".join(value) if isinstance(value, list) else str(value)
+                for term in analyze(text):
+                    doc_terms = postings[term]
+                    doc_terms[pos] = doc_terms.get(pos, 0.0) + weight
+                    length += weight
+            lengths.append(length)
+
+        avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        # Per-document length normalisation, folded in once
+        self._norms = [
+            K1 * (1 - B + B * (length / avg_length)) if avg_length else K1
+            for length in lengths
+        ]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {
+            term: sorted(docs.items()) for term, docs in postings.items()
+        }
+        self._idf: Dict[str, float] = {
+            term: math.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self._postings.items()
+        }
+        # Sorted vocabulary for prefix expansion of the last query word
+        self._vocabulary: List[str] = sorted(self._postings)
+
+    def write_to(self, writer, name: str):
+        """Store the index in a data snapshot (see app.core.snapshot)."""
+        writer.postings(f"{name}.postings", self._postings, weighted=True)
+        writer.values(f"{name}.idf", self._idf, "d")
+        writer.array(f"{name}.norms", "d", self._norms)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "FullTextIndex":
+        """The index read in place from a mapped data snapshot."""
+        index = cls.__new__(cls)
+        index._postings = snapshot.postings(f"{name}.postings")
+        index._idf = snapshot.values(f"{name}.idf")
+        index._norms = snapshot.array(f"{name}.norms")
+        # The postings keys are the sorted vocabulary
+        index._vocabulary = snapshot.strings(f"{name}.postings.keys")
+        index.size = len(index._norms)
+        return index
+
+    def _expand_prefix(self, token: str) -> List[Tuple[str, float]]:
+        """The word itself at full weight, then every completion at PREFIX_WEIGHT."""
+        stemmed = stem(token)
+        exact = {token, stemmed}
+        terms = [(term, 1.0) for term in dict.fromkeys((token, stemmed)) if term in self._postings]
+        i = bisect_left(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            if self._vocabulary[i] not in exact:
+                terms.append((self._vocabulary[i], PREFIX_WEIGHT))
+            i += 1
+        return terms
+
+    def _query_groups(self, query: str) -> List[List[Tuple[str, float]]]:
+        """
+        One group of alternative (index term, weight) pairs per query word,
+        stopwords dropped. The last word also matches as a prefix so
+        search-as-you-type ("educ") keeps working.
+        """
+        tokens = [token for token in tokenize(query) if token not in STOPWORDS]
+        groups = [[(stem(token), 1.0)] for token in tokens[:-1]]
+        if tokens:
+            groups.append(self._expand_prefix(tokens[-1]))
+        return groups
+
+    def _score(self, groups: List[List[Tuple[str, float]]], require_all: bool,
+               within: Optional[Set[int]]) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        hits: Dict[int, int] = defaultdict(int)
+        norms = self._norms
+        for group in groups:
+            seen = set()
+            for term, weight in group:
+                idf = self._idf.get(term)
+                if idf is None:
+                    continue
+                for pos, tf in self._postings[term]:
+                    if within is not None and pos not in within:
+                        continue
+                    scores[pos] += weight * idf * tf * (K1 + 1) / (tf + norms[pos])
+                    seen.add(pos)
+            for pos in seen:
+                hits[pos] += 1
+        if require_all:
+            return {pos: score for pos, score in scores.items() if hits[pos] == len(groups)}
+        return scores
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = 50,
+        within: Optional[Set[int]] = None,
+    ) -> Tuple[List[int], int]:
+        """
+        Rank documents for a query.
+        Every query word must match; if that finds nothing, any word may match.
+        Returns (positions for the requested page in relevance order, total matches).
+        Only the top offset + limit entries are ever sorted.
+        """
+        groups = self._query_groups(query)
+        if not groups:
+            return [], 0
+
+        scores = self._score(groups, True, within)
+        if not scores and len(groups) > 1:
+            scores = self._score(groups, False, within)
+
+        top = heapq.nsmallest(offset + limit, scores.items(), key=lambda x: (-x[1], x[0]))
+        return [pos for pos, _ in top[offset:]], len(scores)
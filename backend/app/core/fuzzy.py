@@ -0,0 +1,215 @@
+import re
+from collections import Counter
+from typing import Collection, Dict, List, Any, Mapping, Optional, Set
+
+from app.core.fulltext import STOPWORDS
+from app.core.matcher import CASE_TRIGGERS, PROCEDURE_TRIGGERS
+
+# Like SymSpell, deletes are generated from a word prefix only; candidates
+# are then verified against the full word
+PREFIX_LENGTH = 7
+MAX_DISTANCE = 2
+
+# Generic words in case names ("Union of India") that identify no single case
+_NAME_NOISE = frozenset({"union", "india", "state", "justice"})
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_VERSUS_RE = re.compile(r"\s+vs?\.?\s+")
+
+
+def max_distance(word: str) -> int:
+    """
+    Edit budget by word length: short words are left alone, and from six
+    letters two edits are allowed ("artical" -> "article" is two).
+    """
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 6 else MAX_DISTANCE
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance; returns limit + 1 once it is exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[len(b)]
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    results = set()
+    frontier = {word[:PREFIX_LENGTH]}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+class SpellChecker:
+    """
+    SymSpell-style corrector: every dictionary word is indexed under all of
+    its deletions (up to MAX_DISTANCE), so a lookup only generates deletions
+    of the query word and verifies the few words that share one.
+    """
+
+    def __init__(self, dictionary: Counter, known: Set[str]):
+        self.frequencies: Mapping[str, int] = dictionary
+        self.known: Collection[str] = known | set(dictionary)
+        deletes: Dict[str, List[str]] = {}
+        for word in dictionary:
+            prefix = word[:PREFIX_LENGTH]
+            deletes.setdefault(prefix, []).append(word)
+            for variant in _deletes(word, MAX_DISTANCE):
+                deletes.setdefault(variant, []).append(word)
+        self._deletes: Mapping[str, List[str]] = deletes
+
+    def write_to(self, writer, name: str):
+        """Store the checker in a data snapshot (see app.core.snapshot)."""
+        words = sorted(self.frequencies)
+        writer.values(f"{name}.frequencies", self.frequencies, "I")
+        writer.postings(f"{name}.deletes", self._deletes, labels={w: i for i, w in enumerate(words)})
+        writer.strings(f"{name}.known", sorted(self.known))
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "SpellChecker":
+        """The checker read in place from a mapped data snapshot."""
+        checker = cls.__new__(cls)
+        checker.frequencies = snapshot.values(f"{name}.frequencies")
+        # Delete postings hold ids into the sorted dictionary words
+        words = snapshot.strings(f"{name}.frequencies.keys")
+        checker._deletes = snapshot.postings(f"{name}.deletes", labels=words)
+        checker.known = snapshot.strings(f"{name}.known")
+        return checker
+
+    def lookup(self, word: str) -> Optional[str]:
+        """Closest dictionary word within the edit budget, most frequent on ties."""
+        limit = max_distance(word)
+        if limit == 0:
+            return None
+        candidates = set()
+        prefix = word[:PREFIX_LENGTH]
+        for key in _deletes(word, limit) | {prefix}:
+            candidates.update(self._deletes.get(key, ()))
+
+        best, best_key = None, None
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            key = (distance, -self.frequencies[candidate], candidate)
+            if best_key is None or key < best_key:
+                best, best_key = candidate, key
+        return best
+
+    def correct(self, text: str) -> str:
+        """
+        Lowercase text with every unknown alphabetic word replaced by its
+        correction ("artcle 21a" -> "article 21a"). Known words, numbers and
+        short words are kept as typed.
+        """
+        def replace(match):
+            word = match.group(0)
+            if word in self.known or not word.isalpha():
+                return word
+            return self.lookup(word) or word
+
+        return _WORD_RE.sub(replace, text.lower())
+
+
+def build_spell_checker(
+    articles: List[Dict[str, Any]],
+    cases: List[Dict[str, Any]],
+    procedures: List[Dict[str, Any]],
+) -> SpellChecker:
+    """
+    Corrections target keywords, case names, article titles and the chat
+    trigger words. Every other word in the corpus is "known" so it is never
+    rewritten.
+    """
+    dictionary: Counter = Counter()
+    known: Set[str] = set(STOPWORDS)
+
+    def words(value) -> List[str]:
+        text = " ".join(value) if isinstance(value, list) else str(value or "")
+        return _WORD_RE.findall(text.lower())
+
+    for trigger in PROCEDURE_TRIGGERS + CASE_TRIGGERS + ["article"]:
+        dictionary.update(words(trigger))
+    for article in articles:
+        dictionary.update(words(article.get("keywords")) + words(article.get("title")) + words(article.get("category")))
+        known.update(words(article.get("number")) + words(article.get("description")))
+    for case in cases:
+        dictionary.update(words(case.get("keywords")) + words(case.get("name")))
+        for field in ("significance", "detailed_explanation", "key_points"):
+            known.update(words(case.get(field)))
+    for procedure in procedures:
+        dictionary.update(words(procedure.get("keywords")) + words(procedure.get("name")))
+        for field in ("description", "procedure"):
+            known.update(words(procedure.get(field)))
+
+    # Only alphabetic words can be correction targets
+    dictionary = Counter({w: n for w, n in dictionary.items() if w.isalpha() and w not in STOPWORDS})
+    return SpellChecker(dictionary, known)
+
+
+class CaseNameIndex:
+    """
+    Petitioner-side words that appear in exactly one case name
+    ("kesavananda", "vishaka"), mapped to that case's position, so a bare
+    party name finds its case. Respondents ("State of Kerala") and ordinary
+    words used elsewhere in the corpus are skipped.
+    """
+
+    def __init__(
+        self,
+        articles: List[Dict[str, Any]],
+        cases: List[Dict[str, Any]],
+        procedures: List[Dict[str, Any]],
+    ):
+        common: Set[str] = set(STOPWORDS) | _NAME_NOISE
+        for entity in articles + procedures:
+            for value in entity.values():
+                text = " ".join(value) if isinstance(value, list) else str(value)
+                common.update(_WORD_RE.findall(text.lower()))
+
+        owners: Dict[str, Set[int]] = {}
+        for pos, case in enumerate(cases):
+            petitioner = _VERSUS_RE.split(case.get("name", "").lower(), 1)[0]
+            for word in _WORD_RE.findall(petitioner):
+                if len(word) >= 4 and word.isalpha() and word not in common:
+                    owners.setdefault(word, set()).add(pos)
+        self.words: Mapping[str, int] = {
+            word: next(iter(positions)) for word, positions in owners.items() if len(positions) == 1
+        }
+
+    def write_to(self, writer, name: str):
+        """Store the index in a data snapshot (see app.core.snapshot)."""
+        writer.values(f"{name}.words", self.words, "I")
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "CaseNameIndex":
+        """The index read in place from a mapped data snapshot."""
+        index = cls.__new__(cls)
+        index.words = snapshot.values(f"{name}.words")
+        return index
+
+    def find(self, text: str) -> Optional[int]:
+        """Position of the case named by the first distinctive word in text."""
+        for word in _WORD_RE.findall(text.lower()):
+            if word in self.words:
+                return self.words[word]
+        return None
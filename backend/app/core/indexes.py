@@ -0,0 +1,358 @@
+import bisect
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Any, Mapping, Optional, Sequence, Tuple
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and whitespace-split text, the same way the chat scorer does."""
+    return text.lower().split()
+
+
+def normalize_article_number(number: str) -> str:
+    """Case-insensitive article number key, e.g. "21A" and " 21a" -> "21a"."""
+    return str(number).strip().lower()
+
+
+def entity_id(entity: Dict[str, Any]) -> Optional[str]:
+    """String form of an entity's id, accepting the Mongo style `_id` too."""
+    value = entity.get("id", entity.get("_id"))
+    return None if value is None else str(value)
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def assign_ids(entities: List[Dict[str, Any]], name_field: str):
+    """
+    Give every entity without an id a stable one derived from its name,
+    e.g. "kesavananda-bharati-v-state-of-kerala-1973". Clashing names get a
+    numeric suffix. Ids do not depend on position, so reordering the JSON
+    file keeps them stable.
+    """
+    taken = {entity_id(e) for e in entities if entity_id(e) is not None}
+    for entity in entities:
+        if entity_id(entity) is not None:
+            continue
+        base = slugify(entity.get(name_field, "")) or "item"
+        candidate, suffix = base, 2
+        while candidate in taken:
+            candidate = f"{base}-{suffix}"
+            suffix += 1
+        entity["id"] = candidate
+        taken.add(candidate)
+
+
+class LookupIndex:
+    """Primary-key hash maps (key -> corpus position) used by the detail endpoints."""
+
+    def __init__(
+        self,
+        articles: List[Dict[str, Any]],
+        cases: List[Dict[str, Any]],
+        procedures: List[Dict[str, Any]],
+    ):
+        # First entry wins on duplicates, matching the old linear scans
+        self.articles_by_number: Dict[str, int] = {}
+        for pos, article in enumerate(articles):
+            self.articles_by_number.setdefault(normalize_article_number(article.get("number", "")), pos)
+
+        self.cases_by_id: Dict[str, int] = {}
+        for pos, case in enumerate(cases):
+            self.cases_by_id.setdefault(entity_id(case), pos)
+
+        self.procedures_by_id: Dict[str, int] = {}
+        for pos, procedure in enumerate(procedures):
+            self.procedures_by_id.setdefault(entity_id(procedure), pos)
+
+    def write_to(self, writer, name: str):
+        """Store the maps in a data snapshot (see app.core.snapshot)."""
+        writer.values(f"{name}.articles_by_number", self.articles_by_number, "I")
+        writer.values(f"{name}.cases_by_id", self.cases_by_id, "I")
+        writer.values(f"{name}.procedures_by_id", self.procedures_by_id, "I")
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "LookupIndex":
+        """The maps read in place from a mapped data snapshot."""
+        index = cls.__new__(cls)
+        index.articles_by_number = snapshot.values(f"{name}.articles_by_number")
+        index.cases_by_id = snapshot.values(f"{name}.cases_by_id")
+        index.procedures_by_id = snapshot.values(f"{name}.procedures_by_id")
+        return index
+
+
+class ArticleSearchIndex:
+    """
+    Inverted index over articles, built once at data load.
+    Postings map a token to article positions in ``Database.articles`` so
+    scoring only touches candidate articles. Keywords and categories are
+    matched by ``KeywordMatcher`` instead.
+    """
+
+    def __init__(self, articles: List[Dict[str, Any]]):
+        self.size = len(articles)
+
+        # Postings
+        number_postings: Dict[str, List[int]] = defaultdict(list)
+        title_postings: Dict[str, List[int]] = defaultdict(list)
+        description_postings: Dict[str, List[int]] = defaultdict(list)
+
+        for pos, article in enumerate(articles):
+            number_postings[article.get("number", "").lower()].append(pos)
+            for token in set(tokenize(article.get("title", ""))):
+                title_postings[token].append(pos)
+            for token in set(tokenize(article.get("description", ""))):
+                description_postings[token].append(pos)
+
+        # Freeze into plain dicts so lookups of unknown tokens don't grow them
+        self.number_postings: Mapping[str, Sequence[int]] = dict(number_postings)
+        self.title_postings: Mapping[str, Sequence[int]] = dict(title_postings)
+        self.description_postings: Mapping[str, Sequence[int]] = dict(description_postings)
+
+    def write_to(self, writer, name: str):
+        """Store the index in a data snapshot (see app.core.snapshot)."""
+        writer.array(f"{name}.size", "I", [self.size])
+        writer.postings(f"{name}.number", self.number_postings)
+        writer.postings(f"{name}.title", self.title_postings)
+        writer.postings(f"{name}.description", self.description_postings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "ArticleSearchIndex":
+        """The index read in place from a mapped data snapshot."""
+        index = cls.__new__(cls)
+        index.size = snapshot.array(f"{name}.size")[0]
+        index.number_postings = snapshot.postings(f"{name}.number")
+        index.title_postings = snapshot.postings(f"{name}.title")
+        index.description_postings = snapshot.postings(f"{name}.description")
+        return index
+
+
+def parse_year(value: Any) -> Optional[int]:
+    """Case years are stored as strings in the JSON file; normalise to int."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FacetIndex:
+    """
+    Category and year postings with counts, so list filters and the facets
+    endpoint are dictionary lookups instead of per-request scans.
+    """
+
+    def __init__(self, articles: List[Dict[str, Any]], cases: List[Dict[str, Any]]):
+        # Article positions per category, in corpus order
+        self.articles_by_category: Dict[str, List[int]] = defaultdict(list)
+        for pos, article in enumerate(articles):
+            if article.get("category"):
+                self.articles_by_category[article["category"]].append(pos)
+        self.articles_by_category = dict(self.articles_by_category)
+        self.article_categories: List[str] = sorted(self.articles_by_category)
+        self.article_category_counts: Dict[str, int] = {
+            category: len(self.articles_by_category[category]) for category in self.article_categories
+        }
+
+        # Case positions per year and counts per case category
+        self.cases_by_year: Dict[int, List[int]] = defaultdict(list)
+        case_categories: Dict[str, int] = defaultdict(int)
+        for pos, case in enumerate(cases):
+            year = parse_year(case.get("year"))
+            if year is not None:
+                self.cases_by_year[year].append(pos)
+            if case.get("category"):
+                case_categories[case["category"]] += 1
+        self.cases_by_year = dict(self.cases_by_year)
+        self.case_year_counts: Dict[int, int] = {
+            year: len(self.cases_by_year[year]) for year in sorted(self.cases_by_year)
+        }
+        self.case_category_counts: Dict[str, int] = {
+            category: case_categories[category] for category in sorted(case_categories)
+        }
+
+    def write_to(self, writer, name: str):
+        """Store the postings in a data snapshot (see app.core.snapshot); years are keyed as strings."""
+        writer.postings(f"{name}.articles_by_category", self.articles_by_category)
+        writer.postings(f"{name}.cases_by_year", {str(year): ps for year, ps in self.cases_by_year.items()})
+        writer.values(f"{name}.case_category_counts", self.case_category_counts, "I")
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "FacetIndex":
+        """The postings read in place from a mapped data snapshot; counts are derived from them."""
+        index = cls.__new__(cls)
+        index.articles_by_category = snapshot.postings(f"{name}.articles_by_category")
+        index.article_categories = list(index.articles_by_category)
+        index.article_category_counts = {
+            category: len(index.articles_by_category[category]) for category in index.article_categories
+        }
+        by_year = snapshot.postings(f"{name}.cases_by_year")
+        index.cases_by_year = {int(year): by_year[year] for year in by_year}
+        index.case_year_counts = {year: len(index.cases_by_year[year]) for year in sorted(index.cases_by_year)}
+        index.case_category_counts = dict(snapshot.values(f"{name}.case_category_counts"))
+        return index
+
+
+def article_sort_key(number: str) -> Tuple[int, int, str]:
+    """Constitutional order: 21 < 21A < 22 < 243ZG; numbers without digits go last."""
+    key = normalize_article_number(number)
+    match = re.match(r"^(\d+)(.*)$", key)
+    if match:
+        return (0, int(match.group(1)), match.group(2))
+    return (1, 0, key)
+
+
+# Types of each ordering's sort keys; cursors are checked against them
+ARTICLE_KEY = (int, int, str, int)
+CASE_KEY = (bool, int, str, int)
+PROCEDURE_KEY = (str, int)
+
+
+class SortKeys(Sequence):
+    """The keys of a mapped ordering, in its order: each position's stored key, decoded on access."""
+
+    def __init__(self, keys: Sequence[list], positions: Sequence[int]):
+        self._keys = keys
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, index: int) -> tuple:
+        return tuple(self._keys[self._positions[index]])
+
+
+class KeysetIndex:
+    """
+    Positions sorted by a key, for cursor pagination: the page after a
+    cursor (the last key a client saw) is a bisect and a slice, so deep
+    pages cost the same as the first one. Keys end in the corpus position,
+    which makes them unique. The name (e.g. "articles/category/Fundamental
+    Rights") and key types let cursors be checked against the ordering
+    they were issued for.
+    """
+
+    def __init__(self, keys: Sequence[tuple], positions: Optional[Iterable[int]] = None,
+                 name: str = "", key_types: Tuple[type, ...] = ()):
+        if positions is None:
+            positions = range(len(keys))
+        self.positions: Sequence[int] = sorted(positions, key=keys.__getitem__)
+        self.keys: Sequence[tuple] = [keys[pos] for pos in self.positions]
+        self.name = name
+        self.key_types = key_types
+
+    @classmethod
+    def mapped(cls, keys: Sequence[list], positions: Sequence[int],
+               name: str, key_types: Tuple[type, ...]) -> "KeysetIndex":
+        """An ordering read from a data snapshot: sorted positions plus the keys by position."""
+        index = cls.__new__(cls)
+        index.positions = positions
+        index.keys = SortKeys(keys, positions)
+        index.name = name
+        index.key_types = key_types
+        return index
+
+    def accepts(self, key: tuple) -> bool:
+        """Whether key has this ordering's shape: its length and, exactly, its types."""
+        return len(key) == len(self.key_types) and all(type(v) is t for v, t in zip(key, self.key_types))
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def page(self, after: Optional[tuple], limit: int) -> Tuple[List[int], Optional[tuple]]:
+        """
+        Up to limit positions following the key `after` (from the start if
+        None), and the key to resume from, or None on the last page. Check
+        `after` with accepts() first.
+        """
+        start = 0 if after is None else bisect.bisect_right(self.keys, after)
+        end = start + limit
+        return self.positions[start:end], self.keys[end - 1] if end < len(self.keys) else None
+
+
+class SortIndex:
+    """
+    Stable orderings for cursor pagination: articles by number, cases by
+    year then name, procedures by name, plus one ordering per list filter
+    (article category, case year).
+    """
+
+    def __init__(
+        self,
+        articles: List[Dict[str, Any]],
+        cases: List[Dict[str, Any]],
+        procedures: List[Dict[str, Any]],
+        facets: FacetIndex,
+    ):
+        article_keys = [
+            article_sort_key(article.get("number", "")) + (pos,) for pos, article in enumerate(articles)
+        ]
+        self.articles = KeysetIndex(article_keys, None, "articles", ARTICLE_KEY)
+        self.articles_by_category: Dict[str, KeysetIndex] = {
+            category: KeysetIndex(article_keys, positions, f"articles/category/{category}", ARTICLE_KEY)
+            for category, positions in facets.articles_by_category.items()
+        }
+
+        # Cases without a year sort after every dated one
+        case_keys = []
+        for pos, case in enumerate(cases):
+            year = parse_year(case.get("year"))
+            case_keys.append((year is None, year or 0, str(case.get("name", "")).lower(), pos))
+        self.cases = KeysetIndex(case_keys, None, "cases", CASE_KEY)
+        self.cases_by_year: Dict[int, KeysetIndex] = {
+            year: KeysetIndex(case_keys, positions, f"cases/year/{year}", CASE_KEY)
+            for year, positions in facets.cases_by_year.items()
+        }
+
+        self.procedures = KeysetIndex([
+            (str(procedure.get("name", "")).lower(), pos) for pos, procedure in enumerate(procedures)
+        ], None, "procedures", PROCEDURE_KEY)
+        # Unknown filter values page through nothing
+        self.empty = KeysetIndex([], None, "empty")
+
+    @staticmethod
+    def _keys_by_position(index: KeysetIndex) -> List[tuple]:
+        keys = [()] * len(index)
+        for key, pos in zip(index.keys, index.positions):
+            keys[pos] = key
+        return keys
+
+    def write_to(self, writer, name: str):
+        """
+        Store the orderings in a data snapshot (see app.core.snapshot): each
+        collection's keys by position once, and the sorted positions of
+        every ordering over it.
+        """
+        for collection, index in (("articles", self.articles), ("cases", self.cases), ("procedures", self.procedures)):
+            writer.rows(f"{name}.{collection}.keys", self._keys_by_position(index))
+            writer.array(f"{name}.{collection}.positions", "I", index.positions)
+        writer.postings(f"{name}.articles_by_category", {
+            category: index.positions for category, index in self.articles_by_category.items()
+        })
+        writer.postings(f"{name}.cases_by_year", {
+            str(year): index.positions for year, index in self.cases_by_year.items()
+        })
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "SortIndex":
+        """The orderings read in place from a mapped data snapshot."""
+        index = cls.__new__(cls)
+        keys = {}
+        for collection, key_types in (("articles", ARTICLE_KEY), ("cases", CASE_KEY), ("procedures", PROCEDURE_KEY)):
+            keys[collection] = snapshot.rows(f"{name}.{collection}.keys")
+            positions = snapshot.array(f"{name}.{collection}.positions")
+            setattr(index, collection, KeysetIndex.mapped(keys[collection], positions, collection, key_types))
+        by_category = snapshot.postings(f"{name}.articles_by_category")
+        index.articles_by_category = {
+            category: KeysetIndex.mapped(
+                keys["articles"], by_category[category], f"articles/category/{category}", ARTICLE_KEY
+            )
+            for category in by_category
+        }
+        by_year = snapshot.postings(f"{name}.cases_by_year")
+        index.cases_by_year = {
+            int(year): KeysetIndex.mapped(keys["cases"], by_year[year], f"cases/year/{year}", CASE_KEY)
+            for year in by_year
+        }
+        index.empty = KeysetIndex([], None, "empty")
+        return index
@@ -0,0 +1,228 @@
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Any, Iterable, Sequence, Tuple
+
+# Owner kinds attached to each pattern
+ARTICLE = "article"
+CATEGORY = "category"
+CASE = "case"
+PROCEDURE = "procedure"
+
+# Snapshots store owner kinds as indexes into this tuple
+KINDS = (ARTICLE, CATEGORY, CASE, PROCEDURE)
+
+# Words that make the chatbot look for a procedure or a landmark case
+PROCEDURE_TRIGGERS = ['how to', 'procedure', 'process', 'file', 'filing']
+CASE_TRIGGERS = ['case', 'judgment', 'judgement', 'kesavananda', 'maneka', 'puttaswamy']
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a fixed set of patterns.
+    Each pattern carries the list of owners it was registered for, so one
+    pass over the message yields every matched keyword and its entities.
+    Patterns match anywhere, as substrings, and are compared as given:
+    callers fold the ones that should match case-insensitively.
+    """
+
+    # Set on automata read from a snapshot (see from_snapshot)
+    _edge_starts = None
+
+    def __init__(self, patterns: Iterable[Tuple[str, Any]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self.patterns: List[str] = []
+        self.owners: List[List[Any]] = []
+
+        pattern_ids: Dict[str, int] = {}
+        for pattern, owner in patterns:
+            if pattern not in pattern_ids:
+                pattern_ids[pattern] = len(self.patterns)
+                self.patterns.append(pattern)
+                self.owners.append([])
+                self._insert(pattern, pattern_ids[pattern])
+            self.owners[pattern_ids[pattern]].append(owner)
+
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, pattern_id: int):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] += (pattern_id,)
+
+    def _build_failure_links(self):
+        # Breadth-first so a state's failure target is always finished first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def match(self, text: str) -> Dict[str, List[Any]]:
+        """
+        Scan text once.
+        Returns matched pattern -> owners, in pattern registration order.
+        """
+        if self._edge_starts is not None:
+            return self._match_compiled(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(out[0])
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found.update(out[state])
+        return {self.patterns[i]: self.owners[i] for i in sorted(found)}
+
+    def _match_compiled(self, text: str) -> Dict[str, List[Any]]:
+        # Root transitions are a dense row; other states keep their edges
+        # sorted by character code and are searched by bisection
+        alphabet, root = self._alphabet, self._root
+        starts, chars, targets, fail = self._edge_starts, self._edge_chars, self._edge_targets, self._fail
+        out_starts, out = self._out_starts, self._out_ids
+        found = set(out[out_starts[0]:out_starts[1]])
+        state = 0
+        for ch in text:
+            code = alphabet.get(ch, 0)
+            if not code:
+                # No pattern has this character: every failure chain ends at the root
+                state = 0
+            while state:
+                lo, hi = starts[state], starts[state + 1]
+                # Most states inside a pattern have a single edge
+                i = lo if hi - lo == 1 else bisect_left(chars, code, lo, hi)
+                if i < hi and chars[i] == code:
+                    state = targets[i]
+                    break
+                state = fail[state]
+            else:
+                state = root[code]
+            first, last = out_starts[state], out_starts[state + 1]
+            if first != last:
+                found.update(out[first:last])
+        return {self.patterns[i]: self.owners[i] for i in sorted(found)}
+
+    def write_to(self, writer, name: str):
+        """
+        Store the automaton in a data snapshot (see app.core.snapshot):
+        the goto edges as CSR arrays of (character code, target) pairs per
+        state, sorted by code, plus the failure links and a dense row for
+        the root, where most characters land. Codes index the patterns'
+        alphabet from 1; 0 is every other character. Owners must be
+        (kind, position) pairs with a kind from KINDS.
+        """
+        alphabet = sorted({ch for edges in self._goto for ch in edges})
+        codes = {ch: i + 1 for i, ch in enumerate(alphabet)}
+        root = [0] * (len(alphabet) + 1)
+        for ch, child in self._goto[0].items():
+            root[codes[ch]] = child
+        edge_starts, edge_chars, edge_targets = [0], [], []
+        for edges in self._goto:
+            for code, child in sorted((codes[ch], child) for ch, child in edges.items()):
+                edge_chars.append(code)
+                edge_targets.append(child)
+            edge_starts.append(len(edge_chars))
+
+        writer.strings(f"{name}.alphabet", alphabet)
+        writer.array(f"{name}.root", "I", root)
+        writer.array(f"{name}.edge_starts", "I", edge_starts)
+        writer.array(f"{name}.edge_chars", "I" if len(alphabet) > 0xFFFF else "H", edge_chars)
+        writer.array(f"{name}.edge_targets", "I", edge_targets)
+        writer.array(f"{name}.fail", "I", self._fail)
+        writer.array(f"{name}.out_starts", "I", _starts(self._out))
+        writer.array(f"{name}.out", "I", [i for ids in self._out for i in ids])
+        # Registration order matters, so patterns are stored unsorted
+        writer.strings(f"{name}.patterns", self.patterns)
+        writer.array(f"{name}.owner_starts", "I", _starts(self.owners))
+        writer.array(f"{name}.owner_kinds", "B", [KINDS.index(k) for owners in self.owners for k, _ in owners])
+        writer.array(f"{name}.owner_positions", "I", [pos for owners in self.owners for _, pos in owners])
+
+    @classmethod
+    def from_snapshot(cls, snapshot, name: str) -> "KeywordMatcher":
+        """The automaton read in place from a mapped data snapshot."""
+        matcher = cls.__new__(cls)
+        matcher._alphabet = {ch: i + 1 for i, ch in enumerate(snapshot.strings(f"{name}.alphabet"))}
+        matcher._root = snapshot.array(f"{name}.root")
+        matcher._edge_starts = snapshot.array(f"{name}.edge_starts")
+        matcher._edge_chars = snapshot.array(f"{name}.edge_chars")
+        matcher._edge_targets = snapshot.array(f"{name}.edge_targets")
+        matcher._fail = snapshot.array(f"{name}.fail")
+        matcher._out_starts = snapshot.array(f"{name}.out_starts")
+        matcher._out_ids = snapshot.array(f"{name}.out")
+        matcher.patterns = snapshot.strings(f"{name}.patterns")
+        matcher.owners = _MappedOwners(
+            snapshot.array(f"{name}.owner_starts"),
+            snapshot.array(f"{name}.owner_kinds"),
+            snapshot.array(f"{name}.owner_positions"),
+        )
+        return matcher
+
+
+def _starts(groups: Sequence[Sequence]) -> List[int]:
+    starts = [0]
+    for group in groups:
+        starts.append(starts[-1] + len(group))
+    return starts
+
+
+class _MappedOwners(Sequence):
+    """Owner lists of a mapped automaton, as (kind, position) pairs."""
+
+    def __init__(self, starts: memoryview, kinds: memoryview, positions: memoryview):
+        self._starts = starts
+        self._kinds = kinds
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __getitem__(self, i: int) -> List[Tuple[str, int]]:
+        start, end = self._starts[i], self._starts[i + 1]
+        return [(KINDS[k], pos) for k, pos in zip(self._kinds[start:end], self._positions[start:end])]
+
+
+def build_entity_matcher(
+    articles: List[Dict[str, Any]],
+    cases: List[Dict[str, Any]],
+    procedures: List[Dict[str, Any]],
+) -> KeywordMatcher:
+    """
+    Compile every keyword list, article category and case name into one
+    matcher, for lowercased messages. Article keywords, categories and case
+    names are folded to match in any case; case and procedure keywords are
+    kept as written, so uppercase ones ("PIL", "RTI") never match.
+    """
+    patterns = []
+    for pos, article in enumerate(articles):
+        for keyword in article.get("keywords", []):
+            patterns.append((keyword.lower(), (ARTICLE, pos)))
+        patterns.append((article.get("category", "").lower(), (CATEGORY, pos)))
+    for pos, case in enumerate(cases):
+        for keyword in case.get("keywords", []):
+            patterns.append((keyword, (CASE, pos)))
+        patterns.append((case.get("name", "").lower(), (CASE, pos)))
+    for pos, procedure in enumerate(procedures):
+        for keyword in procedure.get("keywords", []):
+            patterns.append((keyword, (PROCEDURE, pos)))
+    return KeywordMatcher(patterns)
+
+
+def first_owner(matches: Dict[str, List[Any]], kind: str):
+    """Lowest corpus position of the given owner kind among matches, or None."""
+    positions = [pos for owners in matches.values() for owner_kind, pos in owners if owner_kind == kind]
+    return min(positions) if positions else None
@@ -0,0 +1,304 @@
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Seconds. Chat stages take microseconds, whole requests milliseconds
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_sample(name: str, names: Sequence[str], values: Sequence[str], value: float) -> str:
+    labels = ",".join(f'{n}="{escape(str(v))}"' for n, v in zip(names, values))
+    if value == math.inf:
+        number = "+Inf"
+    elif float(value).is_integer():
+        number = str(int(value))
+    else:
+        number = repr(float(value))
+    return f"{name}{{{labels}}} {number}" if labels else f"{name} {number}"
+
+
+class Metric:
+    """A metric family: name, help text, label names and one value per label set."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Sharded(Metric):
+    """
+    Values recorded from several threads (the chat pool, the event loop)
+    without a lock on the hot path: each thread writes only its own shard,
+    and a scrape adds the shards up.
+    """
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, Any]] = []
+
+    def _shard(self) -> Dict[Labels, Any]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _shard_items(self) -> List[List[Tuple[Labels, Any]]]:
+        with self._lock:
+            shards = list(self._shards)
+        # Copying a dict's items holds the GIL, so it never sees a half-made insert
+        return [list(shard.items()) for shard in shards]
+
+
+class Counter(Sharded):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        totals: Dict[Labels, float] = {}
+        for items in self._shard_items():
+            for key, value in items:
+                totals[key] = totals.get(key, 0.0) + value
+        return [format_sample(self.name, self.labels, key, value) for key, value in sorted(totals.items())]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [format_sample(self.name, self.labels, key, value) for key, value in values]
+
+
+class Timer:
+    """Context manager observing the seconds spent in its block."""
+
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start, self.labels)
+
+
+class Histogram(Sharded):
+    """
+    Cumulative buckets, sum and count per label set, as Prometheus expects.
+    Recording is a bisect and two additions; the cumulative counts are only
+    added up when the metrics are scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        self.record(value, labels)
+
+    def record(self, value: float, labels: Labels):
+        # Per shard: label set -> [per-bucket counts (last one is +Inf), sum]
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def time(self, *labels: str) -> Timer:
+        return Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        merged: Dict[Labels, List[Any]] = {}
+        for items in self._shard_items():
+            for key, (counts, total) in items:
+                series = merged.setdefault(key, [[0] * len(counts), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+        names = self.labels + ("le",)
+        lines = []
+        for key, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(format_sample(f"{self.name}_bucket", names, key + (le,), cumulative))
+            lines.append(format_sample(f"{self.name}_sum", self.labels, key, total))
+            lines.append(format_sample(f"{self.name}_count", self.labels, key, cumulative))
+        return lines
+
+
+class Collected(Metric):
+    """
+    A metric read at scrape time from state kept elsewhere (corpus sizes,
+    cache and pool stats), so it costs nothing between scrapes. The function
+    returns a single value, or a dict of label values -> value.
+    """
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Union[float, Dict[Labels, float]]],
+                 labels: Sequence[str] = (), kind: str = "gauge"):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [format_sample(self.name, self.labels, key, value) for key, value in values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def collected(self, name: str, documentation: str, collect: Callable, labels: Sequence[str] = (),
+                  kind: str = "gauge") -> Collected:
+        return self.register(Collected(name, documentation, collect, labels, kind))
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (0.0.4)."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Request count, latency and in-flight requests, labelled by the route's
+    path template (/api/v1/cases/{case_id}) rather than the URL, so the
+    number of series stays bounded. Unrouted requests share "unmatched".
+    Latency runs until the last body chunk is sent, so for streamed
+    responses it covers the whole stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._paths: Optional[Dict[Any, str]] = None
+
+    def route_path(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._paths is None:
+            self._paths = {
+                route.endpoint: route.path
+                for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def wrapped_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            path = self.route_path(scope)
+            http_request_duration_seconds.observe(elapsed, scope["method"], path)
+            http_requests_total.inc(scope["method"], path, str(status))
+
+
+# Global instances
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by method, route and status", ("method", "path", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route", ("method", "path")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+chat_stage_seconds = registry.histogram(
+    "chat_stage_seconds", "Time spent in each stage of answering a chat message", ("stage",)
+)
+chat_stream_first_section_seconds = registry.histogram(
+    "chat_stream_first_section_seconds", "Time from a /chat/stream request to sending its first answer section"
+)
+chat_answers_total = registry.counter(
+    "chat_answers_total",
+    "Chat answers by the branch that produced them, and whether a spelling-corrected retry was needed",
+    ("branch", "retried"),
+)
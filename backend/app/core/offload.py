@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from app.core.config import settings
+from app.core.profiling import call_profiled
+
+
+class PoolSaturated(Exception):
+    """The pool already holds its limit of queued and running tasks."""
+
+
+class BoundedExecutor:
+    """
+    Runs CPU-bound functions in a thread pool so the event loop stays free
+    for cheap requests (/health, article lookups) while they run.
+
+    At most max_pending tasks are queued or running; beyond that run()
+    raises PoolSaturated instead of growing the queue, so callers can shed
+    load (503) rather than answer late. A task that outlives the timeout
+    raises asyncio.TimeoutError in the caller; it is cancelled if it has
+    not started, and otherwise finishes in the background still counted as
+    pending, so the limit reflects the real work in the pool.
+
+    Threads rather than processes: the data snapshot is shared by every
+    thread and swapped atomically on reload, and the workers of the
+    production server already spread load across cores.
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float, name: str = "pool"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.running = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @property
+    def queued(self) -> int:
+        """Tasks waiting for a thread."""
+        return self.pending - self.running
+
+    def _call(self, fn: Callable, args: tuple) -> Any:
+        with self._lock:
+            self.running += 1
+        try:
+            return call_profiled(fn, args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self.errors += 1
+            else:
+                self.completed += 1
+
+    async def run(self, fn: Callable, *args: Any) -> Any:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated()
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        # In the caller's context, like asyncio.to_thread (a profiled request stays profiled)
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, self._call, fn, args)
+        future.add_done_callback(self._finished)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout,
+            "pending": self.pending,
+            "running": self.running,
+            "queued": self.queued,
+            "peak_pending": self.peak_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+# Global instance
+chat_executor = BoundedExecutor(
+    settings.CHAT_POOL_WORKERS,
+    settings.CHAT_QUEUE_LIMIT,
+    settings.CHAT_TIMEOUT,
+    name="chat",
+)
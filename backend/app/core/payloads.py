@@ -0,0 +1,154 @@
+import json
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+from pydantic import ValidationError
+
+from app.core.compression import PRECOMPRESSED_LEVELS, compress, supported_encodings
+from app.core.config import settings
+from app.schemas import ArticleResponse, LandmarkCaseResponse, ProcedureResponse, QuickReplyResponse
+
+
+# Default limit of the list endpoints: their first page is a fixed body
+LIST_PAGE_SIZE = 50
+
+# Every encoding a snapshot may hold variants for
+ENCODINGS = ("br", "gzip")
+
+
+def dumps(value: Any) -> bytes:
+    """Compact UTF-8 JSON, byte-identical to FastAPI's JSONResponse."""
+    return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def join(fragments: Sequence[Union[bytes, memoryview]]) -> bytes:
+    """JSON array from already serialized elements."""
+    return b"[" + b",".join(fragments) + b"]"
+
+
+def normalize_quick_replies(quick_replies: List[Any]) -> List[Dict[str, Any]]:
+    """The data file stores quick replies as plain strings; the API serves objects."""
+    replies = []
+    for i, reply in enumerate(quick_replies):
+        if isinstance(reply, str):
+            reply = {"text": reply}
+        try:
+            replies.append(QuickReplyResponse.model_validate(reply))
+        except ValidationError as e:
+            print(f"[ERROR] Skipping invalid quick reply #{i}: {e.error_count()} validation error(s)")
+    # Stable sort, so replies without an order keep their file order
+    replies.sort(key=lambda r: r.order)
+    return [r.model_dump(by_alias=True) for r in replies]
+
+
+class SerializedPayloads:
+    """
+    Response bodies of the read-only endpoints, serialized once per data
+    version with the same pydantic serializer FastAPI would use. Routes
+    serve these bytes directly, and list pages are joined from the
+    per-entity fragments. The strong ETag is the content hash of the data
+    file, so it changes exactly when any body can change.
+
+    The fixed bodies (entity details, the first list pages, quick replies
+    and categories) of at least COMPRESSION_MIN_SIZE bytes also get brotli
+    and gzip variants at the dense PRECOMPRESSED_LEVELS, built once here and
+    kept in the snapshot, so no request pays for those levels.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        articles: List[Any],
+        cases: List[Any],
+        procedures: List[Any],
+        quick_replies: List[Any],
+        article_categories: List[str],
+    ):
+        self.etag = f'"{version}"'
+        self.articles: Sequence[bytes] = [self._entity(ArticleResponse, r) for r in articles]
+        self.cases: Sequence[bytes] = [self._entity(LandmarkCaseResponse, r) for r in cases]
+        self.procedures: Sequence[bytes] = [self._entity(ProcedureResponse, r) for r in procedures]
+        self.quick_replies: bytes = dumps(normalize_quick_replies(quick_replies))
+        self.article_categories: bytes = dumps(article_categories)
+        self.article_list: bytes = self.page(self.articles[:LIST_PAGE_SIZE])
+        self.case_list: bytes = self.page(self.cases[:LIST_PAGE_SIZE])
+        self.procedure_list: bytes = self.page(self.procedures[:LIST_PAGE_SIZE])
+        self._encoded: Dict[str, Dict[str, Sequence[bytes]]] = {
+            encoding: {
+                name: [self._precompress(body, encoding) for body in bodies]
+                for name, bodies in self._fixed().items()
+            }
+            for encoding in supported_encodings()
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, version: str) -> "SerializedPayloads":
+        """Bodies read in place from a mapped data snapshot."""
+        payloads = cls.__new__(cls)
+        payloads.etag = f'"{version}"'
+        payloads.articles = snapshot.fragments("payloads.articles")
+        payloads.cases = snapshot.fragments("payloads.cases")
+        payloads.procedures = snapshot.fragments("payloads.procedures")
+        for name in ("quick_replies", "article_categories", "article_list", "case_list", "procedure_list"):
+            setattr(payloads, name, snapshot.fragments(f"payloads.{name}")[0])
+        payloads._encoded = {
+            encoding: {name: snapshot.fragments(f"payloads.{encoding}.{name}") for name in payloads._fixed()}
+            for encoding in ENCODINGS if f"payloads.{encoding}.articles" in snapshot
+        }
+        return payloads
+
+    def write_to(self, writer):
+        """Store the bodies and their compressed variants in a data snapshot (see app.core.snapshot)."""
+        for name, bodies in self._fixed().items():
+            writer.fragments(f"payloads.{name}", bodies)
+        for encoding, variants in self._encoded.items():
+            for name, bodies in variants.items():
+                writer.fragments(f"payloads.{encoding}.{name}", bodies)
+
+    def _fixed(self) -> Dict[str, Sequence[bytes]]:
+        """Every fixed body, by name; single documents are one-item lists."""
+        return {
+            "articles": self.articles,
+            "cases": self.cases,
+            "procedures": self.procedures,
+            "quick_replies": [self.quick_replies],
+            "article_categories": [self.article_categories],
+            "article_list": [self.article_list],
+            "case_list": [self.case_list],
+            "procedure_list": [self.procedure_list],
+        }
+
+    @staticmethod
+    def _precompress(body: bytes, encoding: str) -> bytes:
+        # Empty for bodies too small to compress
+        if len(body) < settings.COMPRESSION_MIN_SIZE:
+            return b""
+        return compress(body, encoding, PRECOMPRESSED_LEVELS)
+
+    def encoded(self, name: str, index: int = 0) -> Dict[str, Union[bytes, memoryview]]:
+        """Compressed variants of a fixed body (see _fixed), by encoding."""
+        variants = {}
+        for encoding, bodies in self._encoded.items():
+            body = bodies[name][index]
+            if body:
+                variants[encoding] = body
+        return variants
+
+    @staticmethod
+    def _entity(schema, record) -> bytes:
+        return schema.from_record(record).model_dump_json(by_alias=True).encode("utf-8")
+
+    def batch(self, fragments: Sequence[bytes], positions: List[int], missing: List[str]) -> bytes:
+        """Bulk lookup body: {"items": [...], "missing": [...]}."""
+        return b'{"items":' + self.page(fragments, positions) + b',"missing":' + dumps(missing) + b'}'
+
+    def envelope(self, fragments: Sequence[bytes], positions: List[int], total: int,
+                 next_cursor: Optional[str]) -> bytes:
+        """Cursor page body: {"items": [...], "total": N, "next_cursor": ...}."""
+        return (b'{"items":' + self.page(fragments, positions) + b',"total":' + dumps(total)
+                + b',"next_cursor":' + dumps(next_cursor) + b'}')
+
+    def page(self, fragments: Sequence[bytes], positions: Optional[List[int]] = None) -> bytes:
+        """JSON array of the given positions (or every fragment)."""
+        if positions is None:
+            return join(fragments)
+        return join([fragments[p] for p in positions])
@@ -0,0 +1,408 @@
+import cProfile
+import gc
+import io
+import itertools
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import types
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.snapshot import Snapshot
+
+# Frames tracemalloc keeps per allocation when it is started from here
+TRACEMALLOC_FRAMES = 25
+
+
+class RequestProfile:
+    """cProfile data for one request: the event loop's and each pool call's."""
+
+    def __init__(self, method: str, path: str, query: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.query = query
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.status: Optional[int] = None
+        self.duration_ms = 0.0
+        self._profiles: List[cProfile.Profile] = []
+
+    def add(self, profile: cProfile.Profile):
+        self._profiles.append(profile)
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self._profiles[0], stream=io.StringIO())
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def text(self, sort: str = "cumulative", limit: int = 40) -> str:
+        stream = io.StringIO()
+        stats = self.stats()
+        stats.stream = stream
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """The profile in the binary format of pstats.dump_stats (snakeviz, gprof2dot)."""
+        return marshal.dumps(self.stats().stats)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 3),
+            "created_at": self.created_at,
+        }
+
+
+class ProfileStore:
+    """The last few request profiles, oldest dropped first."""
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.keep:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [p.summary() for p in reversed(self._profiles.values())]
+
+
+# The profile of the request being handled, if it asked for one. Pool calls
+# run in a copy of the caller's context, so they see it too.
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def call_profiled(fn: Callable, args: tuple) -> Any:
+    """fn(*args), under its own cProfile when the calling request is profiled."""
+    request_profile = current_profile.get()
+    if request_profile is None:
+        return fn(*args)
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        return fn(*args)
+    finally:
+        profile.disable()
+        request_profile.add(profile)
+
+
+def frame_label(code: types.CodeType) -> str:
+    """e.g. services/chat_service.py:ChatService.answer"""
+    directory, filename = os.path.split(code.co_filename)
+    return f"{os.path.basename(directory)}/{filename}:{code.co_qualname}"
+
+
+def builtin_label(function: Any) -> str:
+    module = getattr(function, "__module__", None) or "builtins"
+    return f"{module}.{getattr(function, '__qualname__', repr(function))}"
+
+
+class StackProfiler:
+    """
+    Deterministic profiler for the current thread that records the self
+    time of every call stack, for flame graphs. Slow enough (a Python
+    callback per call) that it is only used on sampled requests.
+    """
+
+    def __init__(self, root: str):
+        self.stacks: Dict[str, float] = {}
+        self._path = [root]
+        self._frames: List[List[float]] = []  # [start, time spent in children]
+
+    def _event(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == "call" or event == "c_call":
+            self._path.append(frame_label(frame.f_code) if event == "call" else builtin_label(arg))
+            self._frames.append([now, 0.0])
+        elif self._frames:
+            # return, c_return or c_exception
+            start, children = self._frames.pop()
+            elapsed = now - start
+            stack = ";".join(self._path)
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + elapsed - children
+            self._path.pop()
+            if self._frames:
+                self._frames[-1][1] += elapsed
+
+    def __enter__(self):
+        sys.setprofile(self._event)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(None)
+        # Drop the frame of the setprofile call itself
+        self._frames.clear()
+        del self._path[1:]
+
+
+class ChatSampler:
+    """
+    Profiles one chat message in every `every` (0 turns it off) with the
+    StackProfiler, keeping the last `window` sampled messages. Their
+    stacks add up to a rolling flame graph in the folded format read by
+    flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, every: int, window: int):
+        self.every = every
+        self._counter = itertools.count()
+        self._samples: deque = deque(maxlen=window)
+
+    def configure(self, every: int):
+        self.every = every
+
+    def sample(self):
+        """A context manager profiling its block if this message is sampled."""
+        every = self.every
+        if every <= 0 or next(self._counter) % every or current_profile.get() is not None:
+            # Not sampled, or cProfile already owns this thread's profile hook
+            return nullcontext()
+        return self._profile()
+
+    @contextmanager
+    def _profile(self):
+        profiler = StackProfiler("chat")
+        with profiler:
+            yield
+        self._samples.append(profiler.stacks)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def clear(self):
+        self._samples.clear()
+
+    def folded(self) -> str:
+        """One 'frame;frame;frame microseconds' line per stack."""
+        totals: Dict[str, float] = {}
+        for stacks in list(self._samples):
+            for stack, seconds in stacks.items():
+                totals[stack] = totals.get(stack, 0.0) + seconds
+        lines = [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(totals.items())]
+        return "\n".join(line for line in lines if not line.endswith(" 0")) + "\n"
+
+
+class ProfilingMiddleware:
+    """
+    Runs a request under cProfile when it carries an `X-Profile: 1` header
+    or a `profile=1` query parameter, provided `authorize` accepts its
+    X-Admin-Token header (it raises HTTPException otherwise). The response
+    gets an X-Profile-Id header; the profile is read back from the admin
+    API. Pool calls made for the request are profiled in their thread and
+    merged in. The event loop thread's profile also includes whatever
+    other requests ran meanwhile, so profile on a quiet worker for clean
+    numbers. One request is profiled at a time per process.
+    """
+
+    def __init__(self, app, authorize: Callable[[Optional[str]], None], store: "ProfileStore"):
+        self.app = app
+        self.authorize = authorize
+        self.store = store
+        self._busy = threading.Lock()
+
+    @staticmethod
+    def requested(scope) -> Tuple[bool, Optional[str]]:
+        """Whether the request asks to be profiled, and its admin token."""
+        wanted, token = False, None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                wanted = value.decode("latin-1").strip().lower() in ("1", "true")
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        if not wanted and b"profile" in scope["query_string"]:
+            flags = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [])
+            wanted = any(flag.lower() in ("1", "true") for flag in flags)
+        return wanted, token
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        wanted, token = self.requested(scope)
+        if not wanted:
+            await self.app(scope, receive, send)
+            return
+        try:
+            self.authorize(token)
+        except HTTPException as e:
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            response = JSONResponse({"detail": "Another request is being profiled"}, status_code=409)
+            await response(scope, receive, send)
+            return
+
+        request_profile = RequestProfile(scope["method"], scope["path"], scope["query_string"].decode("latin-1"))
+
+        async def wrapped_send(message):
+            if message["type"] == "http.response.start":
+                request_profile.status = message["status"]
+                headers = list(message.get("headers", [])) + [(b"x-profile-id", request_profile.id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        reset = current_profile.set(request_profile)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, wrapped_send)
+        finally:
+            profile.disable()
+            request_profile.duration_ms = (time.perf_counter() - start) * 1000
+            current_profile.reset(reset)
+            request_profile.add(profile)
+            self.store.add(request_profile)
+            self._busy.release()
+
+
+# Memory
+
+def database_components(database) -> List[Tuple[str, Any]]:
+    """
+    The parts of a Database, collections first, then the text store and
+    records, then each index. Objects shared by several parts count toward
+    the first one that reaches them.
+    """
+    skip = {"_data", "_records", "snapshot", "version", "texts"}
+    components = [(name, items) for name, items in database._data.items()]
+    components.append(("texts", database.texts))
+    components += [(f"records.{name}", records) for name, records in database._records.items()]
+    components += [(name, value) for name, value in vars(database).items() if name not in skip]
+    return components
+
+
+def retained_bytes(root: Any, seen: set) -> int:
+    """Bytes of every object reachable from root that is not in seen yet (added to it)."""
+    total = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType, types.FunctionType, Snapshot)):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+def component_of(traceback: tracemalloc.Traceback, modules: Dict[str, str]) -> str:
+    """The Database part allocated by the innermost app frame of a traceback."""
+    # Frames run from the oldest to the most recent call
+    for frame in reversed(traceback):
+        if f"{os.sep}app{os.sep}" in frame.filename:
+            name = modules.get(os.path.basename(frame.filename))
+            if name:
+                return name
+    return "other"
+
+
+# Module allocating each part of a Database, for grouping tracemalloc traces
+COMPONENT_MODULES = {
+    "database.py": "collections",
+    "records.py": "records",
+    "texts.py": "texts",
+    "indexes.py": "lookup, facets and article_index",
+    "fulltext.py": "article_search, case_search and procedure_search",
+    "matcher.py": "keyword_matcher",
+    "fuzzy.py": "spell_checker and case_names",
+    "answers.py": "answers",
+    "payloads.py": "payloads",
+    "vectors.py": "vector_index",
+}
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots on demand. The first call starts tracing (unless
+    PYTHONTRACEMALLOC already did, from startup), so allocations made at
+    data load are only traced when the server starts with it set.
+    """
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+        self.started_at: Optional[str] = None
+
+    def report(self, database, top: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                self.started_at = datetime.now(timezone.utc).isoformat()
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ])
+            previous, self._previous = self._previous, snapshot
+
+        seen = {id(database), id(vars(database))}
+        retained = {name: retained_bytes(value, seen) for name, value in database_components(database)}
+
+        by_component: Dict[str, int] = {}
+        for stat in snapshot.statistics("traceback"):
+            name = component_of(stat.traceback, COMPONENT_MODULES)
+            by_component[name] = by_component.get(name, 0) + stat.size
+
+        current, peak = tracemalloc.get_traced_memory()
+        report = {
+            "tracing_since": self.started_at or "startup",
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "database": {
+                "version": database.version,
+                "retained_bytes": dict(sorted(retained.items(), key=lambda item: -item[1])),
+                "snapshot_mapped_bytes": database.snapshot.size if database.snapshot is not None else 0,
+            },
+            "traced_by_component": dict(sorted(by_component.items(), key=lambda item: -item[1])),
+            "top_lines": [
+                {"line": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:top]
+            ],
+        }
+        if previous is not None:
+            report["growth_since_last_snapshot"] = [
+                {"line": str(stat.traceback), "bytes": stat.size_diff, "count": stat.count_diff}
+                for stat in snapshot.compare_to(previous, "lineno")[:top] if stat.size_diff
+            ]
+        return report
+
+    def stop(self):
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+            self.started_at = None
+
+
+# Global instances
+request_profiles = ProfileStore(settings.PROFILE_KEEP)
+chat_sampler = ChatSampler(settings.PROFILE_SAMPLE_EVERY, settings.PROFILE_SAMPLE_WINDOW)
+memory_profiler = MemoryProfiler()
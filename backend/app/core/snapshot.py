@@ -0,0 +1,345 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+MAGIC = b"LAPSNAP\x01"
+FORMAT_VERSION = 3
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGN = 8
+
+
+def _pad(length: int) -> int:
+    return -length % _ALIGN
+
+
+def source_fingerprint(modules: Iterable) -> str:
+    """
+    Hash of the given modules' source files. Snapshots record the hash of
+    the code that wrote them, so editing a writer (or a response schema)
+    invalidates old snapshots without anyone bumping FORMAT_VERSION.
+    """
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class FragmentTable(Sequence):
+    """
+    Read-only list of byte strings stored back to back in one buffer,
+    addressed through an offsets array. Items are memoryview slices of the
+    buffer, so reading one copies nothing.
+    """
+
+    def __init__(self, data: memoryview, offsets: memoryview):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _item(self, index: int):
+        return self._data[self._offsets[index]:self._offsets[index + 1]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("fragment index out of range")
+        return self._item(index)
+
+
+def _slot_count(count: int) -> int:
+    slots = 8
+    while slots < count * 2:
+        slots *= 2
+    return slots
+
+
+class StringTable(FragmentTable):
+    """
+    UTF-8 strings, decoded on access. An open-addressing hash table over
+    CRC32 of the bytes (stable across processes, unlike hash()) makes
+    lookup and membership O(1) without decoding, so the table also serves
+    as a set. Tables written sorted can be bisected as well.
+    """
+
+    def __init__(self, data: memoryview, offsets: memoryview, slots: memoryview):
+        super().__init__(data, offsets)
+        self._slots = slots
+        self._mask = len(slots) - 1
+
+    def _item(self, index: int) -> str:
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def index_of(self, key: str) -> Optional[int]:
+        encoded = key.encode("utf-8")
+        slots, offsets, data = self._slots, self._offsets, self._data
+        slot = zlib.crc32(encoded) & self._mask
+        while True:
+            entry = slots[slot]
+            if entry == 0:
+                return None
+            i = entry - 1
+            if data[offsets[i]:offsets[i + 1]] == encoded:
+                return i
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self.index_of(key) is not None
+
+
+class JsonTable(FragmentTable):
+    """JSON values (entries, records, sort keys), decoded on access."""
+
+    def _item(self, index: int) -> Any:
+        return json.loads(bytes(self._data[self._offsets[index]:self._offsets[index + 1]]))
+
+
+class MappedPostings(Mapping):
+    """
+    Read-only key -> postings mapping over CSR arrays: the values of the
+    i-th key are values[starts[i]:starts[i + 1]], optionally paired with
+    weights or translated through a label table.
+    """
+
+    def __init__(
+        self,
+        keys: StringTable,
+        starts: memoryview,
+        values: memoryview,
+        weights: Optional[memoryview] = None,
+        labels: Optional[Sequence] = None,
+    ):
+        self._keys = keys
+        self._starts = starts
+        self._values = values
+        self._weights = weights
+        self._labels = labels
+
+    def __getitem__(self, key: str):
+        i = self._keys.index_of(key)
+        if i is None:
+            raise KeyError(key)
+        start, end = self._starts[i], self._starts[i + 1]
+        if self._weights is not None:
+            return list(zip(self._values[start:end], self._weights[start:end]))
+        if self._labels is not None:
+            return [self._labels[v] for v in self._values[start:end]]
+        return self._values[start:end]
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._keys.index_of(key) is not None
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class MappedValues(Mapping):
+    """Read-only key -> number mapping: sorted keys plus an aligned array."""
+
+    def __init__(self, keys: StringTable, values: memoryview):
+        self._keys = keys
+        self._values = values
+
+    def __getitem__(self, key: str):
+        i = self._keys.index_of(key)
+        if i is None:
+            raise KeyError(key)
+        return self._values[i]
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._keys.index_of(key) is not None
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class SnapshotWriter:
+    """
+    Collects named sections and writes them as one file.
+
+    Layout: MAGIC, a little-endian u32 header length, a JSON header naming
+    each section's kind, offset and size, then the sections themselves,
+    8-byte aligned so arrays can be cast in place. Arrays use native byte
+    order; the header records it and readers refuse a mismatch.
+    """
+
+    def __init__(self):
+        self._layout: Dict[str, Dict[str, Any]] = {}
+        self._blobs: List[bytes] = []
+        self._position = 0
+
+    def _append(self, blob: bytes) -> int:
+        offset = self._position
+        self._blobs.extend([blob, b"\0" * _pad(len(blob))])
+        self._position += len(blob) + _pad(len(blob))
+        return offset
+
+    def array(self, name: str, typecode: str, values: Iterable):
+        data = array(typecode, values)
+        self._layout[name] = {"kind": "array", "typecode": typecode,
+                              "offset": self._append(data.tobytes()), "count": len(data)}
+
+    def fragments(self, name: str, items: Sequence[bytes], kind: str = "fragments"):
+        offsets = array("I", [0])
+        for item in items:
+            offsets.append(offsets[-1] + len(item))
+        self._layout[name] = {"kind": kind, "count": len(items),
+                              "offsets": self._append(offsets.tobytes()),
+                              "data": self._append(b"".join(items))}
+
+    def strings(self, name: str, items: Sequence[str]):
+        """Strings plus their hash slots (entry i + 1, 0 = empty)."""
+        encoded = [s.encode("utf-8") for s in items]
+        slots = array("I", [0]) * _slot_count(len(encoded))
+        mask = len(slots) - 1
+        for i, item in enumerate(encoded):
+            slot = zlib.crc32(item) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = i + 1
+        self.fragments(name, encoded, kind="strings")
+        self.array(f"{name}.slots", "I", slots)
+
+    def postings(self, name: str, table: Mapping[str, Sequence], weighted: bool = False,
+                 labels: Optional[Mapping[Any, int]] = None):
+        """
+        key -> list of ints (or (int, float) pairs when weighted, or labels
+        translated to ids through the labels mapping) as CSR sections.
+        """
+        keys = sorted(table)
+        starts, values, weights = [0], [], []
+        for key in keys:
+            for item in table[key]:
+                if weighted:
+                    values.append(item[0])
+                    weights.append(item[1])
+                elif labels is not None:
+                    values.append(labels[item])
+                else:
+                    values.append(item)
+            starts.append(len(values))
+        self.strings(f"{name}.keys", keys)
+        self.array(f"{name}.starts", "I", starts)
+        self.array(f"{name}.values", "I", values)
+        if weighted:
+            self.array(f"{name}.weights", "d", weights)
+
+    def rows(self, name: str, items: Iterable[Any]):
+        """One compact JSON document per item."""
+        self.fragments(name, [json.dumps(item, separators=(",", ":")).encode("utf-8") for item in items], kind="rows")
+
+    def values(self, name: str, table: Mapping[str, Any], typecode: str):
+        keys = sorted(table)
+        self.strings(f"{name}.keys", keys)
+        self.array(f"{name}.values", typecode, [table[key] for key in keys])
+
+    def write(self, path: str, version: str, code: str):
+        """Written to a temporary file and renamed, so running processes keep their mapping of the old file."""
+        header = json.dumps({
+            "format": FORMAT_VERSION,
+            "version": version,
+            "code": code,
+            "byteorder": sys.byteorder,
+            "sections": self._layout,
+        }).encode("utf-8")
+        header += b" " * _pad(len(MAGIC) + _HEADER_LENGTH.size + len(header))
+
+        # Per process, so two builds of the same snapshot don't share a temporary file
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header)))
+            f.write(header)
+            for blob in self._blobs:
+                f.write(blob)
+        os.replace(tmp, path)
+
+
+class Snapshot:
+    """A snapshot file mapped read-only; its pages are shared by every worker."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a data snapshot")
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        (length,) = _HEADER_LENGTH.unpack(buffer[len(MAGIC):start])
+        header = json.loads(bytes(buffer[start:start + length]))
+        if header["format"] != FORMAT_VERSION or header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written by an incompatible build")
+        self.version: str = header["version"]
+        self.code: Optional[str] = header.get("code")
+        self.size = len(buffer)
+        self._body = buffer[start + length:]
+        self._layout: Dict[str, Dict[str, Any]] = header["sections"]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layout or f"{name}.keys" in self._layout
+
+    def array(self, name: str) -> memoryview:
+        entry = self._layout[name]
+        size = array(entry["typecode"]).itemsize * entry["count"]
+        return self._body[entry["offset"]:entry["offset"] + size].cast(entry["typecode"])
+
+    def _table(self, name: str):
+        entry = self._layout[name]
+        offsets = self._body[entry["offsets"]:entry["offsets"] + (entry["count"] + 1) * 4].cast("I")
+        data = self._body[entry["data"]:entry["data"] + offsets[entry["count"]]]
+        return data, offsets
+
+    def fragments(self, name: str) -> FragmentTable:
+        return FragmentTable(*self._table(name))
+
+    def strings(self, name: str) -> StringTable:
+        return StringTable(*self._table(name), self.array(f"{name}.slots"))
+
+    def postings(self, name: str, labels: Optional[Sequence] = None) -> MappedPostings:
+        weights = self.array(f"{name}.weights") if f"{name}.weights" in self._layout else None
+        return MappedPostings(
+            self.strings(f"{name}.keys"), self.array(f"{name}.starts"),
+            self.array(f"{name}.values"), weights, labels,
+        )
+
+    def rows(self, name: str) -> JsonTable:
+        return JsonTable(*self._table(name))
+
+    def values(self, name: str) -> MappedValues:
+        return MappedValues(self.strings(f"{name}.keys"), self.array(f"{name}.values"))
+
+
+def open_snapshot(path: str, version: str, code: str) -> Optional[Snapshot]:
+    """The snapshot at path if it was built from this data version by this code, else None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARNING] Ignoring data snapshot {path}: {e}")
+        return None
+    if snapshot.version != version:
+        print(f"[WARNING] Ignoring data snapshot {path}: built for data version {snapshot.version}, "
+              f"data is {version}")
+        return None
+    if snapshot.code != code:
+        print(f"[WARNING] Ignoring data snapshot {path}: written by other code ({snapshot.code}, now {code})")
+        return None
+    return snapshot
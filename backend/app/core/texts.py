@@ -0,0 +1,97 @@
+import threading
+from array import array
+from typing import Dict, List, Any, FrozenSet, Optional, Sequence, Tuple
+
+from app.core.cache import LRUCache
+from app.core.snapshot import FragmentTable
+
+# Long free-text fields, per collection. List and search endpoints, chat
+# scoring and the prerendered answers never read them from the records, so
+# they are kept out of line instead of as one Python string per entry.
+TEXT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "articles": ("description",),
+    "landmark_cases": ("detailed_explanation",),
+    "procedures": ("description", "procedure"),
+}
+
+
+class TextStore:
+    """
+    Large text fields as UTF-8 in one offset-indexed blob per field,
+    decoded only when a record's field is read. Decoded values go through
+    a small LRU, so hot entries are decoded once.
+
+    Built from the parsed data (one bytes blob per field) or read in place
+    from a data snapshot, where the blobs are shared by every worker. Null
+    values (an optional detailed_explanation) are kept as a position set.
+    """
+
+    def __init__(self, cache_size: int):
+        self._columns: Dict[str, Sequence[Any]] = {}
+        self._nulls: Dict[str, FrozenSet[int]] = {}
+        self.cache = LRUCache(cache_size, float("inf"))
+        # Records are shared by every thread serving requests
+        self._lock = threading.Lock()
+
+    def load(self, data: Dict[str, List[Dict[str, Any]]]):
+        """Copy the text fields of the validated collections into blobs."""
+        for collection, names in TEXT_FIELDS.items():
+            items = data.get(collection, [])
+            for name in names:
+                values = [item.get(name) for item in items]
+                encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+                offsets = array("I", [0])
+                for value in encoded:
+                    offsets.append(offsets[-1] + len(value))
+                column = f"{collection}.{name}"
+                self._columns[column] = FragmentTable(memoryview(b"".join(encoded)), memoryview(offsets))
+                self._nulls[column] = frozenset(i for i, v in enumerate(values) if v is None)
+
+    def map(self, snapshot):
+        """Read the blobs in place from a mapped data snapshot."""
+        for collection, names in TEXT_FIELDS.items():
+            for name in names:
+                column = f"{collection}.{name}"
+                self._columns[column] = snapshot.fragments(f"texts.{column}")
+                self._nulls[column] = frozenset(snapshot.array(f"texts.{column}.nulls"))
+
+    def write_to(self, writer):
+        """Store the blobs in a data snapshot (see app.core.snapshot)."""
+        for column, fragments in self._columns.items():
+            writer.fragments(f"texts.{column}", fragments)
+            writer.array(f"texts.{column}.nulls", "I", sorted(self._nulls[column]))
+
+    @staticmethod
+    def strip(data: Dict[str, List[Dict[str, Any]]]):
+        """Drop the text fields from the raw entries once nothing needs them there."""
+        for collection, names in TEXT_FIELDS.items():
+            for item in data.get(collection, []):
+                for name in names:
+                    item.pop(name, None)
+
+    def get(self, collection: str, name: str, pos: int) -> Optional[str]:
+        column = f"{collection}.{name}"
+        if pos in self._nulls[column]:
+            return None
+        key = f"{column}:{pos}"
+        with self._lock:
+            value = self.cache.get(key)
+        if value is None:
+            value = str(self._columns[column][pos], "utf-8")
+            with self._lock:
+                self.cache.set(key, value)
+        return value
+
+    def clear_cache(self):
+        """Forget values decoded while building the data; the cache is for requests."""
+        with self._lock:
+            self.cache = LRUCache(self.cache.max_size, float("inf"))
+
+    def expand(self, collection: str, pos: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        """A raw entry with its text fields decoded back in."""
+        expanded = dict(item)
+        for name in TEXT_FIELDS[collection]:
+            value = self.get(collection, name, pos)
+            if value is not None:
+                expanded[name] = value
+        return expanded
@@ -0,0 +1,185 @@
+import math
+from collections import Counter
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from app.core.fulltext import analyze
+from app.core.matcher import ARTICLE, CASE, PROCEDURE
+
+# Character n-grams give partial credit for morphology and paraphrase
+# ("amendment" vs "amending"); they are down-weighted against whole words.
+NGRAM_SIZE = 3
+NGRAM_WEIGHT = 0.5
+NGRAM_MAX_DF = 0.05
+
+
+def features(text: str) -> Counter:
+    """Stemmed words plus padded character trigrams of each word."""
+    counts: Counter = Counter()
+    for word in analyze(text):
+        counts[word] += 1.0
+        padded = f" {word} "
+        for i in range(len(padded) - NGRAM_SIZE + 1):
+            counts["#" + padded[i:i + NGRAM_SIZE]] += NGRAM_WEIGHT
+    return counts
+
+
+class VectorIndex:
+    """
+    TF-IDF matrix over every article, case and procedure, built at startup.
+    Stored term-major (CSC) as flat NumPy arrays so a query is scored with
+    one sparse mat-vec (np.bincount) and the top-k come from argpartition.
+    """
+
+    def __init__(self, documents: List[Tuple[str, int, str]]):
+        self.kinds = np.array([kind for kind, _, _ in documents])
+        self.positions = np.array([pos for _, pos, _ in documents], dtype=np.int32)
+        self.size = len(documents)
+
+        doc_features = [features(text) for _, _, text in documents]
+        document_frequency: Counter = Counter()
+        for counts in doc_features:
+            document_frequency.update(counts.keys())
+
+        # N-grams shared by a large share of documents carry almost no signal
+        # but have the longest postings, so they are dropped like stopwords
+        max_ngram_df = max(NGRAM_MAX_DF * self.size, 1)
+        terms = sorted(
+            term for term, df in document_frequency.items()
+            if not term.startswith("#") or df <= max_ngram_df
+        )
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+        self.idf = np.array(
+            [math.log((1 + self.size) / (1 + document_frequency[term])) + 1 for term in terms],
+            dtype=np.float32,
+        )
+
+        # Flat (term, doc, tf) triples, then sublinear tf * idf per entry
+        term_ids, doc_ids, tfs = [], [], []
+        vocabulary = self.vocabulary
+        for doc, counts in enumerate(doc_features):
+            for term, tf in counts.items():
+                term_id = vocabulary.get(term)
+                if term_id is not None:
+                    term_ids.append(term_id)
+                    doc_ids.append(doc)
+                    tfs.append(tf)
+        term_ids = np.array(term_ids, dtype=np.int32)
+        doc_ids = np.array(doc_ids, dtype=np.int32)
+        weights = (1 + np.log(np.array(tfs, dtype=np.float32))) * self.idf[term_ids]
+
+        # L2-normalise each document row
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights * weights, minlength=self.size))
+        norms[norms == 0] = 1.0
+        weights = weights / norms[doc_ids]
+
+        # Term-major layout: entries for term t live in indptr[t]:indptr[t + 1]
+        order = np.argsort(term_ids, kind="stable")
+        self.doc_ids = doc_ids[order]
+        self.weights = weights[order].astype(np.float32)
+        self.indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=self.indptr[1:])
+
+    def _query_vector(self, query: str) -> Tuple[List[int], np.ndarray]:
+        term_ids, weights = [], []
+        for term, tf in features(query).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is not None and tf > 0:
+                term_ids.append(term_id)
+                weights.append((1 + math.log(tf)) * float(self.idf[term_id]))
+        vector = np.array(weights, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return term_ids, (vector / norm if norm else vector)
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of the query against every document."""
+        term_ids, vector = self._query_vector(query)
+        if not term_ids:
+            return np.zeros(self.size, dtype=np.float32)
+        starts, ends = self.indptr[term_ids], self.indptr[np.array(term_ids) + 1]
+        slices = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        query_weights = np.repeat(vector, ends - starts)
+        return np.bincount(
+            self.doc_ids[slices], weights=self.weights[slices] * query_weights, minlength=self.size
+        )
+
+    def scores_many(self, queries: List[str]) -> np.ndarray:
+        """
+        Cosine similarities of several queries at once, one row per query.
+        Every query's postings are gathered with one vectorized range
+        expansion and summed by a single bincount keyed by (query, document).
+        The products are added in the same order as in scores(), so rows
+        are bit-identical to scoring the queries one by one.
+        """
+        rows, term_ids, vectors = [], [], []
+        for row, query in enumerate(queries):
+            ids, vector = self._query_vector(query)
+            rows.extend([row] * len(ids))
+            term_ids.extend(ids)
+            vectors.append(vector)
+        if not term_ids:
+            return np.zeros((len(queries), self.size), dtype=np.float64)
+        term_ids = np.array(term_ids, dtype=np.int64)
+        starts = self.indptr[term_ids]
+        lengths = self.indptr[term_ids + 1] - starts
+        # entries[i] runs start..end of each term in turn
+        firsts = np.cumsum(lengths) - lengths
+        entries = np.arange(lengths.sum()) + np.repeat(starts - firsts, lengths)
+        products = self.weights[entries] * np.repeat(np.concatenate(vectors), lengths)
+        bins = self.doc_ids[entries] + np.repeat(np.array(rows, dtype=np.int64) * self.size, lengths)
+        flat = np.bincount(bins, weights=products, minlength=len(queries) * self.size)
+        return flat.reshape(len(queries), self.size)
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[str, int, float]]:
+        """Top-k (kind, corpus position, cosine score), best first."""
+        return self._top(self.scores(query), k)
+
+    def search_many(self, queries: List[str], k: int = 4) -> List[List[Tuple[str, int, float]]]:
+        """search() for each query, scored and ranked in one pass."""
+        k = min(k, self.size)
+        if not queries or k == 0:
+            return [[] for _ in queries]
+        scores = self.scores_many(queries)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        # Per row: score descending, then document order
+        order = np.lexsort((top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        kinds, positions = self.kinds[top].tolist(), self.positions[top].tolist()
+        return [
+            [(kind, pos, score) for kind, pos, score in zip(kinds[r], positions[r], top_scores[r].tolist()) if score > 0]
+            for r in range(len(queries))
+        ]
+
+    def _top(self, scores: np.ndarray, k: int) -> List[Tuple[str, int, float]]:
+        k = min(k, self.size)
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        # Stable order: score descending, then document order
+        top = top[np.lexsort((top, -scores[top]))]
+        return [
+            (str(self.kinds[i]), int(self.positions[i]), float(scores[i]))
+            for i in top if scores[i] > 0
+        ]
+
+
+def build_vector_index(
+    articles: List[Dict[str, Any]],
+    cases: List[Dict[str, Any]],
+    procedures: List[Dict[str, Any]],
+) -> VectorIndex:
+    """Index one text per entity: title-like fields, keywords and summary text."""
+    documents = []
+    for pos, a in enumerate(articles):
+        text = " ".join([a.get("title", ""), " ".join(a.get("keywords", [])), a.get("category", ""), a.get("description", "")])
+        documents.append((ARTICLE, pos, text))
+    for pos, c in enumerate(cases):
+        text = " ".join([c.get("name", ""), " ".join(c.get("keywords", [])), c.get("significance", ""), " ".join(c.get("key_points", []))])
+        documents.append((CASE, pos, text))
+    for pos, p in enumerate(procedures):
+        text = " ".join([p.get("name", ""), " ".join(p.get("keywords", [])), p.get("description", "")])
+        documents.append((PROCEDURE, pos, text))
+    return VectorIndex(documents)
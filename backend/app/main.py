@@ -1,23 +1,43 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from app.core.cache import chat_cache
+from app.core.compression import CompressionMiddleware
+from app.core.database import db
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.offload import chat_executor
+from app.core.profiling import ProfilingMiddleware, request_profiles
 from app.core.config import settings
 from app.api.router import api_router
+from app.api.routes.admin import require_admin
 
+import asyncio
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Load JSON Data
     print(f"Starting {settings.PROJECT_NAME} with JSON storage...")
+    watcher = reload_sync = None
     try:
         from app.core.database import db
         # Data is loaded automatically on import of db instance
         print("✅ Data Service Ready")
+        if settings.DATA_RELOAD_INTERVAL > 0:
+            watcher = asyncio.create_task(db.watch(settings.DATA_RELOAD_INTERVAL))
+            print(f"Watching data file for changes every {settings.DATA_RELOAD_INTERVAL}s")
+        if settings.DATA_RELOAD_SYNC_INTERVAL > 0 and settings.DATA_RELOAD_GROUP:
+            # Admin reloads land in one worker; the others follow through a marker file
+            reload_sync = asyncio.create_task(db.watch_reloads(settings.DATA_RELOAD_SYNC_INTERVAL))
     except Exception as e:
         print(f"❌ Error initializing data: {e}")
     
     yield
     # Shutdown
+    if watcher:
+        watcher.cancel()
+    if reload_sync:
+        reload_sync.cancel()
     print("Shutting down...")
 
 # Initialize FastAPI app
@@ -36,8 +56,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "ETag"],
 )
 
+# Compress large responses at fast levels; the fixed bodies arrive
+# precompressed from the data load and pass through
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Admin-only per-request CPU profiles (X-Profile: 1 or ?profile=1)
+app.add_middleware(ProfilingMiddleware, authorize=require_admin, store=request_profiles)
+
+# Outermost, so request latency includes compression
+app.add_middleware(MetricsMiddleware)
+
+
+# Metrics read at scrape time from the state /health reports
+registry.collected("data_load_duration_seconds", "Time the current data version took to load",
+                   lambda: db.load_seconds)
+registry.collected("data_reloads_total", "Data versions swapped in by hot reload",
+                   lambda: db.reloads, kind="counter")
+registry.collected("data_snapshot_mapped", "1 if the indexes are mapped from a snapshot file",
+                   lambda: int(db.snapshot is not None))
+registry.collected("data_version_info", "Content hash of the data version being served",
+                   lambda: {(db.version,): 1}, ("version",))
+registry.collected("data_entries", "Entries per collection in the current data version",
+                   lambda: {
+                       ("articles",): len(db.articles),
+                       ("landmark_cases",): len(db.cases),
+                       ("procedures",): len(db.procedures),
+                       ("quick_replies",): len(db.quick_replies),
+                   }, ("collection",))
+registry.collected("chat_pool_pending", "Chat pool tasks running or queued",
+                   lambda: {(state,): chat_executor.stats()[state] for state in ("running", "queued")}, ("state",))
+registry.collected("chat_pool_tasks_total", "Chat pool tasks by outcome",
+                   lambda: {
+                       (outcome,): chat_executor.stats()[key] for outcome, key in (
+                           ("completed", "completed"), ("rejected", "rejected"),
+                           ("timeout", "timeouts"), ("error", "errors"))
+                   }, ("outcome",), kind="counter")
+
+
+def cache_stats():
+    return {
+        "chat": chat_cache.local,
+        "text": db.texts.cache,
+    }
+
+
+registry.collected("cache_hits_total", "Cache hits",
+                   lambda: {(name,): c.hits for name, c in cache_stats().items()}, ("cache",), kind="counter")
+registry.collected("cache_misses_total", "Cache misses",
+                   lambda: {(name,): c.misses for name, c in cache_stats().items()}, ("cache",), kind="counter")
+registry.collected("cache_entries", "Entries held per cache",
+                   lambda: {(name,): len(c) for name, c in cache_stats().items()}, ("cache",))
+
 
 @app.get("/")
 async def root():
@@ -53,20 +125,35 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    from app.core.database import db
     status = "healthy" if db.articles else "degraded"
     return {
         "status": status,
         "articles_count": len(db.articles),
-        "cases_count": len(db.cases)
+        "cases_count": len(db.cases),
+        "data_version": db.version,
+        "last_reload": db.last_reload,
+        "chat_cache": chat_cache.stats(),
+        "chat_pool": chat_executor.stats(),
+        "text_cache": {
+            "size": len(db.texts.cache),
+            "hits": db.texts.cache.hits,
+            "misses": db.texts.cache.misses,
+        }
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, chat stage, data, pool and cache metrics in Prometheus text format."""
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
 if __name__ == "__main__":
+    # Development server; production runs python -m app.server
     import uvicorn
     uvicorn.run(
         "main:app",
@@ -1,4 +1,8 @@
 # Models module
 from app.models.legal import Article, LandmarkCase, Procedure, QuickReply
+from app.models.records import ArticleRecord, LandmarkCaseRecord, ProcedureRecord
 
-__all__ = ["Article", "LandmarkCase", "Procedure", "QuickReply"]
+__all__ = [
+    "Article", "LandmarkCase", "Procedure", "QuickReply",
+    "ArticleRecord", "LandmarkCaseRecord", "ProcedureRecord"
+]
@@ -0,0 +1,176 @@
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Optional, List, Tuple, Dict, Any, Sequence, Type
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.cache import LRUCache
+from app.models.legal import Article, LandmarkCase, Procedure
+
+
+# Immutable, slotted copies of the validated data. Built once at load and
+# shared by every request, so the chat path never re-validates the corpus.
+# Long text fields are properties that decode from the data's TextStore
+# (app.core.texts) on access, by the record's position in its collection.
+# With a data snapshot, records are built on access from its rows instead
+# (RecordTable), so workers hold no copy of the corpus.
+
+@dataclass(frozen=True, slots=True)
+class ArticleRecord:
+    """Validated Constitution Article."""
+    id: Optional[str]
+    number: str
+    title: str
+    category: str
+    keywords: Tuple[str, ...]
+    position: int
+    texts: Any = field(repr=False, compare=False)
+
+    @property
+    def description(self) -> str:
+        return self.texts.get("articles", "description", self.position)
+
+
+@dataclass(frozen=True, slots=True)
+class LandmarkCaseRecord:
+    """Validated Landmark Case."""
+    id: Optional[str]
+    name: str
+    year: int
+    significance: str
+    key_points: Tuple[str, ...]
+    keywords: Tuple[str, ...]
+    position: int
+    texts: Any = field(repr=False, compare=False)
+
+    @property
+    def detailed_explanation(self) -> Optional[str]:
+        return self.texts.get("landmark_cases", "detailed_explanation", self.position)
+
+
+@dataclass(frozen=True, slots=True)
+class ProcedureRecord:
+    """Validated Legal Procedure."""
+    id: Optional[str]
+    name: str
+    keywords: Tuple[str, ...]
+    position: int
+    texts: Any = field(repr=False, compare=False)
+
+    @property
+    def description(self) -> str:
+        return self.texts.get("procedures", "description", self.position)
+
+    @property
+    def procedure(self) -> str:
+        return self.texts.get("procedures", "procedure", self.position)
+
+
+def _record(model: BaseModel, record_cls: Type, **extra: Any) -> Any:
+    values = dict(extra)
+    for f in fields(record_cls):
+        if f.name not in values:
+            value = getattr(model, f.name)
+            values[f.name] = tuple(value) if isinstance(value, list) else value
+    return record_cls(**values)
+
+
+def validate_collection(
+    items: List[Dict[str, Any]],
+    model: Type[BaseModel],
+    record_cls: Type,
+    label: str,
+    texts: Any,
+) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """
+    Validate raw JSON entries once through the pydantic model.
+    Returns the valid raw entries and their records, position-aligned;
+    invalid entries are reported and dropped. Records read their long
+    text fields from texts, which is filled once validation is done.
+    """
+    valid, records = [], []
+    for i, item in enumerate(items):
+        try:
+            records.append(_record(model.model_validate(item), record_cls, position=len(records), texts=texts))
+        except ValidationError as e:
+            print(f"[ERROR] Skipping invalid {label} #{i}: {e.error_count()} validation error(s)")
+            continue
+        valid.append(item)
+    return valid, records
+
+
+def validate_data(data: Dict[str, List[Any]], texts: Any) -> Dict[str, List[Any]]:
+    """Validate every collection in place and return the records per collection."""
+    data["articles"], articles = validate_collection(
+        data.get("articles", []), Article, ArticleRecord, "article", texts
+    )
+    data["landmark_cases"], cases = validate_collection(
+        data.get("landmark_cases", []), LandmarkCase, LandmarkCaseRecord, "case", texts
+    )
+    data["procedures"], procedures = validate_collection(
+        data.get("procedures", []), Procedure, ProcedureRecord, "procedure", texts
+    )
+    return {"articles": articles, "landmark_cases": cases, "procedures": procedures}
+
+
+RECORD_CLASSES: Dict[str, Type] = {
+    "articles": ArticleRecord,
+    "landmark_cases": LandmarkCaseRecord,
+    "procedures": ProcedureRecord,
+}
+
+
+def _stored_fields(record_cls: Type) -> List[str]:
+    """Fields kept in a snapshot row; position and texts come from the table."""
+    return [f.name for f in fields(record_cls) if f.name not in ("position", "texts")]
+
+
+class RecordTable(Sequence):
+    """
+    The records of one collection over a mapped data snapshot: each is
+    built from its stored row (a JSON array of the validated short fields)
+    when read, so scoring and rendering touch only the candidates. Built
+    records go through a small LRU, so hot entries are built once.
+    """
+
+    def __init__(self, rows: Sequence[List[Any]], record_cls: Type, texts: Any, cache_size: int):
+        self._rows = rows
+        self._record_cls = record_cls
+        self._texts = texts
+        self.cache = LRUCache(cache_size, float("inf"))
+        # Records are shared by every thread serving requests
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        with self._lock:
+            record = self.cache.get(index)
+        if record is None:
+            values = self._rows[index]
+            record = self._record_cls(
+                *(tuple(v) if isinstance(v, list) else v for v in values), position=index, texts=self._texts
+            )
+            with self._lock:
+                self.cache.set(index, record)
+        return record
+
+
+def write_records(writer, records: Dict[str, List[Any]]):
+    """Store every collection's records as rows of a data snapshot (see app.core.snapshot)."""
+    for collection, items in records.items():
+        names = _stored_fields(RECORD_CLASSES[collection])
+        writer.rows(f"records.{collection}", ([getattr(r, name) for name in names] for r in items))
+
+
+def map_records(snapshot, texts: Any, cache_size: int) -> Dict[str, RecordTable]:
+    """The records per collection, read in place from a mapped data snapshot."""
+    return {
+        collection: RecordTable(snapshot.rows(f"records.{collection}"), record_cls, texts, cache_size)
+        for collection, record_cls in RECORD_CLASSES.items()
+    }
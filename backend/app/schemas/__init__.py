@@ -4,7 +4,10 @@ from app.schemas.legal import (
     LandmarkCaseBase, LandmarkCaseCreate, LandmarkCaseResponse,
     ProcedureBase, ProcedureCreate, ProcedureResponse,
     QuickReplyBase, QuickReplyCreate, QuickReplyResponse,
-    ChatMessage, ChatResponse
+    ChatMessage, ChatBatchRequest, ChatResponse,
+    ArticleBatchResponse, LandmarkCaseBatchResponse, ProcedureBatchResponse,
+    ArticlePage, LandmarkCasePage, ProcedurePage,
+    CategoryCount, YearCount, FacetsResponse
 )
 
 __all__ = [
@@ -12,5 +15,8 @@ __all__ = [
     "LandmarkCaseBase", "LandmarkCaseCreate", "LandmarkCaseResponse",
     "ProcedureBase", "ProcedureCreate", "ProcedureResponse",
     "QuickReplyBase", "QuickReplyCreate", "QuickReplyResponse",
-    "ChatMessage", "ChatResponse"
+    "ChatMessage", "ChatBatchRequest", "ChatResponse",
+    "ArticleBatchResponse", "LandmarkCaseBatchResponse", "ProcedureBatchResponse",
+    "ArticlePage", "LandmarkCasePage", "ProcedurePage",
+    "CategoryCount", "YearCount", "FacetsResponse"
 ]
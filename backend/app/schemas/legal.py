@@ -12,6 +12,15 @@ class MongoBaseModel(BaseModel):
         arbitrary_types_allowed=True,
     )
 
+    @classmethod
+    def from_record(cls, record):
+        """Build from a record validated at load, without validating again."""
+        values = {}
+        for name in cls.model_fields:
+            value = getattr(record, name)
+            values[name] = list(value) if isinstance(value, tuple) else value
+        return cls.model_construct(**values)
+
 # Article Schemas
 class ArticleBase(BaseModel):
     """Base Article schema."""
@@ -87,8 +96,67 @@ class ChatMessage(BaseModel):
     """Schema for chat message."""
     message: str = Field(..., min_length=1, max_length=1000)
 
+class ChatBatchRequest(BaseModel):
+    """Schema for a batch of chat messages, answered in order."""
+    messages: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(..., min_length=1, max_length=1000)
+
 class ChatResponse(BaseModel):
     """Schema for chat response."""
     success: bool
     message: str
     related_articles: Optional[List[ArticleResponse]] = None
+
+
+# Bulk Lookup Schemas
+class ArticleBatchResponse(BaseModel):
+    """Schema for a bulk article lookup: hits in request order, then misses."""
+    items: List[ArticleResponse]
+    missing: List[str]
+
+class LandmarkCaseBatchResponse(BaseModel):
+    """Schema for a bulk landmark case lookup."""
+    items: List[LandmarkCaseResponse]
+    missing: List[str]
+
+class ProcedureBatchResponse(BaseModel):
+    """Schema for a bulk procedure lookup."""
+    items: List[ProcedureResponse]
+    missing: List[str]
+
+
+# Cursor Page Schemas
+class ArticlePage(BaseModel):
+    """Schema for a cursor page of articles; next_cursor is null on the last page."""
+    items: List[ArticleResponse]
+    total: int
+    next_cursor: Optional[str] = None
+
+class LandmarkCasePage(BaseModel):
+    """Schema for a cursor page of landmark cases."""
+    items: List[LandmarkCaseResponse]
+    total: int
+    next_cursor: Optional[str] = None
+
+class ProcedurePage(BaseModel):
+    """Schema for a cursor page of legal procedures."""
+    items: List[ProcedureResponse]
+    total: int
+    next_cursor: Optional[str] = None
+
+
+# Facet Schemas
+class CategoryCount(BaseModel):
+    """Schema for a category facet bucket."""
+    name: str
+    count: int
+
+class YearCount(BaseModel):
+    """Schema for a year facet bucket."""
+    year: int
+    count: int
+
+class FacetsResponse(BaseModel):
+    """Schema for facet counts across articles and cases."""
+    article_categories: List[CategoryCount]
+    case_years: List[YearCount]
+    case_categories: List[CategoryCount]
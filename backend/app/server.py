@@ -0,0 +1,89 @@
+"""
+Production entry point: gunicorn managing uvicorn workers.
+
+    python -m app.server
+
+The app (and with it the data and every index) is loaded once in the
+master process and the workers are forked from it, so they share those
+pages copy-on-write instead of each building their own. Worker count,
+keep-alive, backlog, per-worker concurrency limit and graceful timeout
+come from Settings (WEB_WORKERS, KEEP_ALIVE, BACKLOG, LIMIT_CONCURRENCY,
+GRACEFUL_TIMEOUT).
+
+Signals to the master:
+    HUP   graceful restart: new workers are forked, old ones finish their
+          requests (up to GRACEFUL_TIMEOUT) and exit. They fork from the
+          preloaded app, so this recycles workers without reloading code;
+          data changes are picked up by the hot reload instead.
+    USR2  then QUIT to the old master: zero-downtime upgrade to new code.
+    TERM  graceful shutdown.
+"""
+import gc
+import os
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+
+
+def worker_count() -> int:
+    """WEB_WORKERS, or one per CPU this process may run on."""
+    if settings.WEB_WORKERS > 0:
+        return settings.WEB_WORKERS
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS
+        return os.cpu_count() or 1
+
+
+class Worker(UvicornWorker):
+    """uvicorn worker with the per-worker concurrency limit from Settings."""
+
+    CONFIG_KWARGS = {
+        "loop": "auto",
+        "http": "auto",
+        # Connections plus in-flight requests beyond this get a 503
+        "limit_concurrency": settings.LIMIT_CONCURRENCY or None,
+    }
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        if not settings.DATA_RELOAD_GROUP:
+            # Workers fork from this master and inherit the name; no other
+            # server (or stray process) shares their reload marker
+            settings.DATA_RELOAD_GROUP = f"server-{os.getpid()}"
+        from app.main import app
+        from app.core.database import db
+        # Workers only map the snapshot; a stale one is rewritten here, once
+        db.refresh_snapshot()
+        # Everything loaded so far lives for the life of the process: keep
+        # the collector of every worker from touching (and so copying) it
+        gc.freeze()
+        return app
+
+
+def options() -> dict:
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": worker_count(),
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "keepalive": settings.KEEP_ALIVE,
+        "backlog": settings.BACKLOG,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "accesslog": "-" if settings.ENVIRONMENT == "development" else None,
+    }
+
+
+if __name__ == "__main__":
+    Server(options()).run()
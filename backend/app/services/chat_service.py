@@ -1,74 +1,88 @@
+import heapq
 import re
-from typing import List, Dict, Optional
+from collections import defaultdict
+from typing import Iterator, List, Dict, Optional
+from app.core.config import settings
 from app.core.database import Database
-from app.models import Article, LandmarkCase, Procedure
+from app.core.indexes import tokenize
+from app.core.matcher import (
+    ARTICLE, CATEGORY, CASE, PROCEDURE, CASE_TRIGGERS, PROCEDURE_TRIGGERS, first_owner
+)
+from app.core.metrics import chat_answers_total, chat_stage_seconds
 from app.schemas import ArticleResponse
 
+# Cosine thresholds for the TF-IDF retrieval mode, playing the role of the
+# 1.5 / 1.0 score thresholds of the keyword scorer
+VECTOR_MIN_SCORE = 0.2
+VECTOR_RELATED_SCORE = 0.15
+
+
 class ChatService:
     """Service for handling chatbot logic."""
     
     def __init__(self, db: Database):
         self.db = db
     
-    def search_articles(self, query: str) -> List[Dict]:
+    def search_articles(self, query: str, matches: Optional[Dict[str, List]] = None) -> List[Dict]:
         """
         Search for articles based on keywords or article number.
         Returns list of articles with relevance scores.
+        Scoring walks the prebuilt index postings, so only candidate articles are touched.
+        `matches` may carry a keyword matcher result already computed for this query.
         """
         query_lower = query.lower().strip()
-        results = []
+        query_words = tokenize(query_lower)
+        index = self.db.article_index
+        scores = defaultdict(float)
         
         # Extract article number if present
         article_match = re.search(r'article\s*(\d+[a-z]?)', query_lower)
         
-        # Get all articles from memory
-        articles_data = self.db.articles
-        articles = [Article(**a) for a in articles_data]
-        
-        for article in articles:
-            score = 0
-            
-            # Direct article number match (highest priority)
-            if article_match and article_match.group(1) == article.number.lower():
-                results.append({
-                    'article': article,
-                    'score': 100.0
-                })
-                continue
-            
-            # Keyword matching with weighted scoring
-            for keyword in article.keywords:
-                if keyword.lower() in query_lower:
-                    score += 2
-            
-            # Title matching (high priority)
-            title_words = article.title.lower().split()
-            query_words = query_lower.split()
-            title_match_count = sum(1 for word in query_words if word in title_words)
-            if title_match_count > 0:
-                score += title_match_count * 3
-            
-            # Category matching
-            if article.category.lower() in query_lower:
-                score += 2
-            
-            # Description matching (lower priority but still useful)
-            desc_words = article.description.lower().split()
-            desc_match_count = sum(1 for word in query_words if word in desc_words and len(word) > 3)
-            if desc_match_count > 0:
-                score += desc_match_count * 0.5
-            
-            # Normalize score
-            if score > 0:
-                normalized_score = score / max(len(query_words), 1)
-                results.append({
-                    'article': article,
-                    'score': normalized_score
-                })
-        
-        # Sort by score
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:3]  # Return top 3 matches
+        # Direct article number match (highest priority)
+        exact_matches = set()
+        if article_match:
+            exact_matches.update(index.number_postings.get(article_match.group(1), []))
+        
+        # Keyword matching with weighted scoring
+        if matches is None:
+            matches = self.db.keyword_matcher.match(query_lower)
+        for owners in matches.values():
+            for kind, pos in owners:
+                if kind == ARTICLE:
+                    scores[pos] += 2
+        
+        # Title matching (high priority)
+        for word in query_words:
+            for pos in index.title_postings.get(word, []):
+                scores[pos] += 3
+        
+        # Category matching
+        for owners in matches.values():
+            for kind, pos in owners:
+                if kind == CATEGORY:
+                    scores[pos] += 2
+        
+        # Description matching (lower priority but still useful)
+        for word in query_words:
+            if len(word) > 3:
+                for pos in index.description_postings.get(word, []):
+                    scores[pos] += 0.5
+        
+        # Normalize score
+        ranked = [(100.0, pos) for pos in exact_matches]
+        word_count = max(len(query_words), 1)
+        ranked.extend(
+            (score / word_count, pos) for pos, score in scores.items()
+            if pos not in exact_matches
+        )
+        
+        # Sort by score, ties keep corpus order; return top 3 matches
+        top = heapq.nsmallest(3, ranked, key=lambda x: (-x[0], x[1]))
+        records = self.db.article_records
+        return [
+            {'article': records[pos], 'score': score, 'position': pos}
+            for score, pos in top
+        ]
     
     def get_smart_fallback(self, query: str) -> str:
         """Generate contextual fallback message based on query keywords."""
@@ -140,68 +154,169 @@ Try asking "What is Article 32?" or "What is Article 226?"!"""
 
 Type your question and I'll help you find the relevant constitutional provision!"""
     
-    def process_chat_message(self, message: str) -> Dict:
+    # Answers record their source entity, so they can be re-rendered in sections
+    
+    def format_procedure(self, pos: int) -> Dict:
+        return {'success': True, 'message': self.db.answers.procedure(pos), 'source': (PROCEDURE, pos)}
+    
+    def format_case(self, pos: int) -> Dict:
+        return {'success': True, 'message': self.db.answers.case(pos), 'source': (CASE, pos)}
+    
+    def format_article(self, pos: int, related: List[int]) -> Dict:
+        """Join the prerendered article answer with its related-article lines."""
+        return {
+            'success': True,
+            'message': self.db.answers.article(pos, related),
+            'related_articles': [self.db.article_records[p] for p in related],
+            'source': (ARTICLE, pos)
+        }
+    
+    def sections(self, result: Dict) -> Iterator[str]:
+        """
+        An answer's message as its heading and then its sections, for
+        streaming: each is sliced from the prerendered answer when the
+        consumer asks for it. Joined, they equal result['message'].
+        """
+        source = result.get('source')
+        if source is None:
+            # Fallback text: the first paragraph serves as the heading
+            heading, separator, rest = result['message'].partition("\n\n")
+            yield heading + separator
+            if rest:
+                yield rest
+            return
+        kind, pos = source
+        related = [a.position for a in result.get('related_articles') or []]
+        yield from self.db.answers.sections(kind, pos, related)
+    
+    def process_chat_message(self, message: str, hits: Optional[List] = None) -> Dict:
         """
         Process a chat message and return appropriate response.
         Sync processing since data is in memory.
+        A message that finds nothing is retried once with typos corrected
+        ("artcle 21a", "kesavanada"), then, in keyword mode, looked up by
+        case party name ("maneka case") before falling back.
+        `hits` may carry the vector search result already computed for this message.
+        """
+        result = self.answer(message, hits)
+        
+        retried = "false"
+        if result is None:
+            with chat_stage_seconds.time("spell_correction"):
+                corrected = self.db.spell_checker.correct(message)
+            if corrected != message.lower():
+                retried = "true"
+                result = self.answer(corrected)
+            if result is None and not self.uses_vectors():
+                result = self.answer_party_name(corrected)
+        
+        if result is None:
+            with chat_stage_seconds.time("fallback"):
+                fallback = self.get_smart_fallback(message)
+            chat_answers_total.inc("fallback", retried)
+            return {
+                'success': True,
+                'message': fallback
+            }
+        chat_answers_total.inc(result['source'][0], retried)
+        return result
+    
+    def process_chat_messages(self, messages: List[str]) -> List[Dict]:
+        """
+        process_chat_message for each message, in order, with identical
+        answers. In TF-IDF mode every message's similarity ranking comes
+        from one vectorized pass over the index.
+        """
+        if self.uses_vectors():
+            all_hits = self.db.vector_index.search_many(messages, k=4)
+            return [self.process_chat_message(m, hits) for m, hits in zip(messages, all_hits)]
+        return [self.process_chat_message(m) for m in messages]
+    
+    def uses_vectors(self) -> bool:
+        return settings.CHAT_RETRIEVAL_MODE == "tfidf" and self.db.vector_index is not None
+    
+    def answer_party_name(self, text: str) -> Optional[Dict]:
         """
+        A case asked for by a party name alone ("maneka case"). Only tried
+        once nothing else answered, so it never changes an existing answer.
+        """
+        query_lower = text.lower()
+        with chat_stage_seconds.time("case_routing"):
+            if any(word in query_lower for word in CASE_TRIGGERS):
+                pos = self.db.case_names.find(query_lower)
+                if pos is not None:
+                    return self.format_case(pos)
+        return None
+    
+    def answer(self, message: str, hits: Optional[List] = None) -> Optional[Dict]:
+        """Answer from the data, or None when nothing matches confidently."""
+        if self.uses_vectors():
+            return self.answer_with_vectors(message, hits)
+        
         query_lower = message.lower()
         
+        # One pass over the message finds every keyword and the entities owning it
+        with chat_stage_seconds.time("keyword_match"):
+            matches = self.db.keyword_matcher.match(query_lower.strip())
+        
         # Check for procedure queries
-        if any(word in query_lower for word in ['how to', 'procedure', 'process', 'file', 'filing']):
-            procedures_data = self.db.procedures
-            procedures = [Procedure(**p) for p in procedures_data]
-            
-            for proc in procedures:
-                if any(kw in query_lower for kw in proc.keywords):
-                    response = f"📋 **{proc.name}**\n\n"
-                    response += f"**Description:**\n{proc.description}\n\n"
-                    response += f"**Procedure:**\n{proc.procedure}\n\n"
-                    return {'success': True, 'message': response}
+        with chat_stage_seconds.time("procedure_routing"):
+            if any(word in query_lower for word in PROCEDURE_TRIGGERS):
+                pos = first_owner(matches, PROCEDURE)
+                if pos is not None:
+                    return self.format_procedure(pos)
         
         # Check for landmark case queries
-        if any(word in query_lower for word in ['case', 'judgment', 'judgement', 'kesavananda', 'maneka', 'puttaswamy']):
-            cases_data = self.db.cases
-            cases = [LandmarkCase(**c) for c in cases_data]
-            
-            for case in cases:
-                if any(kw in query_lower for kw in case.keywords) or case.name.lower() in query_lower:
-                    response = f"⚖️ **{case.name}**\n\n"
-                    response += f"**Year:** {case.year}\n\n"
-                    response += f"**Significance:**\n{case.significance}\n\n"
-                    response += f"**Key Points:**\n"
-                    for point in case.key_points:
-                        response += f"• {point}\n"
-                    return {'success': True, 'message': response}
+        with chat_stage_seconds.time("case_routing"):
+            if any(word in query_lower for word in CASE_TRIGGERS):
+                pos = first_owner(matches, CASE)
+                if pos is not None:
+                    return self.format_case(pos)
         
         # Search for relevant articles
-        results = self.search_articles(message)
+        with chat_stage_seconds.time("article_search"):
+            results = self.search_articles(message, matches)
         
-        # If no results or low confidence, use smart fallback
+        # If no results or low confidence, leave it to the smart fallback
         if not results or results[0]['score'] < 1.5:
-            return {
-                'success': True,
-                'message': self.get_smart_fallback(message)
-            }
+            return None
         
         # Format response with article details
-        best_match = results[0]['article']
-        response = f"📜 **Article {best_match.number}: {best_match.title}**\n\n"
-        response += f"**Category:** {best_match.category}\n\n"
-        # Accessing description correctly
-        response += f"**Description:**\n{best_match.description}\n\n"
-        
-        related_articles = []
+        related = []
         if len(results) > 1 and results[1]['score'] > 1.0:
-            response += "\n**Related Articles:**\n"
-            for result in results[1:]:
-                if result['score'] > 1.0:
-                    art = result['article']
-                    response += f"• Article {art.number}: {art.title}\n"
-                    related_articles.append(art)
+            related = [result['position'] for result in results[1:] if result['score'] > 1.0]
+        return self.format_article(results[0]['position'], related)
+    
+    def answer_with_vectors(self, message: str, hits: Optional[List] = None) -> Optional[Dict]:
+        """
+        TF-IDF retrieval mode: one similarity ranking over articles, cases and
+        procedures decides the answer. An explicit article number still wins.
+        """
+        if hits is None:
+            with chat_stage_seconds.time("vector_search"):
+                hits = self.db.vector_index.search(message, k=4)
         
-        return {
-            'success': True,
-            'message': response,
-            'related_articles': related_articles
-        }
+        article_match = re.search(r'article\s*(\d+[a-z]?)', message.lower())
+        requested = self.db.article_position(article_match.group(1)) if article_match else None
+        if requested is not None:
+            related = [
+                pos for kind, pos, score in hits
+                if kind == ARTICLE and score >= VECTOR_RELATED_SCORE and pos != requested
+            ]
+            return self.format_article(requested, related[:2])
+        
+        # If no results or low confidence, leave it to the smart fallback
+        if not hits or hits[0][2] < VECTOR_MIN_SCORE:
+            return None
+        
+        kind, pos, _ = hits[0]
+        if kind == PROCEDURE:
+            return self.format_procedure(pos)
+        if kind == CASE:
+            return self.format_case(pos)
+        
+        related = [
+            other for other_kind, other, score in hits[1:]
+            if other_kind == ARTICLE and score >= VECTOR_RELATED_SCORE
+        ]
+        return self.format_article(pos, related[:2])
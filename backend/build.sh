@@ -10,4 +10,7 @@ pip install -r requirements.txt
 echo "Running database migrations..."
 python scripts/migrate_data.py --clear
 
+echo "Building data snapshot..."
+python scripts/build_snapshot.py
+
 echo "Build completed successfully!"
@@ -0,0 +1,270 @@
+"""
+Microbenchmarks for the hot paths, on the shipped constitution_data.json
+(1x) and on corpora scaled up by scripts/generate_corpus.py.
+
+For every scale:
+    load              Database.load: parse, validate and index the JSON file
+    load_snapshot     Database.load mapping a snapshot built for that file
+    chat              ChatService.process_chat_message (the response cache
+                      sits in the route, so every message is scored)
+    search_articles   ChatService.search_articles
+    articles_list     get_articles: first and last page, category filter, search
+    cases_list        get_cases: first and last page, year filter, search
+    procedures_list   get_procedures: first and last page, search
+    *_cursor          the same list routes paged by cursor: first and last
+                      page, and the article category / case year filters
+
+Each benchmark cycles through its inputs until it has run for --min-time
+seconds and seen every input once, and reports the latency per call. The
+results, with the commit, Python version and machine they were measured
+on, are written to --out as JSON; --compare prints the change in median
+latency against an earlier results file.
+
+Usage (from backend/):
+    python scripts/benchmark.py                                   # 1x, 10x and 100x
+    python scripts/benchmark.py --scales 1,10,100,1000 --out after.json
+    python scripts/benchmark.py --compare before.json --out after.json
+    CHAT_RETRIEVAL_MODE=tfidf python scripts/benchmark.py
+
+At 1000x the corpus has 115,000 articles (100 MB of JSON); each load
+takes most of a minute and about 1.6 GB of memory.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# Append the backend directory to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from starlette.requests import Request
+
+from app.api.responses import encode_cursor
+from app.api.routes.articles import get_articles
+from app.api.routes.cases import get_cases
+from app.api.routes.procedures import get_procedures
+from app.core.config import settings
+from app.core.database import DATA_FILE, Database
+from app.services.chat_service import ChatService
+from generate_corpus import generate, load_data
+
+SAMPLE = 40
+TYPOS = ["artcle 21a", "fundamental rihgts", "kesavanada case", "right to privasy"]
+FALLBACKS = ["what about taxes", "hello", "can you help me"]
+
+# A bare GET without conditional headers, so no handler answers 304
+REQUEST = Request({"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": []})
+
+
+def call_route(route, **params):
+    """Run an async route handler that never awaits, without an event loop."""
+    coroutine = route(REQUEST, **params)
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError(f"{route.__name__} awaited")
+
+
+def sample(rng: random.Random, items: list, k: int = SAMPLE) -> list:
+    return rng.sample(items, min(k, len(items)))
+
+
+def chat_messages(data: dict, rng: random.Random) -> list:
+    """Quick replies, questions about real and synthetic entries, typos and misses."""
+    messages = [r if isinstance(r, str) else r.get('text', '') for r in data.get('quick_replies', [])]
+    messages += [f"What is Article {a['number']}?" for a in sample(rng, data['articles'])]
+    messages += [f"Tell me about the {c['name']} case" for c in sample(rng, data['landmark_cases'])]
+    messages += [f"How to {p['name'].lower()}?" for p in sample(rng, data['procedures'])]
+    keywords = [k for a in sample(rng, data['articles']) for k in a.get('keywords', [])[:1]]
+    messages += [f"What does the constitution say about {k}?" for k in keywords]
+    return [m for m in messages if m] + TYPOS + FALLBACKS
+
+
+def search_queries(data: dict, rng: random.Random) -> list:
+    articles = sample(rng, data['articles'])
+    queries = [f"article {a['number']}" for a in articles[:SAMPLE // 4]]
+    queries += [a['title'].lower() for a in articles[SAMPLE // 4:SAMPLE // 2]]
+    queries += [" ".join(a.get('keywords', [])[:2]) for a in articles[SAMPLE // 2:]]
+    return queries
+
+
+def list_calls(data: dict, database: Database, rng: random.Random) -> dict:
+    """Route calls per list endpoint: pages, filters and full-text searches."""
+    words = [k for item in sample(rng, data['articles'], 8) for k in item.get('keywords', [])[:1]]
+    category = Counter(a.get('category') for a in data['articles']).most_common(1)[0][0]
+    year = Counter(int(c['year']) for c in data['landmark_cases'] if str(c.get('year', '')).isdigit()).most_common(1)[0][0]
+    last = {name: max(0, len(data[name]) - 50) for name in ('articles', 'landmark_cases', 'procedures')}
+    orderings = database.orderings
+    # The cursor of the last page: the key just before its 50 entries
+    deepest = {name: encode_cursor(index.name, index.keys[-51]) if len(index) > 50 else ""
+               for name, index in (("articles", orderings.articles), ("cases", orderings.cases),
+                                   ("procedures", orderings.procedures))}
+
+    def page(route, **params):
+        defaults = {"db": database, "skip": 0, "limit": 50, "search": None, "cursor": None, **params}
+        return lambda extra: call_route(route, **{**defaults, **extra})
+
+    return {
+        "articles_list": (page(get_articles, category=None), [
+            {}, {"skip": last['articles']}, {"category": category},
+            *({"search": w} for w in words), {"search": words[0], "category": category},
+        ]),
+        "cases_list": (page(get_cases, year=None), [
+            {}, {"skip": last['landmark_cases']}, {"year": year}, *({"search": w} for w in words),
+        ]),
+        "procedures_list": (page(get_procedures), [
+            {}, {"skip": last['procedures']}, *({"search": w} for w in words),
+        ]),
+        "articles_cursor": (page(get_articles, category=None), [
+            {"cursor": ""}, {"cursor": deepest['articles']}, {"cursor": "", "category": category},
+        ]),
+        "cases_cursor": (page(get_cases, year=None), [
+            {"cursor": ""}, {"cursor": deepest['cases']}, {"cursor": "", "year": year},
+        ]),
+        "procedures_cursor": (page(get_procedures), [
+            {"cursor": ""}, {"cursor": deepest['procedures']},
+        ]),
+    }
+
+
+def percentile(values, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def measure(fn, inputs: list, min_time: float) -> dict:
+    """Per-call latency of fn over the inputs, cycled for at least min_time."""
+    gc.collect()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < len(inputs) or time.perf_counter() - started < min_time:
+        arg = inputs[len(timings) % len(inputs)]
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "calls": len(timings),
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "min_ms": timings[0] * 1000,
+    }
+
+
+def run_scale(base: dict, scale: int, seed: int, min_time: float, workdir: str) -> dict:
+    if scale == 1:
+        data_file, data = DATA_FILE, base
+    else:
+        data = generate(base, scale, seed)
+        data_file = os.path.join(workdir, f"corpus_{scale}x.json")
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    snapshot_file = os.path.join(workdir, f"corpus_{scale}x.snapshot")
+    rng = random.Random(seed)
+
+    results = {"load": measure(lambda _: Database.load(data_file, None), [None], min_time)}
+    database = Database.load(data_file, None)
+    database.write_snapshot(snapshot_file)
+    results["load_snapshot"] = measure(lambda _: Database.load(data_file, snapshot_file), [None], min_time)
+
+    service = ChatService(database)
+    results["chat"] = measure(service.process_chat_message, chat_messages(data, rng), min_time)
+    results["search_articles"] = measure(service.search_articles, search_queries(data, rng), min_time)
+    for name, (fn, inputs) in list_calls(data, database, rng).items():
+        results[name] = measure(fn, inputs, min_time)
+
+    return {
+        "scale": scale,
+        "corpus": {
+            "articles": len(database.articles),
+            "cases": len(database.cases),
+            "procedures": len(database.procedures),
+            "bytes": os.path.getsize(data_file),
+        },
+        "benchmarks": results,
+    }
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_scale(result: dict):
+    corpus = result["corpus"]
+    print(f"\n{result['scale']}x: {corpus['articles']} articles, {corpus['cases']} cases, "
+          f"{corpus['procedures']} procedures, {corpus['bytes'] / 1024:.0f} KiB")
+    print(f"  {'benchmark':<18}{'calls':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in result["benchmarks"].items():
+        print(f"  {name:<18}{stats['calls']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}")
+
+
+def compare(report: dict, baseline_file: str):
+    with open(baseline_file, encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {(s["scale"], name): stats["p50_ms"]
+              for s in baseline["scales"] for name, stats in s["benchmarks"].items()}
+    print(f"\nMedian latency vs {baseline_file} ({baseline.get('commit', '?')} -> {report['commit']}):")
+    for result in report["scales"]:
+        for name, stats in result["benchmarks"].items():
+            old = before.get((result["scale"], name))
+            if not old:
+                continue
+            change = stats["p50_ms"] / old - 1
+            print(f"  {result['scale']:>5}x {name:<18}{old:>10.3f} -> {stats['p50_ms']:>10.3f} ms  {change:+7.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks for chat, search, lists and loading")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated corpus scales")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    report = {
+        "commit": commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "retrieval_mode": settings.CHAT_RETRIEVAL_MODE,
+        "seed": args.seed,
+        "min_time": args.min_time,
+        "scales": [],
+    }
+    print(f"Commit {report['commit']}, Python {report['python']}, {report['retrieval_mode']} retrieval")
+    base = load_data(DATA_FILE)
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in (int(s) for s in args.scales.split(",")):
+            result = run_scale(base, scale, args.seed, args.min_time, workdir)
+            report["scales"].append(result)
+            print_scale(result)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[SUCCESS] Results written to {args.out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
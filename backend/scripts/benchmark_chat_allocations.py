@@ -0,0 +1,100 @@
+"""
+Measure allocations on the chat path.
+
+Compares the old per-message pattern (validating every article, case and
+procedure into pydantic models, then validating the ChatResponse again on
+the way out) with the current path, which reads the records validated at
+load and assembles the response with model_construct.
+
+Reports peak traced bytes and pydantic model instantiations per message.
+
+Usage (from backend/):
+    python scripts/benchmark_chat_allocations.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict
+
+# Append the backend directory to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pydantic import BaseModel
+
+from app.core.database import db
+from app.models import Article, LandmarkCase, Procedure
+from app.schemas import ArticleResponse, ChatResponse
+from app.services.chat_service import ChatService
+
+ROUNDS = 20
+
+
+def count_models():
+    """Patch BaseModel.__init__ to count validated instantiations."""
+    counter = {"models": 0}
+    original = BaseModel.__init__
+
+    def counting_init(self, **data):
+        counter["models"] += 1
+        original(self, **data)
+
+    BaseModel.__init__ = counting_init
+    return counter, original
+
+
+def legacy(service, message):
+    # Every message used to validate the full corpus before scoring
+    [Article(**a) for a in db.articles]
+    [LandmarkCase(**c) for c in db.cases]
+    [Procedure(**p) for p in db.procedures]
+    result = service.process_chat_message(message)
+    related = [ArticleResponse(**asdict(a)) for a in result.get('related_articles') or []]
+    response = ChatResponse(success=result['success'], message=result['message'],
+                            related_articles=related or None)
+    return response.model_dump_json(by_alias=True)
+
+
+def current(service, message):
+    result = service.process_chat_message(message)
+    related = result.get('related_articles')
+    response = ChatResponse.model_construct(
+        success=result['success'],
+        message=result['message'],
+        related_articles=None if related is None else [ArticleResponse.from_record(a) for a in related]
+    )
+    return response.model_dump_json(by_alias=True)
+
+
+def measure(label, fn, service, messages):
+    counter, original = count_models()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        for _ in range(ROUNDS):
+            for message in messages:
+                fn(service, message)
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        BaseModel.__init__ = original
+
+    calls = ROUNDS * len(messages)
+    print(f"{label:<8} peak {peak / 1024:8.1f} KiB   "
+          f"{counter['models'] / calls:7.1f} models/msg   "
+          f"{elapsed / calls * 1000:6.3f} ms/msg")
+
+
+def main():
+    service = ChatService(db)
+    messages = [r if isinstance(r, str) else r.get("text", "") for r in db.quick_replies]
+    messages = [m for m in messages if m] or ["Tell me about Article 21"]
+    print(f"{len(db.articles)} articles, {len(db.cases)} cases, {len(db.procedures)} procedures; "
+          f"{len(messages)} messages x {ROUNDS} rounds\n")
+    measure("legacy", legacy, service, messages)
+    measure("current", current, service, messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Load test: chat throughput of the production server (app.server) as the
+number of workers grows.
+
+For each worker count the server is started with WEB_WORKERS=N and the
+chat cache disabled, so every request is scored. Client processes then
+POST chat messages over keep-alive connections for a fixed time, and the
+script reports requests per second, the speedup over one worker, the
+latency percentiles and each worker's private (unshared) memory, which
+stays small because the workers are forked from a preloaded master.
+
+Usage (from backend/):
+    python scripts/benchmark_workers.py                       # 1, 2, 4, ... up to the CPU count
+    python scripts/benchmark_workers.py --workers 1,2,4 --duration 20 --clients 16
+
+The clients run on the same machine and need CPU too: for numbers that
+reflect the server alone, leave some cores to them (e.g. measure up to
+half the cores).
+"""
+import argparse
+import json
+import os
+import sys
+
+from loadgen import DATA_FILE, percentile, run as run_clients, start_server, stop_server
+
+
+def messages():
+    """The quick replies plus article, case and procedure questions, some misspelt."""
+    with open(DATA_FILE, encoding='utf-8') as f:
+        data = json.load(f)
+    prompts = [r if isinstance(r, str) else r.get('text', '') for r in data.get('quick_replies', [])]
+    prompts += [f"What is Article {a['number']}?" for a in data.get('articles', [])]
+    prompts += [f"Tell me about the {c['name']} case" for c in data.get('landmark_cases', [])]
+    prompts += [f"How to {p['name'].lower()}?" for p in data.get('procedures', [])]
+    prompts += ["artcle 21a", "fundamental rihgts", "kesavanada case", "what about taxes"]
+    return prompts
+
+
+def start_workers(workers: int, port: int):
+    env = {
+        "WEB_WORKERS": str(workers),
+        "PORT": str(port),
+        "CHAT_CACHE_SIZE": "0",
+        "CHAT_CACHE_BACKEND": "local",
+        "ENVIRONMENT": "production",
+    }
+    return start_server([sys.executable, "-m", "app.server"], port, settle=0.5 + 0.1 * workers, env=env)
+
+
+def worker_memory_kb(master_pid: int) -> int:
+    """Average private memory of the master's children (Linux only, else 0)."""
+    try:
+        with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+            pids = f.read().split()
+    except OSError:
+        return 0
+    private = []
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                private.append(sum(
+                    int(line.split()[1]) for line in f
+                    if line.startswith(("Private_Clean:", "Private_Dirty:"))
+                ))
+        except OSError:
+            pass
+    return sum(private) // len(private) if private else 0
+
+
+def run(port: int, clients: int, duration: float, prompts) -> dict:
+    requests = {"chat": [("POST", "/api/v1/chat", json.dumps({"message": m})) for m in prompts]}
+    latencies, errors = run_clients("127.0.0.1", port, requests, {"chat": 1}, clients, duration)["chat"]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def default_workers():
+    cpus = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    return counts + [cpus]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat throughput by worker count")
+    parser.add_argument("--workers", default=",".join(map(str, default_workers())),
+                        help="comma-separated worker counts")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--clients", type=int, default=0, help="client processes (default 4 per worker)")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    prompts = messages()
+    counts = [int(n) for n in args.workers.split(",")]
+    print(f"{os.cpu_count()} CPUs, {len(prompts)} distinct messages, {args.duration:.0f}s per run, chat cache off\n")
+    print(f"{'workers':>8}{'clients':>9}{'req/s':>10}{'speedup':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'errors':>8}{'private KiB/worker':>20}")
+    baseline = None
+    for workers in counts:
+        clients = args.clients or 4 * workers
+        server = start_workers(workers, args.port)
+        try:
+            result = run(args.port, clients, args.duration, prompts)
+            private = worker_memory_kb(server.pid)
+        finally:
+            stop_server(server)
+        baseline = baseline or result["rps"]
+        print(f"{workers:>8}{clients:>9}{result['rps']:>10.0f}{result['rps'] / baseline:>8.2f}x"
+              f"{result['p50_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['errors']:>8}{private:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Build the binary data snapshot (data/constitution_data.snapshot).
+
+The snapshot holds the entries and validated records, the derived indexes
+(lookup maps, facets and sort orderings, BM25 postings, the chat keyword
+automaton with its edges in CSR arrays, article postings, the spelling
+index), the long text fields, and every pre-serialized response body and
+rendered chat answer for the current version of constitution_data.json.
+Workers map it read-only instead of parsing the data file and building all
+of that on their own heaps, so N workers share one page-cache copy. It is
+tied to the data file's content hash and to the code that wrote it, so it
+must be rebuilt whenever either changes (a stale snapshot is ignored with a
+warning and everything is built in memory as before; the preloading server
+master, app.server, rewrites it for the next start, workers never do).
+
+Usage (from backend/):
+    python scripts/build_snapshot.py               # build
+    python scripts/build_snapshot.py --benchmark   # compare startup with and without it
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Append the backend directory to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+RUNS = 5
+
+
+def memory_kb():
+    """Resident and anonymous (process-private heap) memory, Linux only."""
+    values = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Anonymous"):
+                    values[name] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values.get("Rss", 0), values.get("Anonymous", 0)
+
+
+def measure():
+    """
+    Runs in a fresh interpreter with DATA_SNAPSHOT set by the parent:
+    times the startup load done on import of app.core.database, after
+    every module it depends on is already imported.
+    """
+    import app.core.payloads, app.core.snapshot, app.core.fulltext, app.core.fuzzy  # noqa: F401
+    import app.core.indexes, app.core.matcher, app.models.records  # noqa: F401
+    rss_before, anon_before = memory_kb()
+    start = time.perf_counter()
+    from app.core.database import db
+    elapsed = time.perf_counter() - start
+    # Touch every body, as serving traffic would
+    for name in ("articles", "cases", "procedures"):
+        for body in getattr(db.payloads, name):
+            len(body)
+    rss_after, anon_after = memory_kb()
+    print(json.dumps({
+        "ms": elapsed * 1000,
+        "rss_kb": rss_after - rss_before,
+        "anon_kb": anon_after - anon_before,
+        "snapshot": db.snapshot is not None,
+    }))
+
+
+def benchmark():
+    from app.core.database import SNAPSHOT_FILE
+    if not os.path.exists(SNAPSHOT_FILE):
+        build()
+    print(f"\n{'mode':<10}{'load ms':>10}{'RSS +KiB':>10}{'anon +KiB':>11}   (median of {RUNS} runs)")
+    for mode in ("json", "snapshot"):
+        results = []
+        for _ in range(RUNS):
+            env = {**os.environ, "DATA_SNAPSHOT": "true" if mode == "snapshot" else "false"}
+            out = subprocess.run(
+                [sys.executable, __file__, "--measure"],
+                capture_output=True, text=True, check=True, env=env,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            assert result["snapshot"] == (mode == "snapshot"), "snapshot was not used"
+            results.append(result)
+        median = lambda key: sorted(r[key] for r in results)[RUNS // 2]
+        print(f"{mode:<10}{median('ms'):>10.1f}{median('rss_kb'):>10}{median('anon_kb'):>11}")
+
+
+def build():
+    from app.core.database import DATA_FILE, SNAPSHOT_FILE, Database
+    database = Database.load(snapshot_file=None)
+    database.write_snapshot(SNAPSHOT_FILE)
+    size = os.path.getsize(SNAPSHOT_FILE)
+    print(f"[SUCCESS] Wrote {SNAPSHOT_FILE} ({size / 1024:.1f} KiB) for {os.path.basename(DATA_FILE)} "
+          f"version {database.version}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure()
+    elif sys.argv[1:2] == ["--benchmark"]:
+        benchmark()
+    else:
+        build()
@@ -0,0 +1,86 @@
+"""
+Regression check for chat answers.
+
+Every message below is answered by the keyword pipeline, once with the
+indexes built in memory and once with them mapped from a freshly built
+snapshot, and the first line of the answer (which names the article, case
+or procedure, or starts the fallback) must match the expected one. Each
+check notes the bug it guards against. Exits 1 on any mismatch.
+
+Usage (from backend/):
+    python scripts/check_answers.py
+"""
+import os
+import sys
+import tempfile
+
+# Append the backend directory to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.core.database import DATA_FILE, Database
+from app.services.chat_service import ChatService
+
+FALLBACK = "I couldn't find specific information about that query."
+
+# (message, expected first line of the answer)
+CHECKS = [
+    # Keywords match as substrings, as they always have; case and procedure
+    # keywords keep their case, so "MP" is not found in "temple" and
+    # uppercase acronyms ("RTI", "PIL") never route a message
+    ("What is the procedure under Article 356?", "📜 **Article 356: President's Rule**"),
+    ("How to get a domicile certificate", FALLBACK),
+    ("important case on compensation", FALLBACK),
+    ("landmark case on company law", FALLBACK),
+    ("Sabarimala Temple Entry Case (2018) case", "⚖️ **Sabarimala Temple Entry Case (2018)**"),
+    ("how to Obtaining a Succession Certificate", "📋 **Obtaining a Succession Certificate**"),
+    ("filing an article", FALLBACK),
+    ("how to file an RTI", FALLBACK),
+    ("how to file pil", FALLBACK),
+    # Plurals and inflections still contain their keyword
+    ("tell me about Panchayats", "📜 **Article 243G: Powers of Panchayats**"),
+    ("inequality", "📜 **Article 14: Equality before law**"),
+    # A party name only picks a case once nothing else answered: messages that
+    # reach an article keep it, messages that fell back now find the case
+    ("ahmed case on name and territory of the union", "📜 **Article 1: Name and territory of the Union**"),
+    ("the bano judgment", "⚖️ **Shayara Bano v. Union of India (2017)**"),
+    ("maneka case", "⚖️ **Maneka Gandhi v. Union of India (1978)**"),
+    # Typos, corrected on the retry ("artical" is two edits from "article")
+    ("artical 21", "📜 **Article 21: Protection of life and personal liberty**"),
+    ("what is artical 370", "📜 **Article 370: Temporary provisions with respect to the State of Jammu and Kashmir**"),
+]
+
+
+def heading(result: dict) -> str:
+    """First line of an answer identifies the entity (article, case or procedure)."""
+    return result['message'].split('\n', 1)[0].strip()
+
+
+def check(database: Database, label: str) -> int:
+    service = ChatService(database)
+    failures = 0
+    for message, expected in CHECKS:
+        answer = heading(service.process_chat_message(message))
+        if answer != expected:
+            failures += 1
+            print(f"[ERROR] {label}: {message!r}\n    expected: {expected}\n    got:      {answer}")
+    return failures
+
+
+def main():
+    settings.CHAT_RETRIEVAL_MODE = "keyword"
+    built = Database.load(DATA_FILE, None)
+    failures = check(built, "in memory")
+    with tempfile.TemporaryDirectory() as workdir:
+        snapshot_file = os.path.join(workdir, "check.snapshot")
+        built.write_snapshot(snapshot_file)
+        failures += check(Database.load(DATA_FILE, snapshot_file), "snapshot")
+
+    if failures:
+        print(f"\n[ERROR] {failures} answer(s) changed")
+        sys.exit(1)
+    print(f"[SUCCESS] All {len(CHECKS)} answers match, in memory and from a snapshot")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the TF-IDF retrieval mode against the keyword scorer.
+
+Runs every quick reply prompt (plus any extra prompts given on the command
+line) through both chat pipelines and reports which entity each one answers
+with, top-1 agreement, and per-query latency.
+
+Usage (from backend/):
+    python scripts/evaluate_retrieval.py
+    python scripts/evaluate_retrieval.py "how do I get bail" "privacy judgment"
+"""
+import os
+import sys
+import time
+
+# Append the backend directory to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.core.database import db
+from app.core.vectors import build_vector_index
+from app.services.chat_service import ChatService
+
+
+def heading(result: dict) -> str:
+    """First line of an answer identifies the entity (article, case or procedure)."""
+    return result['message'].split('\n', 1)[0].strip()
+
+
+def run(service: ChatService, mode: str, prompts: list) -> tuple:
+    settings.CHAT_RETRIEVAL_MODE = mode
+    answers = []
+    start = time.perf_counter()
+    for prompt in prompts:
+        answers.append(heading(service.process_chat_message(prompt)))
+    elapsed = (time.perf_counter() - start) / max(len(prompts), 1)
+    return answers, elapsed
+
+
+def main():
+    prompts = [r if isinstance(r, str) else r.get('text', '') for r in db.quick_replies]
+    prompts += sys.argv[1:]
+
+    if db.vector_index is None:
+        db.current.vector_index = build_vector_index(
+            db.expanded("articles"), db.expanded("landmark_cases"), db.expanded("procedures")
+        )
+    service = ChatService(db)
+
+    keyword_answers, keyword_time = run(service, "keyword", prompts)
+    vector_answers, vector_time = run(service, "tfidf", prompts)
+
+    agree = 0
+    for prompt, keyword, vector in zip(prompts, keyword_answers, vector_answers):
+        same = keyword == vector
+        agree += same
+        print(f"{'=' if same else '!'} {prompt}")
+        print(f"    keyword: {keyword}")
+        if not same:
+            print(f"    tfidf:   {vector}")
+
+    print("\n--- Summary ---")
+    print(f"Prompts: {len(prompts)}")
+    print(f"Top-1 agreement: {agree}/{len(prompts)}")
+    print(f"Keyword fallbacks: {sum(not a.startswith(('📜', '⚖️', '📋')) for a in keyword_answers)}")
+    print(f"TF-IDF fallbacks:  {sum(not a.startswith(('📜', '⚖️', '📋')) for a in vector_answers)}")
+    print(f"Keyword scorer: {keyword_time * 1000:.3f} ms/query")
+    print(f"TF-IDF scorer:  {vector_time * 1000:.3f} ms/query")
+    print(f"Vector index: {db.vector_index.size} documents, {len(db.vector_index.vocabulary)} features")
+
+
+if __name__ == "__main__":
+    main()
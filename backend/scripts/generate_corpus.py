@@ -0,0 +1,127 @@
+"""
+Generate a synthetic constitution_data.json N times the size of the real one.
+
+Copy 0 is the shipped data unchanged. Every further copy adds a variant of
+each article, case and procedure:
+    articles    numbered 1000 * copy + index, so they never clash with (or
+                shadow) a real article number
+    cases       petitioner and respondent recombined from other real cases,
+                with a random year
+    procedures  the procedure as it applies in one of the states
+Keywords keep a couple of the entry's own and add a few drawn from every
+keyword in the corpus, weighted by how often each occurs, so postings
+lists and automaton grow the way a larger real corpus would. Titles,
+descriptions and categories are reused, so the text fields and the
+category/year facets keep their real distribution. The output is
+deterministic for a given scale and seed.
+
+Usage (from backend/):
+    python scripts/generate_corpus.py --scale 100 --out /tmp/corpus_100x.json
+"""
+import argparse
+import json
+import os
+import random
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATA_FILE = os.path.join(BACKEND_DIR, 'data', 'constitution_data.json')
+
+STATES = [
+    "Andhra Pradesh", "Assam", "Bihar", "Delhi", "Goa", "Gujarat", "Haryana",
+    "Karnataka", "Kerala", "Madhya Pradesh", "Maharashtra", "Odisha", "Punjab",
+    "Rajasthan", "Tamil Nadu", "Telangana", "Uttar Pradesh", "West Bengal",
+]
+OWN_KEYWORDS = 2
+EXTRA_KEYWORDS = (1, 4)
+
+
+def load_data(path: str = DATA_FILE) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def keyword_pool(data: Dict[str, Any]):
+    """Every keyword in the corpus and how often it occurs."""
+    counts = Counter()
+    for collection in ("articles", "landmark_cases", "procedures"):
+        for item in data.get(collection, []):
+            counts.update(k.lower() for k in item.get("keywords", []))
+    words = list(counts)
+    return words, [counts[w] for w in words]
+
+
+def variant_keywords(item: Dict[str, Any], pool, rng: random.Random) -> List[str]:
+    words, weights = pool
+    own = list(item.get("keywords", []))
+    keywords = rng.sample(own, min(OWN_KEYWORDS, len(own)))
+    for word in rng.choices(words, weights, k=rng.randint(*EXTRA_KEYWORDS)):
+        if word not in keywords:
+            keywords.append(word)
+    return keywords
+
+
+def split_case_name(name: str):
+    """'A v. B (1973)' -> ('A', 'B'); None for names without two parties."""
+    match = re.match(r'^(.+?) v\. (.+?)(?: \(\d{4}\))?$', name)
+    return match.groups() if match else None
+
+
+def generate(data: Dict[str, Any], scale: int, seed: int = 0) -> Dict[str, Any]:
+    """The data plus scale - 1 synthetic copies of every entry."""
+    rng = random.Random(seed)
+    pool = keyword_pool(data)
+    articles = data.get("articles", [])
+    cases = data.get("landmark_cases", [])
+    procedures = data.get("procedures", [])
+    parties = [p for p in (split_case_name(c["name"]) for c in cases) if p]
+
+    out = {
+        "articles": [dict(a) for a in articles],
+        "landmark_cases": [dict(c) for c in cases],
+        "procedures": [dict(p) for p in procedures],
+        "quick_replies": list(data.get("quick_replies", [])),
+    }
+    for copy in range(1, scale):
+        for i, article in enumerate(articles):
+            variant = dict(article, number=str(1000 * copy + i))
+            variant["keywords"] = variant_keywords(article, pool, rng)
+            out["articles"].append(variant)
+
+        for case in cases:
+            year = str(rng.randint(1950, 2024))
+            own = split_case_name(case["name"])
+            if own and parties:
+                name = f"{own[0]} v. {rng.choice(parties)[1]} ({year})"
+            else:
+                name = re.sub(r'\s*\(\d{4}\)$', '', case["name"]) + f" ({year})"
+            variant = dict(case, name=name, year=year)
+            variant["keywords"] = variant_keywords(case, pool, rng)
+            out["landmark_cases"].append(variant)
+
+        for procedure in procedures:
+            variant = dict(procedure, name=f"{procedure['name']} in {rng.choice(STATES)}")
+            variant["keywords"] = variant_keywords(procedure, pool, rng)
+            out["procedures"].append(variant)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale constitution_data.json synthetically")
+    parser.add_argument("--scale", type=int, default=10, help="size relative to the shipped data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--source", default=DATA_FILE)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    data = generate(load_data(args.source), args.scale, args.seed)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    print(f"[SUCCESS] Wrote {len(data['articles'])} articles, {len(data['landmark_cases'])} cases, "
+          f"{len(data['procedures'])} procedures to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+End-to-end load test of the ASGI app, checked against latency SLOs.
+
+Boots app.main:app with uvicorn on a local port (or targets --url), then
+client processes send a weighted mix of requests back to back over
+keep-alive connections:
+    quick_reply   POST /chat with a quick reply prompt
+    chat          POST /chat with free text: questions about articles,
+                  cases and procedures, typos and unanswerable messages
+    search        GET /articles?search=...
+    detail        GET /articles/{number}, /cases/{id}, /procedures/{id}
+    health        GET /health
+Requests sent during the warm-up are not counted. The report gives the
+throughput, p50/p95/p99 latency and error rate per kind and overall, then
+checks them against the SLOs; any breach makes the exit status 1.
+
+Usage (from backend/):
+    python scripts/load_test.py
+    python scripts/load_test.py --concurrency 16 --duration 60 --out report.json
+    python scripts/load_test.py --mix chat=1,health=1 --slo chat.p99=150 --slo all.errors=0
+    python scripts/load_test.py --url http://127.0.0.1:8000    # an already running server
+
+The app runs with its own settings (.env), so the chat cache is on unless
+CHAT_CACHE_SIZE=0 is set; --workers starts more uvicorn workers. Client
+processes share the machine with the server: keep --concurrency at or
+below the number of cores for latencies that reflect the server.
+"""
+import argparse
+import http.client
+import json
+import sys
+from urllib.parse import quote, urlsplit
+
+from loadgen import DATA_FILE, percentile, run as run_clients, start_server, stop_server
+
+API = "/api/v1"
+MIX = {"quick_reply": 25, "chat": 25, "search": 20, "detail": 25, "health": 5}
+# Milliseconds, except errors (percent of requests); "all" is every request
+SLOS = {
+    "all.p50": 25.0,
+    "all.p95": 100.0,
+    "all.p99": 200.0,
+    "all.errors": 0.1,
+    "quick_reply.p99": 150.0,
+    "chat.p99": 250.0,
+    "search.p99": 100.0,
+    "detail.p99": 50.0,
+    "health.p99": 50.0,
+}
+TYPOS = ["artcle 21a", "fundamental rihgts", "kesavanada case", "right to privasy"]
+FALLBACKS = ["what about taxes", "hello", "can you help me"]
+
+
+def chat(message: str):
+    return ("POST", f"{API}/chat", json.dumps({"message": message}))
+
+
+def get(path: str):
+    return ("GET", path, None)
+
+
+def traffic(data: dict, case_ids: list, procedure_ids: list) -> dict:
+    """The requests of each kind, built from the data file and the live ids."""
+    quick_replies = [r if isinstance(r, str) else r.get('text', '') for r in data.get('quick_replies', [])]
+    articles = data.get('articles', [])
+    questions = [f"What is Article {a['number']}?" for a in articles]
+    questions += [f"Tell me about the {c['name']} case" for c in data.get('landmark_cases', [])]
+    questions += [f"How to {p['name'].lower()}?" for p in data.get('procedures', [])]
+    questions += [f"What does the constitution say about {k}?" for a in articles for k in a.get('keywords', [])[:1]]
+    terms = sorted({k for a in articles for k in a.get('keywords', [])})
+    return {
+        "quick_reply": [chat(m) for m in quick_replies if m],
+        "chat": [chat(m) for m in questions + TYPOS + FALLBACKS],
+        "search": [get(f"{API}/articles?search={quote(t)}") for t in terms],
+        "detail": [get(f"{API}/articles/{quote(a['number'])}") for a in articles]
+                  + [get(f"{API}/cases/{quote(i)}") for i in case_ids]
+                  + [get(f"{API}/procedures/{quote(i)}") for i in procedure_ids],
+        "health": [get("/health")],
+    }
+
+
+def start_app(port: int, workers: int):
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--no-access-log", "--log-level", "warning"]
+    return start_server(command, port, settle=0.2 * workers, quiet=False)
+
+
+def fetch_json(host: str, port: int, path: str):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    if response.status != 200:
+        raise RuntimeError(f"GET {path} returned {response.status}")
+    return json.loads(body)
+
+
+def summarize(latencies: list, errors: int, duration: float) -> dict:
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "rps": total / duration,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "max": max(latencies, default=0.0) * 1000,
+        "errors": errors / total * 100 if total else 0.0,
+    }
+
+
+def run(host: str, port: int, requests: dict, weights: dict, concurrency: int,
+        duration: float, warmup: float) -> dict:
+    results = run_clients(host, port, requests, weights, concurrency, duration, warmup,
+                          headers={"Accept-Encoding": "gzip, br"})
+    report = {kind: summarize(latencies, errors, duration) for kind, (latencies, errors) in results.items()}
+    every = [l for latencies, _ in results.values() for l in latencies]
+    report["all"] = summarize(every, sum(errors for _, errors in results.values()), duration)
+    return report
+
+
+def check(report: dict, slos: dict) -> list:
+    """(name, value, limit, passed) for every SLO that applies to the run."""
+    results = []
+    for name, limit in slos.items():
+        kind, metric = name.split(".")
+        if kind in report and report[kind]["requests"]:
+            value = report[kind][metric]
+            results.append((name, value, limit, value <= limit))
+    return results
+
+
+def parse_pairs(values, cast=float) -> dict:
+    pairs = {}
+    for value in values:
+        for item in value.split(","):
+            name, _, number = item.partition("=")
+            pairs[name.strip()] = cast(number)
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test app.main:app against latency SLOs")
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--concurrency", type=int, default=4, help="client processes")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds first")
+    parser.add_argument("--mix", action="append", default=[],
+                        help="weights, e.g. chat=50,health=0 (default " + ",".join(f"{k}={v}" for k, v in MIX.items()) + ")")
+    parser.add_argument("--slo", action="append", default=[],
+                        help="thresholds, e.g. chat.p99=300 or all.errors=0.5")
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args()
+
+    weights = {**MIX, **parse_pairs(args.mix)}
+    weights = {kind: weight for kind, weight in weights.items() if weight > 0}
+    unknown = set(weights) - set(MIX)
+    if unknown:
+        parser.error(f"unknown request kinds: {', '.join(sorted(unknown))}")
+    slos = {**SLOS, **parse_pairs(args.slo)}
+    for name in slos:
+        kind, _, metric = name.partition(".")
+        if kind not in {*MIX, "all"} or metric not in ("p50", "p95", "p99", "max", "errors"):
+            parser.error(f"unknown SLO {name}: use <kind or all>.<p50|p95|p99|max|errors>")
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        server = start_app(port, args.workers)
+    try:
+        with open(DATA_FILE, encoding='utf-8') as f:
+            data = json.load(f)
+        case_ids = [c["_id"] for c in fetch_json(host, port, f"{API}/cases?limit=100")]
+        procedure_ids = [p["_id"] for p in fetch_json(host, port, f"{API}/procedures?limit=100")]
+        requests = traffic(data, case_ids, procedure_ids)
+        print(f"{args.concurrency} clients, {args.duration:.0f}s after {args.warmup:.0f}s warm-up, mix "
+              + ", ".join(f"{k}={v:g}" for k, v in weights.items()))
+        report = run(host, port, requests, weights, args.concurrency, args.duration, args.warmup)
+    finally:
+        if server:
+            stop_server(server)
+
+    print(f"\n{'kind':<13}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}{'errors':>8}")
+    for kind, stats in report.items():
+        print(f"{kind:<13}{stats['requests']:>9}{stats['rps']:>9.0f}{stats['p50']:>9.2f}{stats['p95']:>9.2f}"
+              f"{stats['p99']:>9.2f}{stats['max']:>9.2f}{stats['errors']:>7.2f}%")
+
+    results = check(report, slos)
+    print("\nSLOs:")
+    for name, value, limit, passed in results:
+        unit = "%" if name.endswith(".errors") else " ms"
+        print(f"  {'PASS' if passed else 'FAIL'}  {name:<18}{value:>9.2f}{unit} <= {limit:g}{unit}")
+    breaches = [name for name, _, _, passed in results if not passed]
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({
+                "concurrency": args.concurrency, "duration": args.duration, "mix": weights,
+                "results": report,
+                "slos": [{"name": n, "value": v, "limit": l, "passed": p} for n, v, l, p in results],
+            }, f, indent=2)
+    if breaches:
+        print(f"\n[ERROR] SLO breached: {', '.join(breaches)}")
+        sys.exit(1)
+    print("\n[SUCCESS] All SLOs met")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Shared client and server plumbing for the load scripts
+(benchmark_workers.py and load_test.py).
+
+A request is a (method, path, body) tuple; `requests` maps each kind of
+request to the tuples of that kind, and `weights` says how often each kind
+is sent. Client processes send them back to back over keep-alive
+connections, and `run` returns every kind's latencies and error count.
+"""
+import http.client
+import os
+import random
+import signal
+import subprocess
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATA_FILE = os.path.join(BACKEND_DIR, 'data', 'constitution_data.json')
+
+
+def client(job):
+    """One client process: weighted requests back to back until the deadline."""
+    host, port, start_at, deadline, requests, weights, headers, seed = job
+    rng = random.Random(seed)
+    kinds = list(weights)
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    latencies = {kind: [] for kind in kinds}
+    errors = {kind: 0 for kind in kinds}
+    while time.time() < deadline:
+        kind = rng.choices(kinds, [weights[k] for k in kinds])[0]
+        method, path, body = rng.choice(requests[kind])
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 400
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            ok = False
+        elapsed = time.perf_counter() - start
+        # Requests sent during the warm-up are not counted
+        if time.time() < start_at:
+            continue
+        if ok:
+            latencies[kind].append(elapsed)
+        else:
+            errors[kind] += 1
+    connection.close()
+    return latencies, errors
+
+
+def run(host: str, port: int, requests: Dict[str, list], weights: Dict[str, float], concurrency: int,
+        duration: float, warmup: float = 0.0, headers: Optional[dict] = None) -> Dict[str, Tuple[List[float], int]]:
+    """Run `concurrency` client processes; (latencies, errors) per kind over the measured `duration`."""
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    start_at = time.time() + warmup
+    deadline = start_at + duration
+    jobs = [(host, port, start_at, deadline, requests, weights, headers, seed) for seed in range(concurrency)]
+    with Pool(concurrency) as pool:
+        results = pool.map(client, jobs)
+    return {
+        kind: ([l for result, _ in results for l in result[kind]], sum(errors[kind] for _, errors in results))
+        for kind in weights
+    }
+
+
+def start_server(command: List[str], port: int, settle: float = 0.0, env: Optional[dict] = None,
+                 quiet: bool = True) -> subprocess.Popen:
+    """
+    Start a server process from backend/ and wait until /health answers 200.
+    `settle` more seconds give the remaining workers time to boot as well.
+    Its output is discarded; with quiet=False its stderr (warnings) is kept.
+    """
+    server = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL if quiet else None,
+    )
+    for _ in range(300):
+        if server.poll() is not None:
+            break
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                time.sleep(settle)
+                return server
+        except OSError:
+            pass
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"{' '.join(command[1:])} did not start")
+
+
+def stop_server(server: subprocess.Popen):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=35)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
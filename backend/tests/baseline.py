@@ -0,0 +1,93 @@
+"""
+The chat scorer as it stood before the index, matcher and prerendering
+work: a linear scan over the raw records with substring keyword matching.
+Tests compare the production answers against it.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+PROCEDURE_WORDS = ['how to', 'procedure', 'process', 'file', 'filing']
+CASE_WORDS = ['case', 'judgment', 'judgement', 'kesavananda', 'maneka', 'puttaswamy']
+
+
+def search_articles(articles: List[Dict[str, Any]], query: str) -> List[Dict]:
+    """Top 3 (score, position) matches, scored as the original search_articles."""
+    query_lower = query.lower().strip()
+    results = []
+    article_match = re.search(r'article\s*(\d+[a-z]?)', query_lower)
+    for pos, article in enumerate(articles):
+        score = 0
+        if article_match and article_match.group(1) == article['number'].lower():
+            results.append({'position': pos, 'score': 100.0})
+            continue
+        for keyword in article.get('keywords', []):
+            if keyword.lower() in query_lower:
+                score += 2
+        title_words = article['title'].lower().split()
+        query_words = query_lower.split()
+        title_match_count = sum(1 for word in query_words if word in title_words)
+        if title_match_count > 0:
+            score += title_match_count * 3
+        if article['category'].lower() in query_lower:
+            score += 2
+        desc_words = article['description'].lower().split()
+        desc_match_count = sum(1 for word in query_words if word in desc_words and len(word) > 3)
+        if desc_match_count > 0:
+            score += desc_match_count * 0.5
+        if score > 0:
+            results.append({'position': pos, 'score': score / max(len(query_words), 1)})
+    results.sort(key=lambda x: x['score'], reverse=True)
+    return results[:3]
+
+
+def answer(data: Dict[str, Any], message: str) -> Optional[tuple]:
+    """
+    The entity the original process_chat_message answered with, as
+    (kind, position, related positions), or None for the fallback.
+    """
+    query_lower = message.lower()
+    if any(word in query_lower for word in PROCEDURE_WORDS):
+        for pos, procedure in enumerate(data['procedures']):
+            if any(kw in query_lower for kw in procedure.get('keywords', [])):
+                return ('procedure', pos, [])
+    if any(word in query_lower for word in CASE_WORDS):
+        for pos, case in enumerate(data['landmark_cases']):
+            if any(kw in query_lower for kw in case.get('keywords', [])) or case['name'].lower() in query_lower:
+                return ('case', pos, [])
+    results = search_articles(data['articles'], message)
+    if not results or results[0]['score'] < 1.5:
+        return None
+    related = []
+    if len(results) > 1 and results[1]['score'] > 1.0:
+        related = [r['position'] for r in results[1:] if r['score'] > 1.0]
+    return ('article', results[0]['position'], related)
+
+
+def render(data: Dict[str, Any], answer: tuple) -> str:
+    """The message the original process_chat_message built for an answer."""
+    kind, pos, related = answer
+    if kind == 'procedure':
+        proc = data['procedures'][pos]
+        response = f"📋 **{proc['name']}**\n\n"
+        response += f"**Description:**\n{proc['description']}\n\n"
+        response += f"**Procedure:**\n{proc['procedure']}\n\n"
+        return response
+    if kind == 'case':
+        case = data['landmark_cases'][pos]
+        response = f"⚖️ **{case['name']}**\n\n"
+        response += f"**Year:** {case['year']}\n\n"
+        response += f"**Significance:**\n{case['significance']}\n\n"
+        response += f"**Key Points:**\n"
+        for point in case['key_points']:
+            response += f"• {point}\n"
+        return response
+    best_match = data['articles'][pos]
+    response = f"📜 **Article {best_match['number']}: {best_match['title']}**\n\n"
+    response += f"**Category:** {best_match['category']}\n\n"
+    response += f"**Description:**\n{best_match['description']}\n\n"
+    if related:
+        response += "\n**Related Articles:**\n"
+        for other in related:
+            art = data['articles'][other]
+            response += f"• Article {art['number']}: {art['title']}\n"
+    return response
@@ -0,0 +1,53 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Append the backend directory to sys.path to allow imports from app
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.core.database import DATA_FILE, Database
+from app.core.snapshot import Snapshot, SnapshotWriter
+
+# The baseline comparisons are for the keyword scorer
+settings.CHAT_RETRIEVAL_MODE = "keyword"
+
+
+@pytest.fixture(scope="session")
+def data():
+    """The raw data file, as the original scorer read it."""
+    with open(DATA_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def memory_db():
+    """Data and indexes built from the JSON file."""
+    return Database.load(DATA_FILE, None)
+
+
+@pytest.fixture(scope="session")
+def snapshot_db(memory_db, tmp_path_factory):
+    """The same data mapped from a freshly written snapshot."""
+    snapshot_file = str(tmp_path_factory.mktemp("snapshot") / "data.snapshot")
+    memory_db.write_snapshot(snapshot_file)
+    return Database.load(DATA_FILE, snapshot_file)
+
+
+@pytest.fixture(params=["memory", "snapshot"])
+def database(request):
+    return request.getfixturevalue(f"{request.param}_db")
+
+
+@pytest.fixture
+def roundtrip(tmp_path):
+    """Write sections with write(writer) to a snapshot file and map it back."""
+    def mapped(write) -> Snapshot:
+        writer = SnapshotWriter()
+        write(writer)
+        path = str(tmp_path / "test.snapshot")
+        writer.write(path, "v1", "c1")
+        return Snapshot(path)
+    return mapped
@@ -0,0 +1,109 @@
+"""The chat response cache: LRU, versions, bulk reads and the Redis tier."""
+import asyncio
+
+import pytest
+
+from app.core.cache import LRUCache, RedisBackend, ResponseCache, aioredis, normalize_message
+
+
+def test_normalize_message():
+    assert normalize_message("  What IS\tArticle   21? ") == "what is article 21?"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2, 60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (3, 1, 1, 2)
+
+
+def test_lru_expires_entries():
+    cache = LRUCache(2, -1)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert (cache.expirations, cache.misses, len(cache)) == (1, 1, 0)
+    # A zero size turns the cache off
+    disabled = LRUCache(0, 60)
+    disabled.set("a", 1)
+    assert len(disabled) == 0
+
+
+def test_lru_get_many_leaves_stats_and_order_alone():
+    cache = LRUCache(2, 60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get_many(["a", "x", "b"]) == {"a": 1, "b": 2}
+    assert (cache.hits, cache.misses) == (0, 0)
+    # "a" was not refreshed by the bulk read, so it is evicted first
+    cache.set("c", 3)
+    assert cache.get_many(["a", "b", "c"]) == {"b": 2, "c": 3}
+
+
+def test_response_cache_is_bound_to_the_data_version():
+    async def scenario():
+        cache = ResponseCache(8, 60)
+        await cache.set("q", "body", "v1")
+        assert await cache.get("q", "v1") == "body"
+        assert await cache.get_many(["q", "other"], "v1") == {"q": "body"}
+        # A new data version drops every answer
+        assert await cache.get("q", "v2") is None
+        assert await cache.get_many(["q"], "v1") == {}
+        assert cache.stats()["backend"] == "local"
+
+    asyncio.run(scenario())
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    async def set(self, key, value, ex=None, px=None):
+        assert ex is None and px >= 1
+        self.values[key] = value.encode("utf-8")
+        self.expiry[key] = px
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+@pytest.mark.skipif(aioredis is None, reason="redis is not installed")
+@pytest.mark.parametrize("ttl, px", [(3600, 3_600_000), (0.25, 250), (0.0001, 1)])
+def test_redis_tier(ttl, px):
+    async def scenario():
+        cache = ResponseCache(8, ttl, "redis", "redis://localhost:1")
+        client = cache.shared._client = FakeRedis()
+        await cache.set("q", "body", "v1")
+        assert client.expiry == {"chat:v1:q": px}
+        # Answers only the shared tier has are read in bulk without being copied locally
+        cache.local.clear()
+        assert await cache.get_many(["q", "other"], "v1") == {"q": "body"}
+        assert len(cache.local) == 0
+        assert await cache.get("q", "v1") == "body"
+        assert (cache.shared.hits, len(cache.local)) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(aioredis is None, reason="redis is not installed")
+def test_redis_errors_fall_back_to_local():
+    async def scenario():
+        backend = RedisBackend("redis://localhost:1", 60)
+
+        class Down:
+            async def get(self, key):
+                raise ConnectionError("down")
+
+        backend._client = Down()
+        assert await backend.get("q") is None
+        assert backend.errors == 1 and not backend.available
+        assert await backend.get_many(["q"]) == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+"""Chat answers against the original linear scorer (tests/baseline.py)."""
+import random
+
+import baseline
+from app.services.chat_service import ChatService
+
+# Messages whose answers changed in review at some point
+REGRESSIONS = [
+    "tell me about Panchayats", "inequality", "schedule", "minerva", "lawyer", "nagaland",
+    "scheduled castes", "fundamental rights", "Sabarimala Temple Entry Case (2018) case",
+    "What is the procedure under Article 356?", "How to get a domicile certificate",
+    "important case on compensation", "landmark case on company law", "filing an article",
+    "how to file an RTI", "how to file pil", "How to file PIL?", "mp election case",
+]
+FILLERS = ["what is", "tell me about", "explain", "case on", "how to", "procedure for",
+           "judgment about", "rights", "the", "article", "process of", "filing"]
+
+
+def generated_messages(data) -> list:
+    """Questions built from the data: keywords, titles and names, their plurals, casing and mixes."""
+    messages = list(REGRESSIONS)
+    messages += [r if isinstance(r, str) else r.get('text', '') for r in data['quick_replies']]
+    words = []
+    for article in data['articles']:
+        messages += [f"What is Article {article['number']}?", article['title'], article['category'],
+                     f"article{article['number'].lower()} details"]
+        for keyword in article['keywords']:
+            messages += [f"tell me about {keyword}", f"{keyword}s", keyword.upper()]
+        words += article['title'].split() + article['keywords']
+    for case in data['landmark_cases']:
+        messages += [case['name'], f"{case['name'].lower()} case", f"judgment in {case['name'].split()[0]}"]
+        messages += [f"case on {keyword}" for keyword in case['keywords']]
+        words += case['keywords']
+    for procedure in data['procedures']:
+        messages += [f"How to {procedure['name'].lower()}?", f"procedure for {procedure['name']}"]
+        messages += [f"how to {keyword}" for keyword in procedure['keywords']]
+        words += procedure['keywords']
+    rng = random.Random(7)
+    for _ in range(600):
+        messages.append(" ".join(rng.sample(FILLERS, 1) + rng.sample(words, rng.randint(1, 3))))
+    return list(dict.fromkeys(messages))
+
+
+def first_pass(service: ChatService, message: str):
+    result = service.answer(message)
+    if result is None:
+        return None
+    kind, pos = result['source']
+    return kind, pos, [a.position for a in result.get('related_articles') or []]
+
+
+def test_answers_match_baseline(data, database):
+    service = ChatService(database)
+    messages = generated_messages(data)
+    assert len(messages) > 1500
+    mismatches = []
+    for message in messages:
+        expected = baseline.answer(data, message)
+        if first_pass(service, message) != expected:
+            mismatches.append(message)
+        elif expected is not None and service.process_chat_message(message)['message'] != baseline.render(data, expected):
+            mismatches.append(message)
+    assert not mismatches, f"{len(mismatches)} answers differ from the baseline, e.g. {mismatches[:10]}"
+
+
+def test_case_and_procedure_keywords_keep_their_case(database):
+    # Lily Thomas' "MP" keyword must not match inside "temple"
+    matches = database.keyword_matcher.match("sabarimala temple entry case (2018) case")
+    assert "MP" not in matches
+    assert ChatService(database).answer("Sabarimala Temple Entry Case (2018) case")['message'].startswith(
+        "⚖️ **Sabarimala Temple Entry Case (2018)**")
+
+
+def test_article_keywords_match_inside_words(database):
+    # Plurals and inflections contain their keyword
+    matches = database.keyword_matcher.match("tell me about panchayats")
+    assert "panchayat" in matches
@@ -0,0 +1,92 @@
+"""Keyset pagination through the list endpoints, in memory and from a snapshot."""
+import base64
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.responses import decode_cursor, encode_cursor
+from app.core.database import db
+from app.main import app
+
+# List path, its identifying response field and the entry field behind it
+LISTS = [("/api/v1/articles", "number", "number"), ("/api/v1/cases", "_id", "id"),
+         ("/api/v1/procedures", "_id", "id")]
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    monkeypatch.setattr(db, "current", database)
+    return TestClient(app)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def walk(client, path: str, limit: int = 7) -> list:
+    items, cursor = [], ""
+    separator = "&" if "?" in path else "?"
+    while cursor is not None:
+        response = client.get(f"{path}{separator}cursor={cursor}&limit={limit}")
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= limit
+        items += page["items"]
+        cursor = page["next_cursor"]
+    assert len(items) == page["total"]
+    return items
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("cases/year/1973", (False, 1973, "kesavananda bharati", 4))
+    assert decode_cursor(cursor) == ("cases/year/1973", (False, 1973, "kesavananda bharati", 4))
+
+
+@pytest.mark.parametrize("path, field, entry_field", LISTS)
+def test_walks_cover_each_list_once_in_order(client, database, path, field, entry_field):
+    items = walk(client, path)
+    index = getattr(database.orderings, path.rsplit("/", 1)[1])
+    collection = {"articles": "articles", "cases": "landmark_cases", "procedures": "procedures"}[index.name]
+    assert [item[field] for item in items] == [database.entry(collection, pos)[entry_field] for pos in index.positions]
+
+
+def test_walks_of_filters(client, database):
+    for category, positions in database.facets.articles_by_category.items():
+        items = walk(client, f"/api/v1/articles?category={category}", limit=3)
+        assert sorted(item["number"] for item in items) == sorted(database.articles[p]["number"] for p in positions)
+    for year, positions in database.facets.cases_by_year.items():
+        assert len(walk(client, f"/api/v1/cases?year={year}", limit=2)) == len(positions)
+    assert walk(client, "/api/v1/articles?category=Nonexistent") == []
+
+
+def test_cursors_from_another_list_or_filter_are_rejected(client, database):
+    first = client.get("/api/v1/cases?cursor=&limit=2").json()["next_cursor"]
+    response = client.get(f"/api/v1/articles?cursor={first}")
+    assert response.status_code == 422
+    category = next(iter(database.facets.articles_by_category))
+    cursor = client.get("/api/v1/articles?cursor=&limit=1").json()["next_cursor"]
+    assert client.get(f"/api/v1/articles?category={category}&cursor={cursor}").status_code == 422
+
+
+@pytest.mark.parametrize("cursor", [
+    raw_cursor({"order": "articles", "after": [0, 21, ""]}),
+    raw_cursor({"order": "articles", "after": [0, 21, "", 3, 4]}),
+    raw_cursor({"order": "articles", "after": [True, 21, "", 3]}),
+    raw_cursor({"order": "articles", "after": [0, 21.5, "", 3]}),
+    raw_cursor({"order": "articles", "after": [0, "21", "", 3]}),
+    raw_cursor({"order": 1, "after": [0, 21, "", 3]}),
+    raw_cursor([0, 21, "", 3]),
+    "not-base64-%%",
+])
+def test_malformed_cursors_are_rejected(client, cursor):
+    assert client.get(f"/api/v1/articles?cursor={cursor}").status_code == 422
+
+
+def test_a_well_formed_cursor_resumes_after_its_key(client, database):
+    index = database.orderings.articles
+    cursor = encode_cursor("articles", index.keys[9])
+    page = client.get(f"/api/v1/articles?cursor={cursor}&limit=3").json()
+    assert [item["number"] for item in page["items"]] == [
+        database.articles[pos]["number"] for pos in list(index.positions)[10:13]
+    ]
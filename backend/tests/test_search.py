@@ -0,0 +1,98 @@
+"""Inverted index, keyword automaton, BM25 and the spelling corrector, built and mapped from a snapshot."""
+import pytest
+
+from app.core.fulltext import FullTextIndex
+from app.core.fuzzy import SpellChecker, build_spell_checker
+from app.core.indexes import ArticleSearchIndex
+from app.core.matcher import ARTICLE, CASE, KeywordMatcher, first_owner
+
+ARTICLES = [
+    {"number": "14", "title": "Equality before law", "category": "Fundamental Rights",
+     "keywords": ["equality"], "description": "The State shall not deny equality before the law."},
+    {"number": "21", "title": "Protection of life and personal liberty", "category": "Fundamental Rights",
+     "keywords": ["life", "liberty"], "description": "No person shall be deprived of his life."},
+    {"number": "21A", "title": "Right to education", "category": "Fundamental Rights",
+     "keywords": ["education"], "description": "Free and compulsory education of children."},
+    {"number": "300A", "title": "Right to property", "category": "Property",
+     "keywords": ["property"], "description": "No person shall be deprived of his property."},
+]
+FIELDS = {"number": 3.0, "title": 3.0, "keywords": 2.0, "description": 1.0}
+
+
+@pytest.fixture(params=["built", "mapped"])
+def mapped(request, roundtrip):
+    """Returns the component as built, or after a snapshot round trip."""
+    def load(component, cls):
+        if request.param == "built":
+            return component
+        return cls.from_snapshot(roundtrip(lambda writer: component.write_to(writer, "x")), "x")
+    return load
+
+
+def test_article_postings(mapped):
+    index = mapped(ArticleSearchIndex(ARTICLES), ArticleSearchIndex)
+    assert index.size == 4
+    assert list(index.number_postings["21a"]) == [2]
+    assert list(index.title_postings["right"]) == [2, 3]
+    assert list(index.description_postings["deprived"]) == [1, 3]
+    assert "missing" not in index.title_postings
+
+
+def test_matcher_finds_overlapping_patterns(mapped):
+    matcher = mapped(KeywordMatcher([
+        ("he", (ARTICLE, 0)), ("she", (ARTICLE, 1)), ("hers", (CASE, 2)), ("he", (CASE, 3)),
+    ]), KeywordMatcher)
+    assert matcher.match("ushers") == {"he": [(ARTICLE, 0), (CASE, 3)], "she": [(ARTICLE, 1)],
+                                       "hers": [(CASE, 2)]}
+    assert matcher.match("nothing here at all") == {"he": [(ARTICLE, 0), (CASE, 3)]}
+    assert matcher.match("xyz") == {}
+
+
+def test_matcher_compares_patterns_as_given(mapped):
+    matcher = mapped(KeywordMatcher([("PIL", (CASE, 0)), ("pil", (CASE, 1))]), KeywordMatcher)
+    assert matcher.match("how to file pil") == {"pil": [(CASE, 1)]}
+    assert first_owner(matcher.match("pilgrim"), CASE) == 1
+    assert first_owner(matcher.match("pilgrim"), ARTICLE) is None
+
+
+def test_bm25_ranks_title_hits_first(mapped):
+    index = mapped(FullTextIndex(ARTICLES, FIELDS), FullTextIndex)
+    # "equality" is the title, a keyword and the description of 14 only
+    assert index.search("equality") == ([0], 1)
+    # Title and keyword outrank description-only matches
+    positions, total = index.search("property")
+    assert positions[0] == 3 and total == 1
+    assert index.search("deprived")[1] == 2
+
+
+def test_bm25_requires_every_word_then_any(mapped):
+    index = mapped(FullTextIndex(ARTICLES, FIELDS), FullTextIndex)
+    assert index.search("right education") == ([2], 1)
+    # No article has both, so either word may match
+    positions, total = index.search("equality property")
+    assert sorted(positions) == [0, 3] and total == 2
+
+
+def test_bm25_prefix_paging_and_filter(mapped):
+    index = mapped(FullTextIndex(ARTICLES, FIELDS), FullTextIndex)
+    # The last word completes ("educ" -> "education"); the exact number outranks "21a"
+    assert index.search("educ")[0] == [2]
+    assert index.search("21")[0][:2] == [1, 2]
+    assert index.search("21", offset=1, limit=1) == ([2], 2)
+    assert index.search("21", within={2}) == ([2], 1)
+    assert index.search("the of") == ([], 0)
+
+
+def test_spell_checker(mapped):
+    checker = mapped(build_spell_checker(ARTICLES, [], []), SpellChecker)
+    assert checker.lookup("equalty") == "equality"
+    assert checker.lookup("educatoin") == "education"
+    # Short words get no edits
+    assert checker.lookup("lif") is None
+    # Known words, numbers and short words are kept; the rest is lowercased
+    assert checker.correct("Artcle 21A on Propety") == "article 21a on property"
+    assert checker.correct("deprived children") == "deprived children"
+
+
+def test_spell_checker_on_the_data(database):
+    assert database.spell_checker.correct("artical 21 on fundamentl rights") == "article 21 on fundamental rights"
@@ -0,0 +1,84 @@
+"""Snapshot sections and a whole Database written and mapped back."""
+from app.core.snapshot import SnapshotWriter, open_snapshot
+
+
+def test_sections_round_trip(roundtrip):
+    def write(writer):
+        writer.array("ints", "I", [3, 1, 4])
+        writer.array("floats", "d", [0.5, -2.0])
+        writer.fragments("blobs", [b"ab", b"", "é".encode("utf-8")])
+        writer.strings("words", ["zeta", "alpha", "ünï"])
+        writer.postings("plain", {"b": [2, 3], "a": [1]})
+        writer.postings("weighted", {"t": [(0, 1.5), (4, 2.0)]}, weighted=True)
+        writer.postings("labelled", {"k": ["y", "x"]}, labels={"x": 0, "y": 1})
+        writer.values("counts", {"b": 2, "a": 7}, "I")
+        writer.rows("rows", [{"id": "x", "n": [1, 2]}, [True, 0, "a"], None])
+        writer.array("empty", "I", [])
+
+    snapshot = roundtrip(write)
+    assert list(snapshot.array("ints")) == [3, 1, 4]
+    assert list(snapshot.array("floats")) == [0.5, -2.0]
+    assert [bytes(b) for b in snapshot.fragments("blobs")] == [b"ab", b"", "é".encode("utf-8")]
+    words = snapshot.strings("words")
+    assert list(words) == ["zeta", "alpha", "ünï"]
+    assert words.index_of("ünï") == 2 and words.index_of("beta") is None and "alpha" in words
+    plain = snapshot.postings("plain")
+    assert list(plain) == ["a", "b"] and list(plain["b"]) == [2, 3] and "c" not in plain
+    assert snapshot.postings("weighted")["t"] == [(0, 1.5), (4, 2.0)]
+    assert snapshot.postings("labelled", labels=["x", "y"])["k"] == ["y", "x"]
+    assert dict(snapshot.values("counts")) == {"a": 7, "b": 2}
+    assert list(snapshot.rows("rows")) == [{"id": "x", "n": [1, 2]}, [True, 0, "a"], None]
+    assert len(snapshot.array("empty")) == 0
+    assert "plain" in snapshot and "ints" in snapshot and "missing" not in snapshot
+
+
+def test_stale_or_foreign_files_are_ignored(tmp_path):
+    path = str(tmp_path / "data.snapshot")
+    assert open_snapshot(path, "v1", "c1") is None
+    SnapshotWriter().write(path, "v1", "c1")
+    assert open_snapshot(path, "v1", "c1") is not None
+    assert open_snapshot(path, "v2", "c1") is None
+    assert open_snapshot(path, "v1", "c2") is None
+    with open(path, "wb") as f:
+        f.write(b"not a snapshot")
+    assert open_snapshot(path, "v1", "c1") is None
+
+
+def test_database_round_trip(memory_db, snapshot_db):
+    assert snapshot_db.snapshot is not None and snapshot_db.version == memory_db.version
+    for collection in ("articles", "landmark_cases", "procedures"):
+        assert snapshot_db.expanded(collection) == memory_db.expanded(collection)
+        assert list(snapshot_db._records[collection]) == list(memory_db._records[collection])
+    assert snapshot_db.quick_replies == memory_db.quick_replies
+
+    assert dict(snapshot_db.lookup.articles_by_number) == memory_db.lookup.articles_by_number
+    assert dict(snapshot_db.lookup.cases_by_id) == memory_db.lookup.cases_by_id
+    assert dict(snapshot_db.lookup.procedures_by_id) == memory_db.lookup.procedures_by_id
+
+    facets, expected = snapshot_db.facets, memory_db.facets
+    assert facets.article_categories == expected.article_categories
+    assert facets.article_category_counts == expected.article_category_counts
+    assert facets.case_year_counts == expected.case_year_counts
+    assert facets.case_category_counts == expected.case_category_counts
+    assert {c: list(p) for c, p in facets.articles_by_category.items()} == expected.articles_by_category
+    assert {y: list(p) for y, p in facets.cases_by_year.items()} == expected.cases_by_year
+
+    orderings, expected = snapshot_db.orderings, memory_db.orderings
+    pairs = [(orderings.articles, expected.articles), (orderings.cases, expected.cases),
+             (orderings.procedures, expected.procedures)]
+    pairs += [(orderings.articles_by_category[c], i) for c, i in expected.articles_by_category.items()]
+    pairs += [(orderings.cases_by_year[y], i) for y, i in expected.cases_by_year.items()]
+    for mapped, built in pairs:
+        assert mapped.name == built.name and mapped.key_types == built.key_types
+        assert list(mapped.positions) == built.positions and list(mapped.keys) == built.keys
+
+    payloads, expected = snapshot_db.payloads, memory_db.payloads
+    for name, bodies in expected._fixed().items():
+        assert [bytes(b) for b in payloads._fixed()[name]] == [bytes(b) for b in bodies]
+    answers, expected = snapshot_db.answers, memory_db.answers
+    for pos in range(len(memory_db.articles)):
+        assert answers.article(pos, [0, 1]) == expected.article(pos, [0, 1])
+    for pos in range(len(memory_db.cases)):
+        assert answers.case(pos) == expected.case(pos)
+    for pos in range(len(memory_db.procedures)):
+        assert answers.procedure(pos) == expected.procedure(pos)
@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { Article, LandmarkCase, Procedure, QuickReply, ChatMessage, ChatResponse } from '@/types'
+import type { Article, LandmarkCase, Procedure, QuickReply, ChatMessage, ChatResponse, Facets, BatchResult, CursorPage } from '@/types'
 
 const getBaseUrl = () => {
     let url = process.env.NEXT_PUBLIC_API_URL
@@ -56,11 +56,29 @@ export const articlesAPI = {
         return response.data
     },
 
+    // Pass the previous page's next_cursor, or '' for the first page
+    getPage: async (cursor: string, params?: {
+        limit?: number
+        category?: string
+    }): Promise<CursorPage<Article>> => {
+        const response = await api.get<CursorPage<Article>>('/articles', {
+            params: { ...params, cursor },
+        })
+        return response.data
+    },
+
     getByNumber: async (articleNumber: string): Promise<Article> => {
         const response = await api.get<Article>('/articles/' + articleNumber)
         return response.data
     },
 
+    getByNumbers: async (numbers: string[]): Promise<BatchResult<Article>> => {
+        const response = await api.get<BatchResult<Article>>('/articles/batch', {
+            params: { numbers: numbers.join(',') },
+        })
+        return response.data
+    },
+
     getCategories: async (): Promise<string[]> => {
         const response = await api.get<string[]>('/articles/categories/list')
         return response.data
@@ -79,10 +97,28 @@ export const casesAPI = {
         return response.data
     },
 
+    // Pass the previous page's next_cursor, or '' for the first page
+    getPage: async (cursor: string, params?: {
+        limit?: number
+        year?: number
+    }): Promise<CursorPage<LandmarkCase>> => {
+        const response = await api.get<CursorPage<LandmarkCase>>('/cases', {
+            params: { ...params, cursor },
+        })
+        return response.data
+    },
+
     getById: async (caseId: number): Promise<LandmarkCase> => {
         const response = await api.get<LandmarkCase>('/cases/' + caseId)
         return response.data
     },
+
+    getByIds: async (ids: (number | string)[]): Promise<BatchResult<LandmarkCase>> => {
+        const response = await api.get<BatchResult<LandmarkCase>>('/cases/batch', {
+            params: { ids: ids.join(',') },
+        })
+        return response.data
+    },
 }
 
 // Procedures API
@@ -96,10 +132,35 @@ export const proceduresAPI = {
         return response.data
     },
 
+    // Pass the previous page's next_cursor, or '' for the first page
+    getPage: async (cursor: string, params?: {
+        limit?: number
+    }): Promise<CursorPage<Procedure>> => {
+        const response = await api.get<CursorPage<Procedure>>('/procedures', {
+            params: { ...params, cursor },
+        })
+        return response.data
+    },
+
     getById: async (procedureId: number): Promise<Procedure> => {
         const response = await api.get<Procedure>('/procedures/' + procedureId)
         return response.data
     },
+
+    getByIds: async (ids: (number | string)[]): Promise<BatchResult<Procedure>> => {
+        const response = await api.get<BatchResult<Procedure>>('/procedures/batch', {
+            params: { ids: ids.join(',') },
+        })
+        return response.data
+    },
+}
+
+// Facets API
+export const facetsAPI = {
+    getAll: async (): Promise<Facets> => {
+        const response = await api.get<Facets>('/facets')
+        return response.data
+    },
 }
 
 export default api
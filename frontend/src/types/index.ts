@@ -41,3 +41,30 @@ export interface ChatResponse {
     message: string
     related_articles?: Article[]
 }
+
+export interface CategoryCount {
+    name: string
+    count: number
+}
+
+export interface YearCount {
+    year: number
+    count: number
+}
+
+export interface Facets {
+    article_categories: CategoryCount[]
+    case_years: YearCount[]
+    case_categories: CategoryCount[]
+}
+
+export interface BatchResult<T> {
+    items: T[]
+    missing: string[]
+}
+
+export interface CursorPage<T> {
+    items: T[]
+    total: number
+    next_cursor: string | null
+}